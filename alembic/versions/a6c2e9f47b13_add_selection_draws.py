@@ -0,0 +1,51 @@
+"""Add selection_draws and draw columns on selection_logs
+
+Revision ID: a6c2e9f47b13
+Revises: f3b8d24c6a19
+Create Date: 2026-10-17 18:42:09.731562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e9f47b13'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d24c6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('selection_draws',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('selection_session_id', sa.Integer(), nullable=False),
+    sa.Column('seed', sa.BigInteger(), nullable=False),
+    sa.Column('algorithm_version', sa.String(), nullable=False),
+    sa.Column('draw_params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    sa.ForeignKeyConstraint(['selection_session_id'], ['selection_sessions.id'], name='selection_draws_selection_session_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='selection_draws_pkey')
+    )
+    op.create_index('ix_selection_draws_selection_session_id', 'selection_draws', ['selection_session_id'])
+    op.add_column('selection_logs', sa.Column('draw_id', sa.Integer(), nullable=True))
+    op.add_column('selection_logs', sa.Column('seed', sa.BigInteger(), nullable=True))
+    op.add_column('selection_logs', sa.Column('algorithm_version', sa.String(), nullable=True))
+    op.create_foreign_key('selection_logs_draw_id_fkey', 'selection_logs', 'selection_draws', ['draw_id'], ['id'])
+    op.create_index('ix_selection_logs_draw_id', 'selection_logs', ['draw_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_selection_logs_draw_id', table_name='selection_logs')
+    op.drop_constraint('selection_logs_draw_id_fkey', 'selection_logs', type_='foreignkey')
+    op.drop_column('selection_logs', 'algorithm_version')
+    op.drop_column('selection_logs', 'seed')
+    op.drop_column('selection_logs', 'draw_id')
+    op.drop_index('ix_selection_draws_selection_session_id', table_name='selection_draws')
+    op.drop_table('selection_draws')
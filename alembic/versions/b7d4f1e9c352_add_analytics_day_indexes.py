@@ -0,0 +1,45 @@
+"""Add per-session timestamp indexes for dashboard analytics
+
+Revision ID: b7d4f1e9c352
+Revises: a6c2e9f47b13
+Create Date: 2026-10-17 21:05:43.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4f1e9c352'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e9f47b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Joins and selections per day of a host's sessions; today's bucket is counted per request
+    op.create_index(
+        'ix_group_members_session_joined_at', 'group_members', ['session_id', 'joined_at'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_selection_members_session_joined_at', 'selection_members', ['selection_session_id', 'joined_at'],
+        if_not_exists=True,
+    )
+    # Leads with selection_session_id, so it replaces the single-column index
+    op.create_index(
+        'ix_selection_logs_session_selected_at', 'selection_logs', ['selection_session_id', 'selected_at'],
+        if_not_exists=True,
+    )
+    op.drop_index('ix_selection_logs_selection_session_id', table_name='selection_logs', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_selection_logs_selection_session_id', 'selection_logs', ['selection_session_id'], if_not_exists=True,
+    )
+    op.drop_index('ix_selection_logs_session_selected_at', table_name='selection_logs', if_exists=True)
+    op.drop_index('ix_selection_members_session_joined_at', table_name='selection_members', if_exists=True)
+    op.drop_index('ix_group_members_session_joined_at', table_name='group_members', if_exists=True)
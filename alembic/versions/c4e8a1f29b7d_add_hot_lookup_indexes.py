@@ -0,0 +1,73 @@
+"""Add indexes for hot lookup columns
+
+Revision ID: c4e8a1f29b7d
+Revises: bdb7b4bcd6f4
+Create Date: 2026-10-17 09:12:44.318506
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f29b7d'
+down_revision: Union[str, Sequence[str], None] = 'bdb7b4bcd6f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, unique, partial WHERE clause)
+# The (session_id, member_identifier) unique indexes also serve plain session_id lookups,
+# so no separate single-column index is created for those.
+INDEXES = [
+    ('ix_access_codes_code', 'access_codes', ['code'], False, None),
+    ('uq_access_codes_code_active', 'access_codes', ['code'], True, "status = 'active'"),
+    ('ix_access_codes_host_id', 'access_codes', ['host_id'], False, None),
+    ('ix_users_email', 'users', ['email'], False, None),
+    ('ix_group_sessions_code_id', 'group_sessions', ['code_id'], False, None),
+    ('ix_group_sessions_host_id', 'group_sessions', ['host_id'], False, None),
+    ('ix_selection_sessions_code_id', 'selection_sessions', ['code_id'], False, None),
+    ('ix_selection_sessions_host_id', 'selection_sessions', ['host_id'], False, None),
+    ('ix_groups_session_id', 'groups', ['session_id'], False, None),
+    ('ix_field_definitions_session_id', 'field_definitions', ['session_id'], False, None),
+    ('ix_group_members_group_id', 'group_members', ['group_id'], False, None),
+    ('uq_group_members_session_member', 'group_members', ['session_id', 'member_identifier'], True, None),
+    ('uq_selection_members_session_member', 'selection_members', ['selection_session_id', 'member_identifier'], True, None),
+    ('ix_selection_members_session_selected', 'selection_members', ['selection_session_id', 'selected'], False, None),
+    ('ix_selection_logs_selection_session_id', 'selection_logs', ['selection_session_id'], False, None),
+]
+
+# Unique indexes can't be built over existing duplicates; report them instead of deleting rows
+DUPLICATE_CHECKS = [
+    ("access_codes", "SELECT code FROM access_codes WHERE status = 'active' GROUP BY code HAVING count(*) > 1"),
+    ("group_members", "SELECT session_id, member_identifier FROM group_members GROUP BY 1, 2 HAVING count(*) > 1"),
+    ("selection_members", "SELECT selection_session_id, member_identifier FROM selection_members GROUP BY 1, 2 HAVING count(*) > 1"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for table, query in DUPLICATE_CHECKS:
+        duplicates = bind.execute(sa.text(query)).fetchall()
+        if duplicates:
+            raise RuntimeError(
+                f"{len(duplicates)} duplicate keys in {table} (e.g. {tuple(duplicates[0])}); "
+                "resolve them before running this migration"
+            )
+
+    for name, table, columns, unique, where in INDEXES:
+        op.create_index(
+            name, table, columns,
+            unique=unique,
+            postgresql_where=sa.text(where) if where else None,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,43 @@
+"""Add session history indexes
+
+Revision ID: d9f3b62e0a41
+Revises: c4e8a1f29b7d
+Create Date: 2026-10-17 11:40:05.927131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f3b62e0a41'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f29b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trigram indexes back the `q` search (lower(name) LIKE '%...%') of the session history
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_group_sessions_name_trgm', 'group_sessions', [sa.text('lower(name) gin_trgm_ops')],
+        postgresql_using='gin', if_not_exists=True,
+    )
+    op.create_index(
+        'ix_selection_sessions_name_trgm', 'selection_sessions', [sa.text('lower(name) gin_trgm_ops')],
+        postgresql_using='gin', if_not_exists=True,
+    )
+    # Newest-first history ordering per host
+    op.create_index(
+        'ix_access_codes_host_id_created_at', 'access_codes', ['host_id', 'created_at'], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_access_codes_host_id_created_at', table_name='access_codes', if_exists=True)
+    op.drop_index('ix_selection_sessions_name_trgm', table_name='selection_sessions', if_exists=True)
+    op.drop_index('ix_group_sessions_name_trgm', table_name='group_sessions', if_exists=True)
@@ -0,0 +1,53 @@
+"""Add host_stats
+
+Revision ID: e1a7c5d83f26
+Revises: d9f3b62e0a41
+Create Date: 2026-10-17 13:05:51.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c5d83f26'
+down_revision: Union[str, Sequence[str], None] = 'd9f3b62e0a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('host_stats',
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('group_sessions', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('selection_sessions', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('participants', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('selections', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('exports', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    sa.ForeignKeyConstraint(['host_id'], ['users.id'], name='host_stats_host_id_fkey'),
+    sa.PrimaryKeyConstraint('host_id', name='host_stats_pkey')
+    )
+    # Seed every existing host so later increments start from the true totals
+    # (python -m app.services.host_stats_service recomputes them at any time)
+    op.execute("""
+        INSERT INTO host_stats (host_id, group_sessions, selection_sessions, participants, selections, exports, updated_at)
+        SELECT u.id,
+               (SELECT count(*) FROM group_sessions gs WHERE gs.host_id = u.id),
+               (SELECT count(*) FROM selection_sessions ss WHERE ss.host_id = u.id),
+               (SELECT count(*) FROM group_members gm JOIN group_sessions gs ON gm.session_id = gs.id WHERE gs.host_id = u.id)
+               + (SELECT count(*) FROM selection_members sm JOIN selection_sessions ss ON sm.selection_session_id = ss.id WHERE ss.host_id = u.id),
+               (SELECT count(*) FROM selection_members sm JOIN selection_sessions ss ON sm.selection_session_id = ss.id
+                WHERE ss.host_id = u.id AND sm.selected),
+               0,
+               now()
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('host_stats')
@@ -0,0 +1,30 @@
+"""Add data_version to group and selection sessions
+
+Revision ID: f3b8d24c6a19
+Revises: e1a7c5d83f26
+Create Date: 2026-10-17 14:20:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d24c6a19'
+down_revision: Union[str, Sequence[str], None] = 'e1a7c5d83f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('group_sessions', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('selection_sessions', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('selection_sessions', 'data_version')
+    op.drop_column('group_sessions', 'data_version')
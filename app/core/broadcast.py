@@ -0,0 +1,201 @@
+# app/core/broadcast.py
+"""
+Pub/sub fan-out for real-time messages.
+
+Publishers send a string to a channel; every subscription to that channel, on any worker,
+receives it. The in-memory backend reaches subscriptions in this process only; the Redis
+backend relays through Redis pub/sub so every uvicorn worker receives every message.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "memory" (single process) or "redis" (multiple workers)
+BROADCAST_BACKEND = os.getenv("BROADCAST_BACKEND", "memory").lower()
+# redis:// URL for the Redis backend (the Upstash REST client in app.core.cache has no pub/sub)
+BROADCAST_REDIS_URL = os.getenv("BROADCAST_REDIS_URL", "redis://localhost:6379/0")
+# Messages buffered per subscription; a consumer this far behind loses its oldest messages
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "256"))
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def session_channel(session_type: str, session_id: int) -> str:
+    return f"session:{session_type}:{session_id}"
+
+
+def reveal_channel(session_id: int) -> str:
+    return f"reveal:{session_id}"
+
+
+class Subscription:
+    """One consumer (e.g. one WebSocket) listening on any number of channels"""
+
+    def __init__(self, hub: "MemoryBroadcast"):
+        self._hub = hub
+        self.channels: Set[str] = set()
+        self.queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+
+    async def subscribe(self, channel: str) -> None:
+        if channel not in self.channels:
+            self.channels.add(channel)
+            await self._hub._add(channel, self)
+
+    async def unsubscribe(self, channel: str) -> None:
+        if channel in self.channels:
+            self.channels.discard(channel)
+            await self._hub._remove(channel, self)
+
+    async def get(self) -> Tuple[str, str]:
+        """Wait for the next (channel, message)"""
+        return await self.queue.get()
+
+    async def close(self) -> None:
+        for channel in list(self.channels):
+            await self.unsubscribe(channel)
+
+    def _put(self, channel: str, message: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait((channel, message))
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class MemoryBroadcast:
+    """In-process backend: publish delivers straight to local subscriptions"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def subscription(self) -> Subscription:
+        return Subscription(self)
+
+    async def publish(self, channel: str, message: str) -> None:
+        self._deliver(channel, message)
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self._subscribers.get(channel, ()))
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    def _deliver(self, channel: str, message: str) -> None:
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription._put(channel, message)
+
+    async def _add(self, channel: str, subscription: Subscription) -> None:
+        subscribers = self._subscribers.setdefault(channel, set())
+        subscribers.add(subscription)
+        if len(subscribers) == 1:
+            await self._channel_opened(channel)
+
+    async def _remove(self, channel: str, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(channel)
+        if not subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[channel]
+            await self._channel_closed(channel)
+
+    async def _channel_opened(self, channel: str) -> None:
+        pass
+
+    async def _channel_closed(self, channel: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBroadcast(MemoryBroadcast):
+    """Redis pub/sub backend.
+
+    This worker subscribes to a Redis channel while it has at least one local subscription
+    to it, and a reader task hands incoming messages to those subscriptions. publish only
+    goes to Redis, which echoes it back to every worker including this one.
+
+    client may be any object with redis.asyncio's publish()/pubsub() interface (e.g. a
+    fakeredis client in tests); by default one is created from BROADCAST_REDIS_URL.
+    """
+
+    def __init__(self, url: str = BROADCAST_REDIS_URL, client=None):
+        super().__init__()
+        self._url = url
+        self._client = client
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _get_client(self):
+        if self._client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError as exc:
+                raise RuntimeError("BROADCAST_BACKEND=redis requires the redis package") from exc
+            self._client = aioredis.from_url(self._url, decode_responses=True)
+        return self._client
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._get_client().publish(channel, message)
+
+    async def _channel_opened(self, channel: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._get_client().pubsub()
+        await self._pubsub.subscribe(channel)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _channel_closed(self, channel: str) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        while self._subscribers:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Connection lost: resubscribe everything this worker still listens to
+                logger.warning("Broadcast reader error, resubscribing: %s", e)
+                await asyncio.sleep(1)
+                try:
+                    self._pubsub = self._get_client().pubsub()
+                    if self._subscribers:
+                        await self._pubsub.subscribe(*self._subscribers)
+                except Exception as resubscribe_error:
+                    logger.warning("Broadcast resubscribe failed: %s", resubscribe_error)
+                continue
+            if message and message.get("type") == "message":
+                channel, data = message["channel"], message["data"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                self._deliver(channel, data)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+
+
+def _create_broadcast() -> MemoryBroadcast:
+    if BROADCAST_BACKEND == "redis":
+        return RedisBroadcast()
+    return MemoryBroadcast()
+
+
+broadcast = _create_broadcast()
@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Cookie
 from jose import JWTError, jwt
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -9,26 +10,71 @@ from app.core.database import get_session
 from app.models.user import User
 from app.core.security import SECRET_KEY, ALGORITHM
 import os
+import time
+from collections import OrderedDict
 
 # For OpenAPI docs; actual verification uses Authorization: Bearer <token>
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/user/login", auto_error=False)
 
 AUTH_COOKIE_NAME = os.getenv("AUTH_COOKIE_NAME", "access_token")
 
+# Short-lived per-worker cache of authenticated users, keyed on the token subject (email).
+# 0 disables it. Profile and password changes call invalidate_user_cache.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))  # seconds
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "2048"))
+
+_user_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+
+def invalidate_user_cache(email: str | None = None) -> None:
+    if email is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(email, None)
+
+
+async def _cached_user(email: str, session: AsyncSession) -> User | None:
+    cached = _user_cache.get(email)
+    if cached is None:
+        return None
+    deadline, data = cached
+    if deadline < time.monotonic():
+        _user_cache.pop(email, None)
+        return None
+    _user_cache.move_to_end(email)
+    # Rebuild the row as a detached persistent object and attach it to this request's
+    # session without a SELECT, so routes can modify and commit it as before
+    user = User(**data)
+    make_transient_to_detached(user)
+    return await session.merge(user, load=False)
+
+
+def _remember_user(email: str, user: User) -> None:
+    if USER_CACHE_TTL <= 0:
+        return
+    _user_cache[email] = (time.monotonic() + USER_CACHE_TTL, user.model_dump())
+    _user_cache.move_to_end(email)
+    while len(_user_cache) > USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+
 
 async def get_current_user(
     token: str | None = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session),
     access_cookie: str | None = Cookie(default=None, alias=AUTH_COOKIE_NAME),
 ) -> User:
+    # Prefer Authorization header; fall back to HttpOnly cookie
+    return await user_from_token(token or access_cookie, session)
+
+
+async def user_from_token(tok: str | None, session: AsyncSession) -> User:
+    """User a JWT access token belongs to; raises 401 HTTPException if it is missing or invalid"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Prefer Authorization header; fall back to HttpOnly cookie
-    tok = token or access_cookie
     if not tok:
         raise credentials_exception
 
@@ -40,9 +86,21 @@ async def get_current_user(
     except JWTError as exc:
         raise credentials_exception from exc
 
-    result = await session.exec(select(User).where(User.email == email))
-    user = result.first()
+    user = await _cached_user(email, session)
+    if user is not None:
+        return user
+
+    # Tokens issued since the uid claim was added allow a primary-key fetch
+    uid = payload.get("uid")
+    if isinstance(uid, int):
+        user = await session.get(User, uid)
+        if user is not None and user.email != email:
+            user = None
+    else:
+        result = await session.exec(select(User).where(User.email == email))
+        user = result.first()
     if user is None:
         raise credentials_exception
 
+    _remember_user(email, user)
     return user
@@ -15,6 +15,9 @@ from app.routes import user, group_session, selection_session, export, debug, da
 from app.routes import join_resolver
 from app.models.user import User
 from app.core.dependencies import get_current_user
+from app.services.export_pool import shutdown_export_pool
+from app.core.broadcast import broadcast
+from app.services.live_events import flush_session_events
 #, session, member, group
 #app = FastAPI(title="GroupifyAssist API")
 
@@ -60,6 +63,17 @@ app.include_router(settings.router)
 # Example: register additional routers or startup hooks here
 
 
+@app.on_event("shutdown")
+def _stop_export_pool():
+    shutdown_export_pool()
+
+
+@app.on_event("shutdown")
+async def _close_broadcast():
+    await flush_session_events()
+    await broadcast.close()
+
+
 # Health check
 @app.get("/")
 async def root():
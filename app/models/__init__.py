@@ -11,6 +11,8 @@ from .selection_member import SelectionMember
 from .preferential_grouping_rule import PreferentialGroupingRule
 from .preferential_selection_rule import PreferentialSelectionRule
 from .selection_log import SelectionLog
+from .selection_draw import SelectionDraw
+from .host_stat import HostStat
 
 __all__ = [
     "User",
@@ -23,5 +25,7 @@ __all__ = [
     "SelectionMember",
     "PreferentialGroupingRule",
     "SelectionLog",
-    "PreferentialSelectionRule"
+    "SelectionDraw",
+    "PreferentialSelectionRule",
+    "HostStat"
 ]
@@ -1,10 +1,17 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
 from datetime import datetime
 
 class AccessCode(SQLModel, table=True):
     __tablename__ = "access_codes"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_access_codes_code", "code"),
+        # At most one active code per string; expired/used codes may be reused
+        Index("uq_access_codes_code_active", "code", unique=True, postgresql_where=text("status = 'active'")),
+        Index("ix_access_codes_host_id", "host_id"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     code: str #= Field(index=True, unique=True)
@@ -1,11 +1,14 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 
 class FieldDefinition(SQLModel, table=True):
     __tablename__ = "field_definitions"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_field_definitions_session_id", "session_id"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     session_id: int = Field(foreign_key="group_sessions.id")
@@ -1,12 +1,19 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from datetime import datetime
 
 class GroupMember(SQLModel, table=True):
     __tablename__ = "group_members"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_group_members_group_id", "group_id"),
+        # Duplicate joins are rejected by the database; also serves session_id lookups
+        Index("uq_group_members_session_member", "session_id", "member_identifier", unique=True),
+        # Joins per day of a session (dashboard analytics)
+        Index("ix_group_members_session_joined_at", "session_id", "joined_at"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="groups.id")
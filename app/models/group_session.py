@@ -1,11 +1,16 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 
 
 class GroupSession(SQLModel, table=True):
     __tablename__ = "group_sessions"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_group_sessions_code_id", "code_id"),
+        Index("ix_group_sessions_host_id", "host_id"),
+        {"extend_existing": True},
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
@@ -17,3 +22,5 @@ class GroupSession(SQLModel, table=True):
     reveal_immediately: bool = Field(default=False)
     
     status: str = Field(default="active")  # values: active, expired
+    # Bumped on every change to members, placements or selections; keys the export cache
+    data_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
@@ -1,10 +1,14 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 
 
 class Group(SQLModel, table=True):
     __tablename__ = "groups"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_groups_session_id", "session_id"),
+        {"extend_existing": True},
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str  # e.g. "Group A"
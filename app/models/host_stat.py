@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class HostStat(SQLModel, table=True):
+    """Per-host dashboard counters, kept current by app/services/host_stats_service.py."""
+    __tablename__ = "host_stats"
+    __table_args__ = {"extend_existing": True}
+
+    host_id: int = Field(foreign_key="users.id", primary_key=True)
+    group_sessions: int = Field(default=0)
+    selection_sessions: int = Field(default=0)
+    participants: int = Field(default=0)  # group + selection members
+    selections: int = Field(default=0)  # members currently selected
+    exports: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import BigInteger, Column, Index
+from datetime import datetime
+
+class SelectionDraw(SQLModel, table=True):
+    """One select_members run: the seed and inputs needed to recompute it, and its result."""
+    __tablename__ = "selection_draws"
+    __table_args__ = (
+        Index("ix_selection_draws_selection_session_id", "selection_session_id"),
+        {"extend_existing": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    selection_session_id: int = Field(foreign_key="selection_sessions.id")
+    seed: int = Field(sa_column=Column(BigInteger, nullable=False))
+    algorithm_version: str
+    # count, preferential_selection, quotas, rules, field_keys, max_member_id, previous_ids
+    draw_params: dict = Field(sa_column=Column(JSONB, nullable=False))
+    # [[member_id, selection_type], ...] in draw order
+    result: list = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -1,13 +1,23 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, Index
 from datetime import datetime
 
 class SelectionLog(SQLModel, table=True):
     __tablename__ = "selection_logs"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Also serves selections per day of a session (dashboard analytics)
+        Index("ix_selection_logs_session_selected_at", "selection_session_id", "selected_at"),
+        Index("ix_selection_logs_draw_id", "draw_id"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     selection_session_id: int = Field(foreign_key="selection_sessions.id")
     member_id: int = Field(foreign_key="selection_members.id")
     selected_at: datetime = Field(default_factory=datetime.now)
     selection_type: str = Field(default="random")  # or 'preferential'
+    # Draw that selected the member; seed and algorithm_version repeat it for direct auditing
+    draw_id: Optional[int] = Field(default=None, foreign_key="selection_draws.id")
+    seed: Optional[int] = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    algorithm_version: Optional[str] = None
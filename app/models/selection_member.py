@@ -1,12 +1,19 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from datetime import datetime
 
 class SelectionMember(SQLModel, table=True):
     __tablename__ = "selection_members"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Duplicate joins are rejected by the database; also serves session lookups
+        Index("uq_selection_members_session_member", "selection_session_id", "member_identifier", unique=True),
+        Index("ix_selection_members_session_selected", "selection_session_id", "selected"),
+        # Joins per day of a session (dashboard analytics)
+        Index("ix_selection_members_session_joined_at", "selection_session_id", "joined_at"),
+        {"extend_existing": True},
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     selection_session_id: int = Field(foreign_key="selection_sessions.id")
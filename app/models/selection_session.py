@@ -1,10 +1,15 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 
 class SelectionSession(SQLModel, table=True):
     __tablename__ = "selection_sessions"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_selection_sessions_code_id", "code_id"),
+        Index("ix_selection_sessions_host_id", "host_id"),
+        {"extend_existing": True},
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
@@ -12,4 +17,6 @@ class SelectionSession(SQLModel, table=True):
     code_id: int = Field(foreign_key="access_codes.id")
     member_identifier: str  # unique ID within the session
     host_id: int = Field(foreign_key="users.id")
-    max_group_size: int
\ No newline at end of file
+    max_group_size: int
+    # Bumped on every change to members, placements or selections; keys the export cache
+    data_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
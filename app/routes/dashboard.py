@@ -2,7 +2,7 @@
 # pyright: reportGeneralTypeIssues=false, reportOptionalMemberAccess=false, reportAttributeAccessIssue=false, reportOperatorIssue=false, reportCallIssue=false
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, case, cast, literal_column, null, union_all, Integer, String
 from sqlmodel import select
 from app.core.dependencies import get_current_user
 from app.core.database import get_session, SessionDep
@@ -12,7 +12,12 @@ from app.models.selection_session import SelectionSession
 from app.models.access_code import AccessCode
 from app.models.group_member import GroupMember
 from app.models.selection_member import SelectionMember
-from app.models.groups import Group
+from app.services.access_code_cache import invalidate_access_code
+from app.services import session_history_service
+from app.services.host_stats_service import get_host_stats
+from app.services.analytics_service import get_daily_buckets, roll_up
+from app.services.data_version import bump_data_version
+from app.services.live_events import publish_session_event, SESSION_ENDED
 from app.schemas.dashboard import (
     DashboardOverview, ActiveSessionSummary, AnalyticsData, 
     RecentExport, NotificationItem, SessionStats, UserActivity,
@@ -66,21 +71,14 @@ async def get_dashboard_stats(
         codes_res = await session.exec(access_codes_stmt)
         codes = [ac.code for ac in codes_res.all()]
 
-        # Totals
-        tg_res = await session.exec(
-            select(func.count(GroupSession.id)).where(GroupSession.host_id == current_user.id)
-        )
-        _tg = tg_res.one()
-        ts_res = await session.exec(
-            select(func.count(SelectionSession.id)).where(SelectionSession.host_id == current_user.id)
-        )
-        _ts = ts_res.one()
+        # Totals from the per-host counters row
+        host_stats = await get_host_stats(current_user.id, session)
 
         return DashboardStats(
             active_codes_total=len(codes),
             active_codes=list({*codes}),
-            total_groups=int((_tg if isinstance(_tg, (int,)) else _tg[0]) or 0),
-            total_selections=int((_ts if isinstance(_ts, (int,)) else _ts[0]) or 0),
+            total_groups=host_stats.group_sessions,
+            total_selections=host_stats.selection_sessions,
         )
     except Exception as e:
         raise HTTPException(
@@ -101,66 +99,74 @@ async def get_active_sessions(
     Get list of active sessions with participant counts and quick actions
     """
     try:
-        active_sessions = []
-        
+        now_ts = datetime.now()
+
+        # One row per unexpired session of each requested kind, newest first, limited in SQL
+        branches = []
         if session_type in [SessionType.GROUP, SessionType.ALL]:
-            # Get group sessions for this host and compute active status via access code
-            gs_rows = (await session.exec(
-                select(GroupSession).where(GroupSession.host_id == current_user.id)
-            )).all()
-            now_ts = datetime.now()
-            for gs in gs_rows:
-                ac = await session.get(AccessCode, gs.code_id)
-                if not ac:
-                    continue
-                if ac.expires_at <= now_ts:
-                    continue
-                # participant count
-                pcount = (await session.exec(
-                    select(func.count(GroupMember.id)).where(GroupMember.session_id == gs.id)
-                )).one()
-                active_sessions.append(ActiveSessionSummary(
-                    id=int(gs.id or 0),
-                    name=gs.name,
-                    type="group",
-                    access_code=ac.code,
-                    participant_count=int((pcount if isinstance(pcount, int) else pcount[0]) or 0),
-                    max_participants=None,
-                    status="active",
-                    created_at=ac.created_at,
-                    expires_at=ac.expires_at
-                ))
-        
+            branches.append(
+                select(
+                    GroupSession.id.label("id"),
+                    GroupSession.name.label("name"),
+                    literal_column("'group'", String).label("type"),
+                    AccessCode.code.label("access_code"),
+                    cast(null(), Integer).label("max_participants"),
+                    AccessCode.created_at.label("created_at"),
+                    AccessCode.expires_at.label("expires_at"),
+                )
+                .join(AccessCode, AccessCode.id == GroupSession.code_id)
+                .where(GroupSession.host_id == current_user.id, AccessCode.expires_at > now_ts)
+            )
         if session_type in [SessionType.SELECTION, SessionType.ALL]:
-            ss_rows = (await session.exec(
-                select(SelectionSession).where(SelectionSession.host_id == current_user.id)
-            )).all()
-            now_ts = datetime.now()
-            for ss in ss_rows:
-                ac = await session.get(AccessCode, ss.code_id)
-                if not ac:
-                    continue
-                if ac.expires_at <= now_ts:
-                    continue
-                pcount = (await session.exec(
-                    select(func.count(SelectionMember.id)).where(SelectionMember.selection_session_id == ss.id)
-                )).one()
-                active_sessions.append(ActiveSessionSummary(
-                    id=int(ss.id or 0),
-                    name=ss.name,
-                    type="selection",
-                    access_code=ac.code,
-                    participant_count=int((pcount if isinstance(pcount, int) else pcount[0]) or 0),
-                    max_participants=ss.max_group_size,
-                    status="active",
-                    created_at=ac.created_at,
-                    expires_at=ac.expires_at
-                ))
-        
-        # Sort by creation date (most recent first)
-        active_sessions.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return active_sessions[:limit]
+            branches.append(
+                select(
+                    SelectionSession.id.label("id"),
+                    SelectionSession.name.label("name"),
+                    literal_column("'selection'", String).label("type"),
+                    AccessCode.code.label("access_code"),
+                    SelectionSession.max_group_size.label("max_participants"),
+                    AccessCode.created_at.label("created_at"),
+                    AccessCode.expires_at.label("expires_at"),
+                )
+                .join(AccessCode, AccessCode.id == SelectionSession.code_id)
+                .where(SelectionSession.host_id == current_user.id, AccessCode.expires_at > now_ts)
+            )
+
+        page = (branches[0] if len(branches) == 1 else union_all(*branches))
+        page = page.order_by(literal_column("created_at").desc()).limit(limit).subquery("active")
+
+        # Participant counts only for the rows on the page
+        group_count = (
+            select(func.count(GroupMember.id))
+            .where(GroupMember.session_id == page.c.id)
+            .scalar_subquery()
+        )
+        selection_count = (
+            select(func.count(SelectionMember.id))
+            .where(SelectionMember.selection_session_id == page.c.id)
+            .scalar_subquery()
+        )
+        participant_count = case((page.c.type == "group", group_count), else_=selection_count)
+
+        rows = (await session.exec(
+            select(page, participant_count.label("participant_count"))
+            .order_by(page.c.created_at.desc())
+        )).all()
+
+        return [
+            ActiveSessionSummary(
+                id=int(row.id),
+                name=row.name,
+                type=row.type,
+                access_code=row.access_code,
+                participant_count=int(row.participant_count or 0),
+                max_participants=row.max_participants,
+                status="active",
+                created_at=row.created_at,
+                expires_at=row.expires_at
+            )
+            for row in rows
+        ]
         
     except Exception as e:
         raise HTTPException(
@@ -194,21 +200,42 @@ async def get_analytics_data(
             start_date = now - timedelta(days=365*3)
             date_format = "%Y"
         
-        # Session creation trends
+        # Daily buckets from the analytics service, rolled up to the period's buckets
+        days = await get_daily_buckets(current_user.id, start_date.date(), session)
+        include_group = session_type in [SessionType.GROUP, SessionType.ALL]
+        include_selection = session_type in [SessionType.SELECTION, SessionType.ALL]
+
         session_trends = []
+        for label, counts in roll_up(days, date_format):
+            group_sessions = counts["group_sessions"] if include_group else 0
+            selection_sessions = counts["selection_sessions"] if include_selection else 0
+            session_trends.append(SessionTrend(
+                date=label,
+                group_sessions=group_sessions,
+                selection_sessions=selection_sessions,
+                total_sessions=group_sessions + selection_sessions
+            ))
+
+        total_group = sum(trend.group_sessions for trend in session_trends)
+        total_selection = sum(trend.selection_sessions for trend in session_trends)
+        total_sessions = total_group + total_selection
+        total_joins = sum(
+            (counts["group_joins"] if include_group else 0) + (counts["selection_joins"] if include_selection else 0)
+            for counts in days.values()
+        )
         
         # Get session statistics
         session_stats = SessionStats(
-            total_sessions=0,
-            group_sessions=0,
-            selection_sessions=0,
+            total_sessions=total_sessions,
+            group_sessions=total_group,
+            selection_sessions=total_selection,
             completion_rate=0.0,
-            avg_participants_per_session=0.0
+            avg_participants_per_session=round(total_joins / total_sessions, 2) if total_sessions else 0.0
         )
         
         # Get participant engagement data
         participant_engagement = ParticipantEngagement(
-            total_participants=0,
+            total_participants=total_joins,
             repeat_participants=0,
             engagement_rate=0.0,
             avg_session_duration=0.0
@@ -503,39 +530,13 @@ async def get_quick_stats(
     Get quick statistics for dashboard widgets
     """
     try:
-        # Active sessions today
-        today = datetime.now().date()
-        
-        # Sessions created today
-        sessions_today_query = select(func.count()).select_from(
-            select(GroupSession.id).where(
-                and_(
-                    GroupSession.host_id == current_user.id,
-                    func.date(GroupSession.created_at) == today
-                )
-            ).union(
-                select(SelectionSession.id).where(
-                    and_(
-                        SelectionSession.host_id == current_user.id,
-                        func.date(SelectionSession.created_at) == today
-                    )
-                )
-            ).subquery()
-        )
-        
         # Participants joined today
         participants_today = 0  # Would calculate from member tables
         
         # Most popular session type
-        group_count = await session.exec(
-            select(func.count(GroupSession.id)).where(GroupSession.host_id == current_user.id)
-        )
-        selection_count = await session.exec(
-            select(func.count(SelectionSession.id)).where(SelectionSession.host_id == current_user.id)
-        )
-        
-        group_total = group_count.one()
-        selection_total = selection_count.one()
+        host_stats = await get_host_stats(current_user.id, session)
+        group_total = host_stats.group_sessions
+        selection_total = host_stats.selection_sessions
         
         most_popular_type = "group" if group_total >= selection_total else "selection"
         
@@ -647,147 +648,38 @@ async def get_session_history(
     session_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    q: Optional[str] = Query(None, description="Search by project name contains")
+    q: Optional[str] = Query(None, description="Search by project name contains"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over offset")
 ):
     """
     Get historical sessions with filtering, search and pagination
     """
     try:
-        now = datetime.now()
-        history = []
-        total_count = 0
-
-        if session_type in [SessionType.GROUP, SessionType.ALL]:
-            base_filters = [GroupSession.host_id == current_user.id]
-            if q:
-                base_filters.append(func.lower(GroupSession.name).like(f"%{q.lower()}%"))
-
-            count_stmt = (
-                select(func.count(func.distinct(GroupSession.id)))
-                .join(AccessCode, GroupSession.code_id == AccessCode.id)
-                .where(and_(*base_filters))
-            )
-            if session_status:
-                if session_status.lower() == "active":
-                    count_stmt = count_stmt.where(and_(AccessCode.status == "active", AccessCode.expires_at > now))
-                elif session_status.lower() in ("expired", "inactive"):
-                    count_stmt = count_stmt.where(or_(AccessCode.status != "active", AccessCode.expires_at <= now))
-            _res = await session.exec(count_stmt)
-            _val = _res.one()
-            total_group_count = int(_val if isinstance(_val, (int,)) else _val[0])
-            total_count += total_group_count
-
-            data_stmt = (
-                select(GroupSession, AccessCode)
-                .join(AccessCode, GroupSession.code_id == AccessCode.id)
-                .where(and_(*base_filters))
-                .order_by(AccessCode.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-            if session_status:
-                if session_status.lower() == "active":
-                    data_stmt = data_stmt.where(and_(AccessCode.status == "active", AccessCode.expires_at > now))
-                elif session_status.lower() in ("expired", "inactive"):
-                    data_stmt = data_stmt.where(or_(AccessCode.status != "active", AccessCode.expires_at <= now))
-
-            group_rows = (await session.exec(data_stmt)).all()
-            for gs, ac in group_rows:
-                # participant count per session (simple count)
-                _pc_res = await session.exec(select(func.count(GroupMember.id)).where(GroupMember.session_id == gs.id))
-                _pc = _pc_res.one()
-                p_count = int((_pc if isinstance(_pc, (int,)) else _pc[0]) or 0)
-                # groups created per session
-                _gc_res = await session.exec(select(func.count(Group.id)).where(Group.session_id == gs.id))
-                _gc = _gc_res.one()
-                g_created = int((_gc if isinstance(_gc, (int,)) else _gc[0]) or 0)
-                computed_status = "active" if (ac.status == "active" and ac.expires_at > now) else "expired"
-                history.append({
-                    "id": gs.id,
-                    "name": gs.name,
-                    "type": "group",
-                    "status": computed_status,
-                    "participant_count": int(p_count or 0),
-                    "created_at": ac.created_at,
-                    "expires_at": ac.expires_at,
-                    "max_group_size": gs.max_group_size,
-                    "access_code": ac.code,
-                    "group_created": int(g_created or 0)
-                })
-
-        if session_type in [SessionType.SELECTION, SessionType.ALL]:
-            base_filters = [SelectionSession.host_id == current_user.id]
-            if q:
-                base_filters.append(func.lower(SelectionSession.name).like(f"%{q.lower()}%"))
-
-            count_stmt = (
-                select(func.count(func.distinct(SelectionSession.id)))
-                .join(AccessCode, SelectionSession.code_id == AccessCode.id)
-                .where(and_(*base_filters))
-            )
-            if session_status:
-                if session_status.lower() == "active":
-                    count_stmt = count_stmt.where(and_(AccessCode.status == "active", AccessCode.expires_at > now))
-                elif session_status.lower() in ("expired", "inactive"):
-                    count_stmt = count_stmt.where(or_(AccessCode.status != "active", AccessCode.expires_at <= now))
-            _sres = await session.exec(count_stmt)
-            _sval = _sres.one()
-            total_sel_count = int(_sval if isinstance(_sval, (int,)) else _sval[0])
-            total_count += total_sel_count
-
-            data_stmt = (
-                select(SelectionSession, AccessCode)
-                .join(AccessCode, SelectionSession.code_id == AccessCode.id)
-                .where(and_(*base_filters))
-                .order_by(AccessCode.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-            if session_status:
-                if session_status.lower() == "active":
-                    data_stmt = data_stmt.where(and_(AccessCode.status == "active", AccessCode.expires_at > now))
-                elif session_status.lower() in ("expired", "inactive"):
-                    data_stmt = data_stmt.where(or_(AccessCode.status != "active", AccessCode.expires_at <= now))
-
-            sel_rows = (await session.exec(data_stmt)).all()
-            for ss, ac in sel_rows:
-                # participant count per selection session
-                _part_res = await session.exec(select(func.count(SelectionMember.id)).where(SelectionMember.selection_session_id == ss.id))
-                _part = _part_res.one()
-                participant_count = int((_part if isinstance(_part, (int,)) else _part[0]) or 0)
-                # selected members count
-                _sel_res = await session.exec(select(func.count(SelectionMember.id)).where(
-                    SelectionMember.selection_session_id == ss.id,
-                    SelectionMember.selected == True
-                ))
-                _sel = _sel_res.one()
-                selected_cnt = int((_sel if isinstance(_sel, (int,)) else _sel[0]) or 0)
-                computed_status = "active" if (ac.status == "active" and ac.expires_at > now) else "expired"
-                history.append({
-                    "id": ss.id,
-                    "name": ss.name,
-                    "type": "selection",
-                    "status": computed_status,
-                    "participant_count": int(participant_count or 0),
-                    "created_at": ac.created_at,
-                    "expires_at": ac.expires_at,
-                    "max_group_size": ss.max_group_size,
-                    "access_code": ac.code,
-                    "selected": int(selected_cnt or 0)
-                })
-
-        history.sort(key=lambda x: x["created_at"], reverse=True)
+        page = await session_history_service.get_session_history(
+            host_id=current_user.id,
+            include_group=session_type in [SessionType.GROUP, SessionType.ALL],
+            include_selection=session_type in [SessionType.SELECTION, SessionType.ALL],
+            session_status=session_status,
+            q=q,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            db=session
+        )
         return {
-            "sessions": history,
-            "total_count": total_count,
+            "sessions": page["sessions"],
+            "total_count": page["total_count"],
             "offset": offset,
             "limit": limit,
+            "next_cursor": page["next_cursor"],
             "filters": {
                 "session_type": session_type.value,
                 "status": session_status,
                 "q": q
             }
         }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -804,6 +696,7 @@ async def end_session(
     """
     End/deactivate a session early
     """
+    ended_code = None
     try:
         if session_type.lower() == "group":
             # Get and verify group session
@@ -817,12 +710,14 @@ async def end_session(
             # Update session status
             group_session.status = "ended"
             session.add(group_session)
+            await bump_data_version("group", session_id, session)
             
             # Expire the access code
             access_code = await session.get(AccessCode, group_session.code_id)
             if access_code:
                 access_code.expires_at = datetime.now()
                 session.add(access_code)
+                ended_code = access_code.code
             
         elif session_type.lower() == "selection":
             # Get and verify selection session
@@ -833,13 +728,19 @@ async def end_session(
                     detail="Session not found or access denied"
                 )
             
+            await bump_data_version("selection", session_id, session)
+            
             # Expire the access code
             access_code = await session.get(AccessCode, selection_session.code_id)
             if access_code:
                 access_code.expires_at = datetime.now()
                 session.add(access_code)
+                ended_code = access_code.code
         
         await session.commit()
+        if ended_code:
+            await invalidate_access_code(ended_code)
+        publish_session_event(session_type.lower(), session_id, SESSION_ENDED)
         
         return {
             "message": f"Session {session_id} has been ended successfully",
@@ -1,5 +1,5 @@
 # app/routes/export.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 import os
@@ -9,14 +9,22 @@ from app.core.database import get_session
 from app.models.user import User
 from app.services.export_service import (
     validate_host_access, 
-    generate_excel_for_session, 
-    generate_pdf_for_session
+    record_export
 )
-from app.utils.file_saver import save_export_file
-from app.utils.export_helpers import process_file_export
-from app.schemas.export import ExportOptions, ExportUrls
-from typing import Optional
+from app.utils.export_helpers import process_file_export, stream_file_export
+from app.services.export_stream import write_excel_stream, iter_file_and_remove, get_session_meta
+from app.services.export_tabular import field_columns, iter_csv, iter_parquet
+from app.services.export_bulk import EXPORT_BULK_MAX_SESSIONS, iter_bulk_zip
+from app.services.session_history_service import find_host_sessions
+from app.routes.dashboard import SessionType
+from app.services.export_pool import ExportPoolBusy, export_pool_metrics
+from app.services.export_jobs import enqueue_export, get_export_job, list_export_jobs, load_export_job_file
+from app.services.export_cache import export_etag, etag_matches, load_or_render_export
+from app.services.data_version import get_data_version
+from app.schemas.export import ExportJobRequest, ExportJobStatus
+from typing import List, Optional
 from io import BytesIO
+from datetime import datetime
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
@@ -122,6 +130,86 @@ async def check_export_directories(current_user: User = Depends(get_current_user
     }
 
 
+@router.get("/metrics")
+async def get_export_metrics(current_user: User = Depends(get_current_user)):
+    """Render pool queue depth, in-flight renders and totals for this worker"""
+    return export_pool_metrics()
+
+
+@router.post("/jobs", response_model=ExportJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    request: ExportJobRequest,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Queue an export to be rendered in the background; poll GET /jobs/{job_id} for the download URL."""
+    if request.session_type not in ["group", "selection"]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid session type. Use 'group' or 'selection'")
+    if request.format not in ["excel", "pdf"]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid format specified. Use 'excel' or 'pdf'")
+
+    is_valid = await validate_host_access(
+        session_id=request.session_id,
+        session_type=request.session_type,
+        host_id=current_user.id,
+        access_code=request.access_code,
+        db=session
+    )
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this session or the access code is invalid"
+        )
+
+    try:
+        return await enqueue_export(
+            host_id=current_user.id,
+            session_type=request.session_type,
+            session_id=request.session_id,
+            export_format=request.format,
+            save_directory=EXCEL_EXPORTS_DIR if request.format == "excel" else PDF_EXPORTS_DIR,
+            db=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/jobs", response_model=List[ExportJobStatus])
+async def get_export_jobs(current_user: User = Depends(get_current_user)):
+    """The current user's recent export jobs, newest first"""
+    return list_export_jobs(current_user.id)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobStatus)
+async def get_export_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    """Poll a background export"""
+    try:
+        return get_export_job(job_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Download the file of a finished background export"""
+    try:
+        data, metadata, job = await load_export_job_file(job_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    extension, media_type, save_directory = EXPORT_KINDS[job["format"]]
+    response, _ = process_file_export(
+        file_buffer=BytesIO(data),
+        session_type=job["session_type"],
+        session_id=job["session_id"],
+        metadata=metadata,
+        file_extension=extension,
+        media_type=media_type,
+        save_directory=save_directory,
+        host_info={"id": current_user.id, "email": current_user.email}
+    )
+    return response
+
+
 @router.get("/download/{file_name}")
 async def download_export_file(
     file_name: str,
@@ -157,12 +245,202 @@ async def download_export_file(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to download file: {str(e)}")
 
 
+async def _excel_stream_response(
+    session_id: int,
+    session_type: str,
+    access_code: str,
+    current_user: User,
+    session: AsyncSession
+):
+    is_valid = await validate_host_access(
+        session_id=session_id,
+        session_type=session_type,
+        host_id=current_user.id,
+        access_code=access_code,
+        db=session
+    )
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this session or the access code is invalid"
+        )
+    
+    path = None
+    try:
+        # Workbook is written to a temporary file and sent in chunks; the file is removed after sending
+        path, metadata = await write_excel_stream(session_id, session_type, session)
+        response, _ = stream_file_export(
+            chunks=iter_file_and_remove(path),
+            session_type=session_type,
+            session_id=session_id,
+            metadata=metadata,
+            file_extension="xlsx",
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        await record_export(current_user.id, session)
+        
+        return response
+        
+    except Exception as e:
+        # The response never went out, so nothing else will remove the workbook
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate Excel file: {str(e)}"
+        )
+
+
+TABULAR_FORMATS = {
+    "csv": ("csv", "text/csv; charset=utf-8", iter_csv),
+    "parquet": ("parquet", "application/vnd.apache.parquet", iter_parquet),
+}
+
+
+async def _tabular_stream_response(
+    session_id: int,
+    session_type: str,
+    export_format: str,
+    access_code: str,
+    current_user: User,
+    session: AsyncSession
+):
+    is_valid = await validate_host_access(
+        session_id=session_id,
+        session_type=session_type,
+        host_id=current_user.id,
+        access_code=access_code,
+        db=session
+    )
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this session or the access code is invalid"
+        )
+    
+    extension, media_type, iter_rows = TABULAR_FORMATS[export_format]
+    try:
+        # Raw member rows, one column per field; rows are read from a cursor while sending
+        meta = await get_session_meta(session_id, session_type, session)
+        columns = await field_columns(session_id, session_type, session)
+        response, _ = stream_file_export(
+            chunks=iter_rows(session_id, session_type, columns),
+            session_type=session_type,
+            session_id=session_id,
+            metadata={"session_name": meta["session"].name, "session_description": meta["session"].description},
+            file_extension=extension,
+            media_type=media_type
+        )
+        await record_export(current_user.id, session)
+        
+        return response
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate {export_format.upper()} file: {str(e)}"
+        )
+
+
+EXPORT_KINDS = {
+    "excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", EXCEL_EXPORTS_DIR),
+    "pdf": ("pdf", "application/pdf", PDF_EXPORTS_DIR),
+}
+
+
+async def _cached_file_export(
+    session_id: int,
+    session_type: str,
+    export_format: str,
+    if_none_match: Optional[str],
+    current_user: User,
+    session: AsyncSession
+) -> Response:
+    """Serve an export keyed on the session's data version.
+
+    Answers 304 when the client already has this version, serves the on-disk cache when
+    another request rendered it, and renders only when the session changed.
+    """
+    extension, media_type, save_directory = EXPORT_KINDS[export_format]
+    version = await get_data_version(session_type, session_id, session) or 0
+    etag = export_etag(session_type, session_id, export_format, version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    data, metadata = await load_or_render_export(session_id, session_type, export_format, version, save_directory, session)
+
+    # Process the export using our helper
+    response, _ = process_file_export(
+        file_buffer=BytesIO(data),
+        session_type=session_type,
+        session_id=session_id,
+        metadata=metadata,
+        file_extension=extension,
+        media_type=media_type,
+        save_directory=save_directory,
+        host_info={"id": current_user.id, "email": current_user.email}
+    )
+    response.headers["ETag"] = etag
+    # Let browsers keep the file but revalidate it with If-None-Match
+    response.headers["Cache-Control"] = "private, no-cache"
+    await record_export(current_user.id, session)
+    return response
+
+
+@router.get("/bulk")
+async def export_sessions_bulk(
+    format: str = Query("excel", description="Format of each file in the archive: 'excel' or 'pdf'"),
+    session_type: SessionType = Query(SessionType.ALL),
+    session_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    q: Optional[str] = Query(None, description="Search by project name contains"),
+    limit: int = Query(EXPORT_BULK_MAX_SESSIONS, ge=1, le=EXPORT_BULK_MAX_SESSIONS),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export every session matching the /sessions/history filters as one streamed ZIP archive.
+
+    Only the current user's sessions are matched, so no access code is needed per session.
+    """
+    if format not in EXPORT_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid format specified. Use 'excel' or 'pdf'"
+        )
+    
+    sessions = await find_host_sessions(
+        host_id=current_user.id,
+        include_group=session_type in [SessionType.GROUP, SessionType.ALL],
+        include_selection=session_type in [SessionType.SELECTION, SessionType.ALL],
+        session_status=session_status,
+        q=q,
+        limit=limit,
+        db=session
+    )
+    if not sessions:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No sessions match the filters")
+    
+    _, _, save_directory = EXPORT_KINDS[format]
+    filename = f"sessions_{format}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    await record_export(current_user.id, session)
+    return StreamingResponse(
+        iter_bulk_zip(sessions, format, save_directory),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.get("/group-session/{session_id}/excel")
 async def export_group_session_excel(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Export group session data as Excel file. Only the host can export their own sessions."""
     # Validate host has permission to access this session
@@ -181,28 +459,10 @@ async def export_group_session_excel(
         )
     
     try:
-        # Generate the Excel file
-        file_buffer, metadata = await generate_excel_for_session(
-            session_id, 
-            "group", 
-            session,
-            save_to_disk=False  # We'll handle saving manually
-        )
-        
-        # Process the export using our helper
-        response, _ = process_file_export(
-            file_buffer=file_buffer,
-            session_type="group",
-            session_id=session_id,
-            metadata=metadata,
-            file_extension="xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            save_directory=EXCEL_EXPORTS_DIR,
-            host_info={"id": current_user.id, "email": current_user.email}
-        )
-        
-        return response
+        return await _cached_file_export(session_id, "group", "excel", if_none_match, current_user, session)
         
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -210,12 +470,46 @@ async def export_group_session_excel(
         )
 
 
+@router.get("/group-session/{session_id}/excel/stream")
+async def export_group_session_excel_stream(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export group session data as Excel with bounded memory, for very large sessions."""
+    return await _excel_stream_response(session_id, "group", access_code, current_user, session)
+
+
+@router.get("/group-session/{session_id}/csv")
+async def export_group_session_csv(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export group session members as CSV, streamed from the database, for analytics use."""
+    return await _tabular_stream_response(session_id, "group", "csv", access_code, current_user, session)
+
+
+@router.get("/group-session/{session_id}/parquet")
+async def export_group_session_parquet(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export group session members as Parquet, streamed from the database, for analytics use."""
+    return await _tabular_stream_response(session_id, "group", "parquet", access_code, current_user, session)
+
+
 @router.get("/group-session/{session_id}/pdf")
 async def export_group_session_pdf(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Export group session data as PDF file. Only the host can export their own sessions."""
     # Validate host has permission to access this session
@@ -234,28 +528,10 @@ async def export_group_session_pdf(
         )
     
     try:
-        # Generate the PDF file
-        file_buffer, metadata = await generate_pdf_for_session(
-            session_id, 
-            "group", 
-            session,
-            save_to_disk=False  # We'll handle saving manually
-        )
-        
-        # Process the export using our helper
-        response, _ = process_file_export(
-            file_buffer=file_buffer,
-            session_type="group",
-            session_id=session_id,
-            metadata=metadata,
-            file_extension="pdf",
-            media_type="application/pdf",
-            save_directory=PDF_EXPORTS_DIR,
-            host_info={"id": current_user.id, "email": current_user.email}
-        )
-        
-        return response
+        return await _cached_file_export(session_id, "group", "pdf", if_none_match, current_user, session)
         
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -268,7 +544,8 @@ async def export_selection_session_excel(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Export selection session data as Excel file. Only the host can export their own sessions."""
     # Validate host has permission to access this session
@@ -287,28 +564,10 @@ async def export_selection_session_excel(
         )
     
     try:
-        # Generate the Excel file
-        file_buffer, metadata = await generate_excel_for_session(
-            session_id, 
-            "selection", 
-            session,
-            save_to_disk=False  # We'll handle saving manually
-        )
-        
-        # Process the export using our helper
-        response, _ = process_file_export(
-            file_buffer=file_buffer,
-            session_type="selection",
-            session_id=session_id,
-            metadata=metadata,
-            file_extension="xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            save_directory=EXCEL_EXPORTS_DIR,
-            host_info={"id": current_user.id, "email": current_user.email}
-        )
-        
-        return response
+        return await _cached_file_export(session_id, "selection", "excel", if_none_match, current_user, session)
         
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -316,12 +575,46 @@ async def export_selection_session_excel(
         )
 
 
+@router.get("/selection-session/{session_id}/excel/stream")
+async def export_selection_session_excel_stream(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export selection session data as Excel with bounded memory, for very large sessions."""
+    return await _excel_stream_response(session_id, "selection", access_code, current_user, session)
+
+
+@router.get("/selection-session/{session_id}/csv")
+async def export_selection_session_csv(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export selection session members as CSV, streamed from the database, for analytics use."""
+    return await _tabular_stream_response(session_id, "selection", "csv", access_code, current_user, session)
+
+
+@router.get("/selection-session/{session_id}/parquet")
+async def export_selection_session_parquet(
+    session_id: int,
+    access_code: str = Query(..., description="Access code for the session"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Export selection session members as Parquet, streamed from the database, for analytics use."""
+    return await _tabular_stream_response(session_id, "selection", "parquet", access_code, current_user, session)
+
+
 @router.get("/selection-session/{session_id}/pdf")
 async def export_selection_session_pdf(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Export selection session data as PDF file. Only the host can export their own sessions."""
     # Validate host has permission to access this session
@@ -340,28 +633,10 @@ async def export_selection_session_pdf(
         )
     
     try:
-        # Generate the PDF file
-        file_buffer, metadata = await generate_pdf_for_session(
-            session_id, 
-            "selection", 
-            session,
-            save_to_disk=False  # We'll handle saving manually
-        )
-        
-        # Process the export using our helper
-        response, _ = process_file_export(
-            file_buffer=file_buffer,
-            session_type="selection",
-            session_id=session_id,
-            metadata=metadata,
-            file_extension="pdf",
-            media_type="application/pdf",
-            save_directory=PDF_EXPORTS_DIR,
-            host_info={"id": current_user.id, "email": current_user.email}
-        )
-        
-        return response
+        return await _cached_file_export(session_id, "selection", "pdf", if_none_match, current_user, session)
         
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -372,15 +647,15 @@ async def export_selection_session_pdf(
 async def export_selection_session_options(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
-    format: str = Query(..., description="Format of the export: 'excel', 'pdf', or 'both'"),
+    format: str = Query(..., description="Format of the export: 'excel', 'pdf', 'csv', 'parquet', or 'both'"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Export selection session data in chosen format(s). Only the host can export their own sessions."""
-    if format not in ["excel", "pdf", "both"]:
+    if format not in ["excel", "pdf", "csv", "parquet", "both"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid format specified. Use 'excel', 'pdf', or 'both'"
+            detail="Invalid format specified. Use 'excel', 'pdf', 'csv', 'parquet', or 'both'"
         )
     
     # For 'both' format, redirect to individual endpoints
@@ -392,25 +667,29 @@ async def export_selection_session_options(
         }
     
     # For specific formats, redirect to the appropriate endpoint
+    if format == "csv":
+        return await export_selection_session_csv(session_id, access_code, current_user, session)
+    if format == "parquet":
+        return await export_selection_session_parquet(session_id, access_code, current_user, session)
     if format == "excel":
-        return await export_selection_session_excel(session_id, access_code, current_user, session)
+        return await export_selection_session_excel(session_id, access_code, current_user, session, if_none_match=None)
     else:  # pdf
-        return await export_selection_session_pdf(session_id, access_code, current_user, session)
+        return await export_selection_session_pdf(session_id, access_code, current_user, session, if_none_match=None)
 
 
 @router.get("/group-session/{session_id}")
 async def export_group_session_options(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
-    format: str = Query(..., description="Format of the export: 'excel', 'pdf', or 'both'"),
+    format: str = Query(..., description="Format of the export: 'excel', 'pdf', 'csv', 'parquet', or 'both'"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Export group session data in chosen format(s). Only the host can export their own sessions."""
-    if format not in ["excel", "pdf", "both"]:
+    if format not in ["excel", "pdf", "csv", "parquet", "both"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid format specified. Use 'excel', 'pdf', or 'both'"
+            detail="Invalid format specified. Use 'excel', 'pdf', 'csv', 'parquet', or 'both'"
         )
     
     # For 'both' format, redirect to individual endpoints
@@ -422,7 +701,11 @@ async def export_group_session_options(
         }
     
     # For specific formats, redirect to the appropriate endpoint
+    if format == "csv":
+        return await export_group_session_csv(session_id, access_code, current_user, session)
+    if format == "parquet":
+        return await export_group_session_parquet(session_id, access_code, current_user, session)
     if format == "excel":
-        return await export_group_session_excel(session_id, access_code, current_user, session)
+        return await export_group_session_excel(session_id, access_code, current_user, session, if_none_match=None)
     else:  # pdf
-        return await export_group_session_pdf(session_id, access_code, current_user, session)
+        return await export_group_session_pdf(session_id, access_code, current_user, session, if_none_match=None)
@@ -5,7 +5,10 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.database import SessionDep
 from app.core.dependencies import get_current_user
 from app.models.user import User
-from app.routes.export import export_selection_session_excel, export_selection_session_pdf, export_group_session_excel, export_group_session_pdf
+from app.routes.export import (
+    export_selection_session_excel, export_selection_session_pdf, export_selection_session_csv, export_selection_session_parquet,
+    export_group_session_excel, export_group_session_pdf, export_group_session_csv, export_group_session_parquet
+)
 
 router = APIRouter()
 
@@ -13,15 +16,15 @@ router = APIRouter()
 async def export_selection_session_options(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
-    format: str = Query(..., description="Format of the export: 'excel', 'pdf', or 'both'"),
+    format: str = Query(..., description="Format of the export: 'excel', 'pdf', 'csv', 'parquet', or 'both'"),
     session: SessionDep = Depends(),
     current_user: User = Depends(get_current_user)
 ):
     """Export selection session data in chosen format(s). Only the host can export their own sessions."""
-    if format not in ["excel", "pdf", "both"]:
+    if format not in ["excel", "pdf", "csv", "parquet", "both"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid format specified. Use 'excel', 'pdf', or 'both'"
+            detail="Invalid format specified. Use 'excel', 'pdf', 'csv', 'parquet', or 'both'"
         )
     
     # For 'both' format, redirect to individual endpoints
@@ -33,25 +36,29 @@ async def export_selection_session_options(
         }
     
     # For specific formats, redirect to the appropriate endpoint
+    if format == "csv":
+        return await export_selection_session_csv(session_id, access_code, current_user=current_user, session=session)
+    if format == "parquet":
+        return await export_selection_session_parquet(session_id, access_code, current_user=current_user, session=session)
     if format == "excel":
-        return await export_selection_session_excel(session_id, access_code, session, current_user)
+        return await export_selection_session_excel(session_id, access_code, current_user=current_user, session=session, if_none_match=None)
     else:  # pdf
-        return await export_selection_session_pdf(session_id, access_code, session, current_user)
+        return await export_selection_session_pdf(session_id, access_code, current_user=current_user, session=session, if_none_match=None)
 
 
 @router.get("/group-session/{session_id}")
 async def export_group_session_options(
     session_id: int,
     access_code: str = Query(..., description="Access code for the session"),
-    format: str = Query(..., description="Format of the export: 'excel', 'pdf', or 'both'"),
+    format: str = Query(..., description="Format of the export: 'excel', 'pdf', 'csv', 'parquet', or 'both'"),
     session: SessionDep = Depends(),
     current_user: User = Depends(get_current_user)
 ):
     """Export group session data in chosen format(s). Only the host can export their own sessions."""
-    if format not in ["excel", "pdf", "both"]:
+    if format not in ["excel", "pdf", "csv", "parquet", "both"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid format specified. Use 'excel', 'pdf', or 'both'"
+            detail="Invalid format specified. Use 'excel', 'pdf', 'csv', 'parquet', or 'both'"
         )
     
     # For 'both' format, redirect to individual endpoints
@@ -63,7 +70,11 @@ async def export_group_session_options(
         }
     
     # For specific formats, redirect to the appropriate endpoint
+    if format == "csv":
+        return await export_group_session_csv(session_id, access_code, current_user=current_user, session=session)
+    if format == "parquet":
+        return await export_group_session_parquet(session_id, access_code, current_user=current_user, session=session)
     if format == "excel":
-        return await export_group_session_excel(session_id, access_code, session, current_user)
+        return await export_group_session_excel(session_id, access_code, current_user=current_user, session=session, if_none_match=None)
     else:  # pdf
-        return await export_group_session_pdf(session_id, access_code, session, current_user)
+        return await export_group_session_pdf(session_id, access_code, current_user=current_user, session=session, if_none_match=None)
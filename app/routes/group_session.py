@@ -1,13 +1,20 @@
 # app/routes/group_session.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.schemas.group_session import GroupSessionCreate, GroupSessionRead
 from app.services.group_session_service import create_group_session
 from app.core.dependencies import get_current_user
-from app.core.database import get_session, SessionDep
+from app.core.database import get_session, SessionDep, async_session
 from app.models.user import User
-from app.services.group_session_service import validate_code_and_get_fields, join_group
+from app.services.group_session_service import validate_code_and_get_fields, join_group, join_group_batch, solve_group_session
+from app.services.group_session_service import reveal_group_session
+from app.services.group_reveal import open_reveal_stream, reveal_event_id, resolve_reveal_member
 from app.schemas.group_session import GroupJoinRequest, GroupJoinResponse
+from app.schemas.group_session import GroupBatchJoinRequest, GroupBatchJoinResponse
+from app.schemas.group_session import GroupSolveRequest, GroupSolveResponse
+from app.schemas.group_session import GroupRevealRequest, GroupRevealResponse
 from app.schemas.group_session import MessageResponse
 
 
@@ -48,3 +55,101 @@ async def join_group_with_code(payload: GroupJoinRequest, session: SessionDep):
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/join/batch", response_model=GroupBatchJoinResponse)
+async def join_group_batch_with_code(
+    payload: GroupBatchJoinRequest,
+    session: SessionDep,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add a whole roster to a group session in one request.
+    Only the host who created the session can perform this operation.
+    """
+    try:
+        return await join_group_batch(
+            code=payload.code,
+            members=payload.members,
+            host_id=current_user.id,
+            session=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/solve", response_model=GroupSolveResponse)
+async def solve_group_assignment_for_code(
+    payload: GroupSolveRequest,
+    session: SessionDep,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Compute a balanced assignment of all current members that satisfies group capacity and
+    every preferential rule, optionally applying it. Reports why when no assignment exists.
+    Only the host who created the session can perform this operation.
+    """
+    try:
+        return await solve_group_session(
+            code=payload.code,
+            host_id=current_user.id,
+            apply=payload.apply,
+            session=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/reveal", response_model=GroupRevealResponse)
+async def reveal_groups_for_code(
+    payload: GroupRevealRequest,
+    session: SessionDep,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reveal every member's group. Participants connected to /reveal/stream receive theirs
+    immediately; members who join afterwards see their group in the join response.
+    Only the host who created the session can perform this operation.
+    """
+    try:
+        return await reveal_group_session(
+            code=payload.code,
+            host_id=current_user.id,
+            session=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/reveal/stream")
+async def stream_group_reveal(
+    code: str,
+    member_identifier: str,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events stream for a participant waiting for the host to reveal groups.
+    Sends heartbeat comments while waiting and ends after one "reveal" event with the
+    participant's group. A reconnect that already received it (Last-Event-ID) gets 204,
+    which tells EventSource to stop reconnecting.
+    """
+    # Short-lived DB session: the stream may stay open for a long time and holds none
+    try:
+        async with async_session() as db:
+            session_id, session_name = await resolve_reveal_member(code, member_identifier, db)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if last_event_id == reveal_event_id(session_id):
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    # Subscribe before responding: a broadcast failure is a 503, not a stream that never ends
+    try:
+        stream = await open_reveal_stream(session_id, session_name, member_identifier)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Reveal notifications are unavailable: {e}")
+
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,61 +1,107 @@
 # app/routes/realtime.py
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlmodel.ext.asyncio.session import AsyncSession
-from app.core.dependencies import get_current_user
-from app.core.database import get_session, SessionDep
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from app.core.dependencies import AUTH_COOKIE_NAME, get_current_user, user_from_token
+from app.core.database import SessionDep, async_session
+from app.core.broadcast import broadcast, Subscription, user_channel, session_channel
+from app.services.live_events import get_session_snapshot
 from app.models.user import User
-from typing import List
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from sqlmodel import select
+from typing import Optional
 import json
 import asyncio
 from datetime import datetime
 
 router = APIRouter(prefix="/api/realtime", tags=["Real-time"])
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.user_connections: dict = {}  # user_id -> websocket
-
-    async def connect(self, websocket: WebSocket, user_id: int):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        self.user_connections[user_id] = websocket
-
-    def disconnect(self, websocket: WebSocket, user_id: int):
-        self.active_connections.remove(websocket)
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
-
-    async def send_personal_message(self, message: str, user_id: int):
-        if user_id in self.user_connections:
-            try:
-                await self.user_connections[user_id].send_text(message)
-            except:
-                # Connection closed, remove it
-                if user_id in self.user_connections:
-                    del self.user_connections[user_id]
-
-    async def broadcast(self, message: str):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
-            if connection in self.active_connections:
-                self.active_connections.remove(connection)
+async def _forward(websocket: WebSocket, subscription: Subscription):
+    """Send every message published to the subscription's channels to this socket"""
+    while True:
+        _, message = await subscription.get()
+        await websocket.send_text(message)
+
+
+async def _authenticate(websocket: WebSocket) -> Optional[int]:
+    """Id of the user the socket's token (query parameter "token" or the auth cookie) belongs to"""
+    token = websocket.query_params.get("token") or websocket.cookies.get(AUTH_COOKIE_NAME)
+    try:
+        async with async_session() as db:
+            user = await user_from_token(token, db)
+    except HTTPException:
+        return None
+    return user.id
+
+
+async def _session_snapshot(user_id: int, session_type: str, session_id: int) -> Optional[dict]:
+    """Counts of a session the user hosts, or None if it is not theirs"""
+    model = {"group": GroupSession, "selection": SelectionSession}.get(session_type)
+    if model is None:
+        return None
+    async with async_session() as db:
+        host_id = (await db.exec(select(model.host_id).where(model.id == session_id))).first()
+        if host_id != user_id:
+            return None
+        return await get_session_snapshot(session_type, session_id, db)
+
+
+async def _handle_command(websocket: WebSocket, subscription: Subscription, user_id: int, data: str):
+    """{"action": "subscribe"|"unsubscribe", "session_type": ..., "session_id": ...}"""
+    try:
+        command = json.loads(data)
+        action = command["action"]
+        session_type = command["session_type"]
+        session_id = int(command["session_id"])
+    except (ValueError, KeyError, TypeError):
+        await websocket.send_text(json.dumps({"type": "error", "data": {"message": "Invalid command"}}))
+        return
+
+    channel = session_channel(session_type, session_id)
+    if action == "subscribe":
+        # Subscribe before reading the snapshot: a change racing the two may be counted
+        # twice but is never missed
+        await subscription.subscribe(channel)
+        snapshot = await _session_snapshot(user_id, session_type, session_id)
+        if snapshot is None:
+            await subscription.unsubscribe(channel)
+            await websocket.send_text(json.dumps({"type": "error", "data": {"message": "Session not found or access denied"}}))
+            return
+        await websocket.send_text(json.dumps({
+            "type": "session_snapshot",
+            "timestamp": datetime.now().isoformat(),
+            "data": {"session_type": session_type, "session_id": session_id, **snapshot}
+        }))
+    elif action == "unsubscribe":
+        await subscription.unsubscribe(channel)
+    else:
+        await websocket.send_text(json.dumps({"type": "error", "data": {"message": f"Unknown action: {action}"}}))
+        return
+    await websocket.send_text(json.dumps({"type": f"{action}d", "data": {"channel": channel}}))
 
-manager = ConnectionManager()
 
 @router.websocket("/dashboard/{user_id}")
 async def websocket_dashboard_updates(websocket: WebSocket, user_id: int):
     """
     WebSocket endpoint for real-time dashboard updates
+
+    Every socket gets its own subscription to the user's channel, so several tabs of the same
+    user all receive notifications, from whichever worker published them. Send
+    {"action": "subscribe", "session_type": "group", "session_id": 1} to also follow a session:
+    the reply is a "session_snapshot" with its current counts, followed by batched
+    "session_events" (typed events plus a counts_delta) whenever members join or are
+    selected, so the dashboard does not need to poll.
+
+    Authenticate with the auth cookie or a "token" query parameter holding the access
+    token; the socket is closed unless it belongs to user_id.
     """
-    await manager.connect(websocket, user_id)
+    host_id = await _authenticate(websocket)
+    if host_id is None or host_id != user_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = broadcast.subscription()
+    await subscription.subscribe(user_channel(host_id))
+    sender = asyncio.create_task(_forward(websocket, subscription))
     try:
         while True:
             # Keep connection alive and listen for any client messages
@@ -64,21 +110,22 @@ async def websocket_dashboard_updates(websocket: WebSocket, user_id: int):
             # Handle ping/pong for connection health
             if data == "ping":
                 await websocket.send_text("pong")
-            
-            # Send periodic updates (every 30 seconds)
-            await asyncio.sleep(30)
-            update_message = {
-                "type": "dashboard_update",
-                "timestamp": datetime.now().isoformat(),
-                "data": {
-                    "message": "Dashboard data refreshed",
-                    "user_id": user_id
-                }
-            }
-            await websocket.send_text(json.dumps(update_message))
-            
+            elif data.startswith("{"):
+                await _handle_command(websocket, subscription, host_id, data)
+
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_id)
+        pass
+    finally:
+        sender.cancel()
+        await subscription.close()
+
+
+async def publish_notification(notification: dict, host_id: int, session_type: str, session_id: int):
+    """Publish to the host's sockets and to sockets following the session, on every worker"""
+    message = json.dumps(notification)
+    await broadcast.publish(user_channel(host_id), message)
+    await broadcast.publish(session_channel(session_type, session_id), message)
+
 
 @router.post("/notify/participant-joined")
 async def notify_participant_joined(
@@ -104,10 +151,7 @@ async def notify_participant_joined(
         }
         
         # Send notification to the session host
-        await manager.send_personal_message(
-            json.dumps(notification), 
-            current_user.id
-        )
+        await publish_notification(notification, current_user.id, session_type, session_id)
         
         return {"message": "Notification sent successfully"}
         
@@ -141,10 +185,7 @@ async def notify_session_completed(
         }
         
         # Send notification to the session host
-        await manager.send_personal_message(
-            json.dumps(notification), 
-            current_user.id
-        )
+        await publish_notification(notification, current_user.id, session_type, session_id)
         
         return {"message": "Session completion notification sent"}
         
@@ -2,10 +2,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.schemas.selection_session import SelectionJoinRequest, SelectionSessionCreate, SelectionSessionRead, SelectionJoinResponse
-from app.schemas.selection import SelectMembersRequest, SelectionResult, MemberSelectionDetail
+from app.schemas.selection import SelectMembersRequest, SelectionResult, MemberSelectionDetail, SelectionReplay
 from app.services.selection_service import (
     create_selection_session, validate_code_and_get_fields, join_group,
-    select_members, get_selected_members, clear_selections
+    select_members, get_selected_members, clear_selections, replay_selection_draw
 )
 from app.core.dependencies import get_current_user
 from app.core.database import get_session, SessionDep
@@ -83,6 +83,24 @@ async def get_all_selected_members(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.get("/draws/{draw_id}/replay", response_model=SelectionReplay)
+async def replay_member_selection(
+    draw_id: int,
+    code: str,
+    session: SessionDep,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Recompute a past selection draw from its stored seed and inputs and report whether it
+    reproduces the recorded result.
+    Only the host who created the session can perform this operation.
+    """
+    try:
+        return await replay_selection_draw(code, draw_id, current_user.id, session)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/clear")
 async def clear_all_selections(
     code: str,
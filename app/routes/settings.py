@@ -1,7 +1,8 @@
 # app/routes/settings.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, invalidate_user_cache
+from app.services.host_stats_service import get_host_stats
 from app.core.database import get_session, SessionDep
 from app.models.user import User
 from app.schemas.settings import (
@@ -57,6 +58,7 @@ async def update_user_profile(
         session.add(current_user)
         await session.commit()
         await session.refresh(current_user)
+        invalidate_user_cache(current_user.email)
         
         return {
             "message": "Profile updated successfully",
@@ -340,6 +342,9 @@ async def get_account_usage(
     Get account usage statistics and limits
     """
     try:
+        # All-time totals from the per-host counters row
+        host_stats = await get_host_stats(current_user.id, session)
+
         # Calculate usage statistics
         usage_stats = {
             "current_month": {
@@ -355,9 +360,9 @@ async def get_account_usage(
                 "max_storage_mb": 1000
             },
             "all_time": {
-                "total_sessions": 0,
-                "total_participants": 0,
-                "total_exports": 0,
+                "total_sessions": host_stats.group_sessions + host_stats.selection_sessions,
+                "total_participants": host_stats.participants,
+                "total_exports": host_stats.exports,
                 "account_age_days": (datetime.now() - current_user.created_at).days
             },
             "plan_type": "free",  # free, premium, enterprise
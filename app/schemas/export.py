@@ -1,5 +1,6 @@
 # app/schemas/export.py
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 
@@ -15,3 +16,26 @@ class ExportUrls(BaseModel):
     message: str
     excel_url: Optional[str] = None
     pdf_url: Optional[str] = None
+
+
+class ExportJobRequest(BaseModel):
+    """Queue an export to be rendered in the background"""
+    session_type: str  # 'group' or 'selection'
+    session_id: int
+    access_code: str
+    format: str  # 'excel' or 'pdf'
+
+
+class ExportJobStatus(BaseModel):
+    """State of a background export; download_url is set once status is 'done'"""
+    job_id: str
+    status: str  # 'queued', 'running', 'done' or 'failed'
+    session_type: str
+    session_id: int
+    format: str
+    cached: bool = False
+    error: Optional[str] = None
+    file_name: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -49,6 +49,53 @@ class GroupJoinRequest(BaseModel):
     member_data: Dict[str, str]
 
 
+class GroupBatchJoinMember(BaseModel):
+    member_identifier: str
+    member_data: Dict[str, str]
+
+
+class GroupBatchJoinRequest(BaseModel):
+    code: str
+    members: List[GroupBatchJoinMember]
+
+
+class GroupBatchJoinResult(BaseModel):
+    member_identifier: str
+    status: str  # "joined", "duplicate" or "rejected"
+    group_name: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class GroupBatchJoinResponse(BaseModel):
+    session: str
+    joined: int
+    failed: int
+    results: List[GroupBatchJoinResult]
+
+
+class GroupSolveRequest(BaseModel):
+    code: str
+    apply: bool = False  # Write the computed assignment back to group_members
+
+
+class GroupSolveResponse(BaseModel):
+    feasible: bool
+    applied: bool
+    total_members: int
+    moved: int
+    group_sizes: Dict[str, int]
+    certificate: List[str]
+
+
+class GroupRevealRequest(BaseModel):
+    code: str
+
+
+class GroupRevealResponse(BaseModel):
+    session: str
+    revealed: int  # Members whose group was sent to waiting participants
+
+
 class GroupJoinResponse(BaseModel):
     message: str
     group_name: str
@@ -4,10 +4,29 @@ from typing import Optional, List, Dict
 from datetime import datetime
 
 
+class SelectionQuota(BaseModel):
+    field_key: str
+    value: Optional[str] = None  # Without a value, max applies to each value of the field
+    min: Optional[int] = Field(default=None, ge=0)
+    max: Optional[int] = Field(default=None, ge=0)
+    share: Optional[float] = Field(default=None, ge=0, le=1)  # Fraction of count; sets min/max not given
+
+
 class SelectMembersRequest(BaseModel):
     code: str  # The session access code instead of session_id
     count: int  # Number of members to select
     preferential_selection: Optional[Dict[str, str]] = None  # Field key and value to prioritize
+    quotas: Optional[List[SelectionQuota]] = None  # Stratified draw (see selection_quota.py)
+    seed: Optional[int] = Field(default=None, ge=0, lt=2**63)  # Generated and returned when omitted
+
+
+class QuotaFill(BaseModel):
+    field_key: Optional[str] = None  # None for a rule value matched in any field
+    value: str
+    min: Optional[int] = None
+    max: Optional[int] = None
+    selected: int
+    met: bool
 
 
 class SelectionResult(BaseModel):
@@ -15,6 +34,18 @@ class SelectionResult(BaseModel):
     preferential_count: int  # Number selected based on preference
     random_count: int  # Number selected randomly
     member_identifiers: List[str]
+    quota_fill: Optional[List[QuotaFill]] = None  # Per-stratum fill of a quota draw
+    seed: Optional[int] = None
+    draw_id: Optional[int] = None  # Pass to the replay endpoint to recompute this draw
+
+
+class SelectionReplay(BaseModel):
+    draw_id: int
+    seed: int
+    algorithm_version: str
+    matches: bool  # Recomputed draw is identical to the recorded one
+    recorded: List[str]  # Member identifiers selected by the draw, in draw order
+    recomputed: List[str]
 
 
 class MemberSelectionDetail(BaseModel):
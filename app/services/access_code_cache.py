@@ -0,0 +1,209 @@
+# app/services/access_code_cache.py
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, Tuple, TypedDict
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import set_cache, get_cache, delete_cache
+from app.models.access_code import AccessCode
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from app.models.groups import Group
+from app.models.field_definition import FieldDefinition
+from app.models.selection_field_definition import SelectionFieldDefinition
+from app.models.preferential_grouping_rule import PreferentialGroupingRule
+from app.models.preferential_selection_rule import PreferentialSelectionRule
+
+
+ACCESS_CODE_CACHE_TTL = int(os.getenv("ACCESS_CODE_CACHE_TTL", "300"))  # seconds
+ACCESS_CODE_CACHE_SIZE = int(os.getenv("ACCESS_CODE_CACHE_SIZE", "4096"))
+# Share resolved codes between workers through Redis (app/core/cache.py) in addition to the LRU
+ACCESS_CODE_CACHE_REDIS = os.getenv("ACCESS_CODE_CACHE_REDIS", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedCode(TypedDict):
+    kind: Literal["group", "selection"]
+    code: str
+    code_id: int
+    host_id: int
+    session_id: int
+    name: str
+    description: Optional[str]
+    identifier: str
+    max_group_size: int
+    reveal_immediately: bool
+    field_keys: List[str]
+    rules: List[Tuple[str, int]]  # (field_key, max_per_group / preference_max_selection)
+    groups: List[Tuple[int, str]]  # (group id, name); empty for selection sessions
+    expires_at: str  # ISO timestamp of the access code expiry
+
+
+_lru: "OrderedDict[str, Tuple[float, ResolvedCode]]" = OrderedDict()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _redis_key(code: str) -> str:
+    return f"access_code:resolved:{code}"
+
+
+def _is_live(entry: ResolvedCode) -> bool:
+    return datetime.fromisoformat(entry["expires_at"]) > _now()
+
+
+async def _remember(entry: ResolvedCode) -> None:
+    ttl = min(ACCESS_CODE_CACHE_TTL, (datetime.fromisoformat(entry["expires_at"]) - _now()).total_seconds())
+    if ttl <= 0:
+        return
+    _lru[entry["code"]] = (time.monotonic() + ttl, entry)
+    _lru.move_to_end(entry["code"])
+    while len(_lru) > ACCESS_CODE_CACHE_SIZE:
+        _lru.popitem(last=False)
+    if ACCESS_CODE_CACHE_REDIS:
+        # The Upstash client is synchronous; keep its round trips off the event loop
+        try:
+            await asyncio.to_thread(set_cache, _redis_key(entry["code"]), json.dumps(entry), max(1, int(ttl)))
+        except Exception as e:
+            logger.warning("Access code cache: Redis write failed: %s", e)
+
+
+async def _lookup(code: str) -> Optional[ResolvedCode]:
+    cached = _lru.get(code)
+    if cached is not None:
+        deadline, entry = cached
+        if deadline > time.monotonic() and _is_live(entry):
+            _lru.move_to_end(code)
+            return entry
+        _lru.pop(code, None)
+
+    if ACCESS_CODE_CACHE_REDIS:
+        try:
+            raw = await asyncio.to_thread(get_cache, _redis_key(code))
+        except Exception as e:
+            logger.warning("Access code cache: Redis read failed: %s", e)
+            raw = None
+        if raw:
+            entry = json.loads(raw)
+            entry["rules"] = [tuple(rule) for rule in entry["rules"]]
+            entry["groups"] = [tuple(group) for group in entry["groups"]]
+            if _is_live(entry):
+                await _remember(entry)
+                return entry
+    return None
+
+
+async def _load(code: str, db: AsyncSession) -> Optional[ResolvedCode]:
+    access_code_result = await db.exec(
+        select(AccessCode)
+        .where(AccessCode.code == code, AccessCode.status == "active")
+        .order_by(AccessCode.id.desc())
+    )
+    access_code = access_code_result.first()
+    if not access_code or access_code.expires_at < _now():
+        return None
+
+    groups: List[Tuple[int, str]] = []
+    group_result = await db.exec(select(GroupSession).where(GroupSession.code_id == access_code.id))
+    group_session = group_result.first()
+    if group_session:
+        kind = "group"
+        session_row = group_session
+        fields_result = await db.exec(select(FieldDefinition.field_key).where(FieldDefinition.session_id == group_session.id))
+        field_keys = list(fields_result.all())
+        rules_result = await db.exec(
+            select(PreferentialGroupingRule.field_key, PreferentialGroupingRule.max_per_group)
+            .where(PreferentialGroupingRule.group_session_id == group_session.id)
+        )
+        rules = [(field_key, limit) for field_key, limit in rules_result.all()]
+        groups_result = await db.exec(
+            select(Group.id, Group.name).where(Group.session_id == group_session.id).order_by(Group.id)
+        )
+        groups = [(group_id, name) for group_id, name in groups_result.all()]
+    else:
+        selection_result = await db.exec(select(SelectionSession).where(SelectionSession.code_id == access_code.id))
+        selection_session = selection_result.first()
+        if not selection_session:
+            return None
+        kind = "selection"
+        session_row = selection_session
+        # Fields live in the selection-specific table; fall back to the legacy shared table
+        fields_result = await db.exec(
+            select(SelectionFieldDefinition.field_key)
+            .where(SelectionFieldDefinition.selection_session_id == selection_session.id)
+        )
+        field_keys = list(fields_result.all())
+        if not field_keys:
+            legacy_result = await db.exec(select(FieldDefinition.field_key).where(FieldDefinition.session_id == selection_session.id))
+            field_keys = list(legacy_result.all())
+        rules_result = await db.exec(
+            select(PreferentialSelectionRule.field_key, PreferentialSelectionRule.preference_max_selection)
+            .where(PreferentialSelectionRule.selection_session_id == selection_session.id)
+        )
+        rules = [(field_key, limit) for field_key, limit in rules_result.all()]
+
+    return {
+        "kind": kind,
+        "code": code,
+        "code_id": access_code.id,
+        "host_id": access_code.host_id,
+        "session_id": session_row.id,
+        "name": session_row.name,
+        "description": session_row.description,
+        "identifier": session_row.member_identifier,
+        "max_group_size": session_row.max_group_size,
+        "reveal_immediately": bool(getattr(session_row, "reveal_immediately", False)),
+        "field_keys": field_keys,
+        "rules": rules,
+        "groups": groups,
+        "expires_at": access_code.expires_at.isoformat(),
+    }
+
+
+async def resolve_access_code(code: str, db: AsyncSession) -> Optional[ResolvedCode]:
+    """Resolve an active, unexpired access code to its session, fields and rules.
+
+    Returns None when the code is unknown, expired, inactive or not attached to a session.
+    Entries live at most ACCESS_CODE_CACHE_TTL seconds and never past the code's expiry.
+    """
+    entry = await _lookup(code)
+    if entry is not None:
+        return entry
+    entry = await _load(code, db)
+    if entry is not None:
+        await _remember(entry)
+    return entry
+
+
+async def ensure_code_active(resolved: ResolvedCode, db: AsyncSession) -> None:
+    """Re-read the access code in the caller's transaction; ValueError if it is no longer live.
+
+    Other workers may hold a cached entry for up to ACCESS_CODE_CACHE_TTL after end_session,
+    so joins call this (after taking the session lock) before adding a member.
+    """
+    row = (await db.exec(
+        select(AccessCode.status, AccessCode.expires_at).where(AccessCode.id == resolved["code_id"])
+    )).first()
+    if row is None or row[0] != "active" or row[1] < _now():
+        await invalidate_access_code(resolved["code"])
+        raise ValueError("Invalid or expired code")
+
+
+async def invalidate_access_code(code: str) -> None:
+    """Drop a code after its session or access code changed (end_session, create, reveal)."""
+    _lru.pop(code, None)
+    if ACCESS_CODE_CACHE_REDIS:
+        try:
+            await asyncio.to_thread(delete_cache, _redis_key(code))
+        except Exception as e:
+            logger.warning("Access code cache: Redis delete failed: %s", e)
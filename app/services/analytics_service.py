@@ -0,0 +1,128 @@
+# app/services/analytics_service.py
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import literal_column, union_all, String
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.access_code import AccessCode
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from app.models.group_member import GroupMember
+from app.models.selection_member import SelectionMember
+from app.models.selection_log import SelectionLog
+
+
+# Completed daily buckets are cached per host for the metrics in CACHED_METRICS
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "3600"))  # seconds
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "512"))
+
+# Counted per day: sessions created, members joined and members selected, by session kind
+METRICS = ("group_sessions", "selection_sessions", "group_joins", "selection_joins", "selections")
+# Past days of these never change. Past selections do (clear_selections deletes their logs,
+# on whichever worker), so they are counted afresh on every request
+CACHED_METRICS = METRICS[:4]
+
+DayCounts = Dict[str, int]
+
+# host_id -> (monotonic deadline, {day: counts}) for days before today only
+_bucket_cache: "OrderedDict[int, Tuple[float, Dict[date, DayCounts]]]" = OrderedDict()
+
+
+def _empty() -> DayCounts:
+    return {metric: 0 for metric in METRICS}
+
+
+async def _query_days(host_id: int, starts: Dict[str, date], last_day: date, db: AsyncSession) -> Dict[date, DayCounts]:
+    """Count each metric in starts per day from its start through last_day with one
+    date_trunc GROUP BY; other metrics are left at 0."""
+    end = datetime.combine(last_day + timedelta(days=1), dt_time.min)
+    sources = {
+        "group_sessions": (AccessCode.created_at, GroupSession, GroupSession.code_id == AccessCode.id, GroupSession.host_id),
+        "selection_sessions": (AccessCode.created_at, SelectionSession, SelectionSession.code_id == AccessCode.id, SelectionSession.host_id),
+        "group_joins": (GroupMember.joined_at, GroupSession, GroupSession.id == GroupMember.session_id, GroupSession.host_id),
+        "selection_joins": (SelectionMember.joined_at, SelectionSession, SelectionSession.id == SelectionMember.selection_session_id, SelectionSession.host_id),
+        "selections": (SelectionLog.selected_at, SelectionSession, SelectionSession.id == SelectionLog.selection_session_id, SelectionSession.host_id),
+    }
+
+    queries = []
+    for metric, first in starts.items():
+        ts, session_model, on, host = sources[metric]
+        queries.append(
+            select(literal_column(f"'{metric}'", String).label("metric"), ts.label("ts"))
+            .join(session_model, on)
+            .where(host == host_id, ts >= datetime.combine(first, dt_time.min), ts < end)
+        )
+    events = (queries[0] if len(queries) == 1 else union_all(*queries)).subquery("events")
+
+    day = func.date_trunc("day", events.c.ts)
+    rows = await db.exec(
+        select(day.label("day"), events.c.metric, func.count())
+        .group_by(day, events.c.metric)
+    )
+
+    buckets: Dict[date, DayCounts] = {}
+    current = min(starts.values())
+    while current <= last_day:
+        buckets[current] = _empty()
+        current += timedelta(days=1)
+    for bucket_day, metric, count in rows.all():
+        buckets[bucket_day.date()][metric] = int(count)
+    return buckets
+
+
+async def get_daily_buckets(host_id: int, first_day: date, db: AsyncSession) -> Dict[date, DayCounts]:
+    """Return per-day counts from first_day through today, oldest first.
+
+    CACHED_METRICS of days before today are served from the cache and only missing days are
+    queried. One more query counts today's CACHED_METRICS together with the selections of
+    every day, so a clear on another worker shows up at once.
+    """
+    today = date.today()
+    cached: Dict[date, DayCounts] = {}
+    entry = _bucket_cache.get(host_id)
+    if entry is not None:
+        deadline, days = entry
+        if deadline > time.monotonic():
+            cached = days
+            _bucket_cache.move_to_end(host_id)
+        else:
+            _bucket_cache.pop(host_id, None)
+
+    missing = [
+        first_day + timedelta(days=offset)
+        for offset in range((today - first_day).days)
+        if first_day + timedelta(days=offset) not in cached
+    ]
+    if missing:
+        fetched = await _query_days(host_id, dict.fromkeys(CACHED_METRICS, missing[0]), missing[-1], db)
+        cached = {**cached, **fetched}
+        _bucket_cache[host_id] = (time.monotonic() + ANALYTICS_CACHE_TTL, cached)
+        _bucket_cache.move_to_end(host_id)
+        while len(_bucket_cache) > ANALYTICS_CACHE_SIZE:
+            _bucket_cache.popitem(last=False)
+
+    current = await _query_days(host_id, {**dict.fromkeys(CACHED_METRICS, today), "selections": first_day}, today, db)
+
+    days: Dict[date, DayCounts] = {}
+    day = first_day
+    while day < today:
+        days[day] = {**cached[day], "selections": current[day]["selections"]}
+        day += timedelta(days=1)
+    days[today] = current[today]
+    return days
+
+
+def roll_up(days: Dict[date, DayCounts], date_format: str) -> List[Tuple[str, DayCounts]]:
+    """Merge daily buckets into the buckets named by strftime(date_format), oldest first."""
+    merged: "OrderedDict[str, DayCounts]" = OrderedDict()
+    for day, counts in days.items():
+        bucket = merged.setdefault(day.strftime(date_format), _empty())
+        for metric, value in counts.items():
+            bucket[metric] += value
+    return list(merged.items())
+
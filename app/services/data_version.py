@@ -0,0 +1,40 @@
+# app/services/data_version.py
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+
+
+def _model(session_type: str):
+    if session_type == "group":
+        return GroupSession
+    if session_type == "selection":
+        return SelectionSession
+    raise ValueError(f"Unknown session type: {session_type}")
+
+
+async def bump_data_version(session_type: str, session_id: int, db: AsyncSession) -> Optional[int]:
+    """Mark a session's exportable data as changed and return the new version.
+
+    Runs inside the caller's transaction and does not commit, so the version moves if and
+    only if the caller's write commits.
+    """
+    model = _model(session_type)
+    result = await db.exec(
+        update(model)
+        .where(model.id == session_id)
+        .values(data_version=model.data_version + 1)
+        .returning(model.data_version)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_data_version(session_type: str, session_id: int, db: AsyncSession) -> Optional[int]:
+    """Current data version of a session, or None if it does not exist."""
+    model = _model(session_type)
+    return (await db.exec(select(model.data_version).where(model.id == session_id))).first()
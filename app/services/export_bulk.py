@@ -0,0 +1,94 @@
+# app/services/export_bulk.py
+import asyncio
+import logging
+import os
+import time
+import zipfile
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.database import async_session
+from app.services.data_version import get_data_version
+from app.services.export_cache import EXPORT_RENDERERS, load_or_render_export
+from app.utils.chunk_sink import ChunkSink
+
+logger = logging.getLogger(__name__)
+
+
+# Sessions rendered at the same time for one bulk export
+EXPORT_BULK_CONCURRENCY = int(os.getenv("EXPORT_BULK_CONCURRENCY", "4"))
+# Most sessions one bulk export may contain
+EXPORT_BULK_MAX_SESSIONS = int(os.getenv("EXPORT_BULK_MAX_SESSIONS", "500"))
+
+# (session_type, session_id, session_name) as returned by find_host_sessions
+BulkSession = Tuple[str, int, str]
+
+
+def _entry_name(session_type: str, session_id: int, session_name: str, extension: str) -> str:
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in session_name)[:80]
+    return f"{session_type}_session_{safe_name}_{session_id}.{extension}"
+
+
+async def _render_entry(
+    bulk_session: BulkSession,
+    export_format: str,
+    save_directory: str
+) -> Tuple[BulkSession, Optional[bytes], Optional[str]]:
+    """Render one session with its own database session; returns (session, data, error)"""
+    session_type, session_id, _ = bulk_session
+    try:
+        async with async_session() as db:
+            version = await get_data_version(session_type, session_id, db) or 0
+            data, _ = await load_or_render_export(session_id, session_type, export_format, version, save_directory, db)
+        return bulk_session, data, None
+    except Exception as e:
+        logger.warning("Bulk export of %s session %s failed: %s", session_type, session_id, e)
+        return bulk_session, None, str(e)
+
+
+async def iter_bulk_zip(
+    sessions: List[BulkSession],
+    export_format: str,
+    save_directory: str
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of every session's export, entry by entry as renders finish.
+
+    At most EXPORT_BULK_CONCURRENCY renders run at once and a new one starts only after a
+    finished entry has been written out, so memory holds a few files, never the archive.
+    Sessions that fail are listed in errors.txt at the end instead of aborting the archive.
+    """
+    extension, _ = EXPORT_RENDERERS[export_format]
+    sink = ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    remaining = list(reversed(sessions))
+    running: Set[asyncio.Task] = set()
+    errors: Dict[str, str] = {}
+
+    def start_next() -> None:
+        while remaining and len(running) < EXPORT_BULK_CONCURRENCY:
+            running.add(asyncio.create_task(_render_entry(remaining.pop(), export_format, save_directory)))
+
+    try:
+        start_next()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.discard(task)
+                (session_type, session_id, session_name), data, error = task.result()
+                name = _entry_name(session_type, session_id, session_name, extension)
+                if error is not None:
+                    errors[name] = error
+                    continue
+                # xlsx and pdf are already compressed, so entries are stored as-is
+                archive.writestr(zipfile.ZipInfo(name, date_time=time.localtime()[:6]), data)
+                yield sink.drain()
+            start_next()
+
+        if errors:
+            report = "\n".join(f"{name}: {error}" for name, error in errors.items())
+            archive.writestr("errors.txt", report + "\n")
+        archive.close()
+        yield sink.drain()
+    finally:
+        # Client went away or rendering raised: stop renders that are still running
+        for task in running:
+            task.cancel()
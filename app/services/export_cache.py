@@ -0,0 +1,162 @@
+# app/services/export_cache.py
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.services.export_service import generate_excel_for_session, generate_pdf_for_session
+
+logger = logging.getLogger(__name__)
+
+
+# Rendered exports are kept in a ".cache" folder inside each export directory
+EXPORT_CACHE_DIRNAME = ".cache"
+# Total size per export directory; least recently used files are evicted beyond it
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+EXPORT_RENDERERS = {
+    "excel": ("xlsx", generate_excel_for_session),
+    "pdf": ("pdf", generate_pdf_for_session),
+}
+
+
+def export_etag(session_type: str, session_id: int, export_format: str, version: int) -> str:
+    return f'"{session_type}-{session_id}-{export_format}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value names etag (weak or strong) or is '*'"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def _cache_paths(save_directory: str, session_type: str, session_id: int, extension: str, version: int) -> Tuple[str, str]:
+    name = f"{session_type}_{session_id}_v{version}.{extension}"
+    path = os.path.join(save_directory, EXPORT_CACHE_DIRNAME, name)
+    return path, f"{path}.json"
+
+
+def _read(path: str, meta_path: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as meta_file:
+            metadata = json.load(meta_file)
+        with open(path, "rb") as file:
+            data = file.read()
+    except (OSError, ValueError):
+        return None
+    # A hit makes the entry most recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data, metadata
+
+
+def _evict(cache_dir: str) -> None:
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json") or name.endswith(".tmp"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= EXPORT_CACHE_MAX_BYTES:
+            break
+        for stale in (path, f"{path}.json"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        total -= size
+
+
+def _write(path: str, meta_path: str, data: bytes, metadata: Dict[str, Any]) -> None:
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename, so readers never see a partial file
+    for target, payload in ((meta_path, json.dumps(metadata).encode("utf-8")), (path, data)):
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(payload)
+        os.replace(tmp, target)
+    # Older versions of the same export can never be served again
+    name = os.path.basename(path)
+    prefix, _, suffix = name.rpartition("_v")
+    extension = suffix.split(".", 1)[1]
+    for other in os.listdir(cache_dir):
+        if other != name and other.startswith(f"{prefix}_v") and other.endswith(f".{extension}"):
+            for stale in (other, f"{other}.json"):
+                try:
+                    os.remove(os.path.join(cache_dir, stale))
+                except OSError:
+                    pass
+    _evict(cache_dir)
+
+
+def export_is_cached(save_directory: str, session_type: str, session_id: int, export_format: str, version: int) -> bool:
+    """True if this data version of the export is in the cache (it may still be evicted later)"""
+    extension, _ = EXPORT_RENDERERS[export_format]
+    path, meta_path = _cache_paths(save_directory, session_type, session_id, extension, version)
+    return os.path.isfile(path) and os.path.isfile(meta_path)
+
+
+async def get_cached_export(
+    save_directory: str,
+    session_type: str,
+    session_id: int,
+    extension: str,
+    version: int
+) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    """Return (file bytes, metadata) of a cached export of this data version, if any"""
+    path, meta_path = _cache_paths(save_directory, session_type, session_id, extension, version)
+    if not os.path.exists(path):
+        return None
+    return await asyncio.to_thread(_read, path, meta_path)
+
+
+async def put_cached_export(
+    save_directory: str,
+    session_type: str,
+    session_id: int,
+    extension: str,
+    version: int,
+    data: bytes,
+    metadata: Dict[str, Any]
+) -> None:
+    """Store a rendered export; failures are logged and otherwise ignored"""
+    path, meta_path = _cache_paths(save_directory, session_type, session_id, extension, version)
+    try:
+        await asyncio.to_thread(_write, path, meta_path, data, metadata)
+    except OSError as e:
+        logger.warning("Export cache write failed for %s: %s", path, e)
+
+
+async def load_or_render_export(
+    session_id: int,
+    session_type: str,
+    export_format: str,
+    version: int,
+    save_directory: str,
+    db: AsyncSession
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Return (file bytes, metadata) of an export at this data version, rendering and caching
+    it only if no cached copy exists"""
+    extension, generate = EXPORT_RENDERERS[export_format]
+    cached = await get_cached_export(save_directory, session_type, session_id, extension, version)
+    if cached:
+        return cached
+    file_buffer, metadata = await generate(session_id, session_type, db, save_to_disk=False)
+    data = file_buffer.getvalue()
+    await put_cached_export(save_directory, session_type, session_id, extension, version, data, metadata)
+    return data, metadata
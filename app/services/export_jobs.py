@@ -0,0 +1,187 @@
+# app/services/export_jobs.py
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_session
+from app.services.data_version import get_data_version
+from app.services.export_cache import EXPORT_RENDERERS, export_is_cached, get_cached_export, load_or_render_export
+from app.services.export_service import record_export
+
+logger = logging.getLogger(__name__)
+
+
+# In-process workers rendering queued exports
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "1"))
+# Finished jobs are kept for polling this long
+EXPORT_JOB_TTL = int(os.getenv("EXPORT_JOB_TTL", "3600"))  # seconds
+EXPORT_JOB_HISTORY = int(os.getenv("EXPORT_JOB_HISTORY", "1000"))
+
+# (session_type, session_id, format, data version); the export cache stores the rendered file under it
+ResultKey = Tuple[str, int, str, int]
+
+_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+# Key -> id of the queued or running job producing it, so duplicate requests share one render
+_pending: Dict[ResultKey, str] = {}
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    done = job["status"] == "done"
+    session_type, session_id, export_format, version = job["key"]
+    file_name = f"{session_type}_{session_id}_v{version}.{EXPORT_RENDERERS[export_format][0]}" if done else None
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "session_type": job["session_type"],
+        "session_id": job["session_id"],
+        "format": job["format"],
+        "cached": job["cached"],
+        "error": job["error"],
+        "file_name": file_name,
+        "download_url": f"/api/export/jobs/{job['id']}/download" if done else None,
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def _prune_jobs() -> None:
+    now = time.monotonic()
+    for job_id in list(_jobs):
+        job = _jobs[job_id]
+        expired = job["status"] in ("done", "failed") and now - job["finished_mono"] > EXPORT_JOB_TTL
+        if expired or len(_jobs) > EXPORT_JOB_HISTORY and job["status"] in ("done", "failed"):
+            _jobs.pop(job_id)
+        else:
+            break
+
+
+def _ensure_workers() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue()
+    _workers[:] = [task for task in _workers if not task.done()]
+    while len(_workers) < EXPORT_JOB_WORKERS:
+        _workers.append(asyncio.create_task(_worker()))
+    return _queue
+
+
+async def _run_job(job: Dict[str, Any]) -> None:
+    session_type, session_id, export_format, version = job["key"]
+    # Each job gets its own database session; the request that queued it has already returned
+    async with async_session() as db:
+        # Shares the rendered file with the synchronous export endpoints and the other workers
+        await load_or_render_export(session_id, session_type, export_format, version, job["save_directory"], db)
+        await record_export(job["host_id"], db)
+
+
+async def _worker() -> None:
+    while True:
+        job = await _queue.get()
+        job["status"] = "running"
+        try:
+            await _run_job(job)
+            job["status"] = "done"
+        except Exception as e:
+            logger.warning("Export job %s failed: %s", job["id"], e)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = datetime.now()
+            job["finished_mono"] = time.monotonic()
+            _pending.pop(job["key"], None)
+            _queue.task_done()
+
+
+async def enqueue_export(
+    host_id: int,
+    session_type: str,
+    session_id: int,
+    export_format: str,
+    save_directory: str,
+    db: AsyncSession
+) -> Dict[str, Any]:
+    """Queue an export and return its job status.
+
+    Results are addressed by (session type, id, format, data version): if the session has not
+    changed since a previous export the job is created already done, and if the same export is
+    already queued its job is returned instead of rendering twice.
+    """
+    if export_format not in EXPORT_RENDERERS:
+        raise ValueError("Invalid format specified. Use 'excel' or 'pdf'")
+
+    _prune_jobs()
+    version = await get_data_version(session_type, session_id, db)
+    if version is None:
+        raise ValueError(f"{session_type.capitalize()} session not found with ID: {session_id}")
+    key = (session_type, session_id, export_format, version)
+
+    pending_id = _pending.get(key)
+    if pending_id in _jobs and _jobs[pending_id]["host_id"] == host_id:
+        return _public(_jobs[pending_id])
+
+    job = {
+        "id": uuid.uuid4().hex,
+        "key": key,
+        "host_id": host_id,
+        "session_type": session_type,
+        "session_id": session_id,
+        "format": export_format,
+        "save_directory": save_directory,
+        "status": "queued",
+        "cached": False,
+        "error": None,
+        "created_at": datetime.now(),
+        "finished_at": None,
+        "finished_mono": None,
+    }
+    _jobs[job["id"]] = job
+
+    if export_is_cached(save_directory, *key):
+        job.update(status="done", cached=True, finished_at=job["created_at"], finished_mono=time.monotonic())
+        return _public(job)
+
+    _pending[key] = job["id"]
+    _ensure_workers().put_nowait(job)
+    return _public(job)
+
+
+def get_export_job(job_id: str, host_id: int) -> Dict[str, Any]:
+    """Status of a job queued by this host; raises ValueError for unknown or foreign jobs."""
+    job = _jobs.get(job_id)
+    if job is None or job["host_id"] != host_id:
+        raise ValueError("Export job not found")
+    return _public(job)
+
+
+async def load_export_job_file(job_id: str, host_id: int) -> Tuple[bytes, Dict[str, Any], Dict[str, Any]]:
+    """(file bytes, export metadata, job status) of a finished job of this host.
+
+    Raises ValueError if the job is unknown, not finished, or its file has since left the cache.
+    """
+    job = _jobs.get(job_id)
+    if job is None or job["host_id"] != host_id:
+        raise ValueError("Export job not found")
+    if job["status"] != "done":
+        raise ValueError("Export job has not finished")
+    session_type, session_id, export_format, version = job["key"]
+    extension, _ = EXPORT_RENDERERS[export_format]
+    cached = await get_cached_export(job["save_directory"], session_type, session_id, extension, version)
+    if cached is None:
+        raise ValueError("Export file is no longer available; queue the export again")
+    data, metadata = cached
+    return data, metadata, _public(job)
+
+
+def list_export_jobs(host_id: int) -> List[Dict[str, Any]]:
+    """This host's jobs, newest first."""
+    _prune_jobs()
+    return [_public(job) for job in reversed(_jobs.values()) if job["host_id"] == host_id]
@@ -0,0 +1,103 @@
+# app/services/export_pool.py
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+# Where CPU-bound export rendering (xlsxwriter / FPDF) runs:
+#   "process" - separate processes, so rendering never holds this worker's GIL (default)
+#   "thread"  - threads of this worker; cheaper to start, but pure-Python rendering still
+#               competes with the event loop for the GIL
+EXPORT_POOL_KIND = os.getenv("EXPORT_POOL_KIND", "process").lower()
+EXPORT_POOL_WORKERS = int(os.getenv("EXPORT_POOL_WORKERS", "2"))
+# Renders running at once per worker; further requests wait for a slot
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", str(EXPORT_POOL_WORKERS)))
+# Renders allowed to wait for a slot before new requests are refused (0 = unlimited)
+EXPORT_MAX_QUEUE = int(os.getenv("EXPORT_MAX_QUEUE", "20"))
+
+
+class ExportPoolBusy(Exception):
+    """Raised when the render queue is full; routes report it as 503."""
+
+
+_executor: Optional[Executor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_metrics: Dict[str, float] = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "render_seconds_total": 0.0,
+    "wait_seconds_total": 0.0,
+}
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if EXPORT_POOL_KIND == "thread":
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_POOL_WORKERS, thread_name_prefix="export")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=EXPORT_POOL_WORKERS)
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENCY)
+    return _slots
+
+
+async def run_render(render: Callable[..., Any], *args: Any) -> Any:
+    """Run a renderer in the export pool and return its result.
+
+    render must be a module-level function and args plain picklable data (row tuples,
+    dicts, strings), since with the process pool both are sent to another process.
+    """
+    if EXPORT_MAX_QUEUE and _metrics["queued"] >= EXPORT_MAX_QUEUE:
+        _metrics["rejected"] += 1
+        raise ExportPoolBusy("Too many exports in progress, please retry shortly")
+
+    queued_at = time.monotonic()
+    _metrics["queued"] += 1
+    try:
+        await _get_slots().acquire()
+    finally:
+        _metrics["queued"] -= 1
+    _metrics["wait_seconds_total"] += time.monotonic() - queued_at
+
+    started_at = time.monotonic()
+    _metrics["running"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_get_executor(), render, *args)
+        _metrics["completed"] += 1
+        return result
+    except Exception:
+        _metrics["failed"] += 1
+        raise
+    finally:
+        _metrics["running"] -= 1
+        _metrics["render_seconds_total"] += time.monotonic() - started_at
+        _get_slots().release()
+
+
+def export_pool_metrics() -> Dict[str, Any]:
+    """Queue depth, in-flight renders and totals for this worker"""
+    return {
+        **_metrics,
+        "kind": EXPORT_POOL_KIND,
+        "workers": EXPORT_POOL_WORKERS,
+        "max_concurrency": EXPORT_MAX_CONCURRENCY,
+        "max_queue": EXPORT_MAX_QUEUE,
+    }
+
+
+def shutdown_export_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
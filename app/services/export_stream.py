@@ -0,0 +1,269 @@
+# app/services/export_stream.py
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+import xlsxwriter
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from app.models.groups import Group
+from app.models.group_member import GroupMember
+from app.models.access_code import AccessCode
+from app.models.selection_member import SelectionMember
+from app.models.preferential_grouping_rule import PreferentialGroupingRule
+from app.models.preferential_selection_rule import PreferentialSelectionRule
+from app.models.field_definition import FieldDefinition
+
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_STREAM_BATCH_SIZE = int(os.getenv("EXPORT_STREAM_BATCH_SIZE", "2000"))
+# Bytes per chunk sent to the client
+EXPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def get_session_meta(session_id: int, session_type: str, db: AsyncSession) -> Dict[str, Any]:
+    """Session, access code, rules and field definitions of a session, without its members"""
+    if session_type == "group":
+        model, rule_model, rule_fk = GroupSession, PreferentialGroupingRule, PreferentialGroupingRule.group_session_id
+    elif session_type == "selection":
+        model, rule_model, rule_fk = SelectionSession, PreferentialSelectionRule, PreferentialSelectionRule.selection_session_id
+    else:
+        raise ValueError(f"Unknown session type: {session_type}")
+
+    result = await db.exec(
+        select(model, AccessCode).where((model.id == session_id) & (model.code_id == AccessCode.id))
+    )
+    session_result = result.first()
+    if not session_result:
+        raise ValueError(f"{session_type.capitalize()} session not found with ID: {session_id}")
+    session, access_code = session_result
+
+    rules = (await db.exec(select(rule_model).where(rule_fk == session_id))).all()
+    field_definitions = []
+    if session_type == "group":
+        field_definitions = (await db.exec(select(FieldDefinition).where(FieldDefinition.session_id == session_id))).all()
+
+    return {
+        "session": session,
+        "access_code": access_code,
+        "preferential_rules": rules,
+        "field_definitions": field_definitions,
+    }
+
+
+async def member_data_keys(session_id: int, session_type: str, db: AsyncSession) -> List[str]:
+    """Sorted distinct JSONB keys over all members, computed in the database"""
+    if session_type == "group":
+        column, session_fk = GroupMember.member_data, GroupMember.session_id
+    else:
+        column, session_fk = SelectionMember.attributes, SelectionMember.selection_session_id
+    keys = func.jsonb_object_keys(column)
+    result = await db.exec(select(keys).where(session_fk == session_id).distinct())
+    return sorted(key for key in result.all() if key)
+
+
+def _write_info_sheet(workbook, session_type: str, meta: Dict[str, Any]) -> None:
+    info_sheet = workbook.add_worksheet("Session Info")
+    bold = workbook.add_format({'bold': True})
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#D0D0D0', 'border': 1})
+    info_sheet.set_column(0, 0, 30)
+    info_sheet.set_column(1, 1, 50)
+
+    session = meta["session"]
+    rows = [
+        ("Name", session.name),
+        ("Description", session.description if session_type == "group" else (session.description or "N/A")),
+        ("Access Code", meta["access_code"].code),
+        ("Max Group Size", session.max_group_size),
+    ]
+    if session_type == "group":
+        rows.append(("Status", session.status))
+    rows.append(("Generated At", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    row = 0
+    info_sheet.write(row, 0, "Session Information", header_format)
+    info_sheet.write(row, 1, "", header_format)
+    row += 1
+    for label, value in rows:
+        info_sheet.write(row, 0, label, bold)
+        info_sheet.write(row, 1, value)
+        row += 1
+    row += 1
+
+    if meta["preferential_rules"]:
+        info_sheet.write(row, 0, "Preferential Rules", header_format)
+        info_sheet.write(row, 1, "", header_format)
+        row += 1
+        for rule in meta["preferential_rules"]:
+            info_sheet.write(row, 0, f"Field: {rule.field_key}", bold)
+            if session_type == "group":
+                info_sheet.write(row, 1, f"Maximum {rule.max_per_group} per group")
+            else:
+                info_sheet.write(row, 1, f"Maximum selection: {rule.preference_max_selection}")
+            row += 1
+        row += 1
+
+    if meta["field_definitions"]:
+        info_sheet.write(row, 0, "Field Definitions", header_format)
+        info_sheet.write(row, 1, "", header_format)
+        row += 1
+        for field_def in meta["field_definitions"]:
+            info_sheet.write(row, 0, f"Field: {field_def.field_key}", bold)
+            field_info = f"Label: {field_def.label}, Type: {field_def.data_type}"
+            if field_def.options:
+                options_str = ", ".join([f"{k}: {v}" for k, v in field_def.options.items()])
+                field_info += f", Options: {options_str}"
+            field_info += f", Required: {'Yes' if field_def.required else 'No'}"
+            info_sheet.write(row, 1, field_info)
+            row += 1
+
+
+def _add_group_sheet(workbook, keys: List[str]):
+    members_sheet = workbook.add_worksheet("Group Members")
+    bold = workbook.add_format({'bold': True})
+    members_sheet.set_column(0, 0, 20)  # Group Name
+    members_sheet.set_column(1, 1, 20)  # Member ID
+    members_sheet.set_column(2, 10, 15)  # Fields
+    for col, header in enumerate(["Group Name", "Member ID"] + [f"Field: {key}" for key in keys]):
+        members_sheet.write(0, col, header, bold)
+    return members_sheet
+
+
+def _write_group_rows(members_sheet, row: int, rows: List[tuple], keys: List[str]) -> int:
+    for group_name, member_identifier, member_data in rows:
+        members_sheet.write(row, 0, group_name)
+        members_sheet.write(row, 1, member_identifier)
+        data = member_data if isinstance(member_data, dict) else {}
+        for i, key in enumerate(keys):
+            members_sheet.write(row, 2 + i, str(data[key]) if key in data else "")
+        row += 1
+    return row
+
+
+async def _write_group_members(workbook, session_id: int, db: AsyncSession) -> None:
+    # 'name' is left out of the field columns, as in the buffered export
+    keys = [key for key in await member_data_keys(session_id, "group", db) if key != "name"]
+    members_sheet = await asyncio.to_thread(_add_group_sheet, workbook, keys)
+
+    stmt = (
+        select(Group.name, GroupMember.member_identifier, GroupMember.member_data)
+        .join(Group, Group.id == GroupMember.group_id)
+        .where(GroupMember.session_id == session_id)
+        .order_by(GroupMember.group_id, GroupMember.id)
+        .execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE)
+    )
+    row = 1
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        row = await asyncio.to_thread(_write_group_rows, members_sheet, row, partition, keys)
+
+
+def _add_selection_sheet(workbook, keys: List[str], total_count: int, selected_count: int):
+    members_sheet = workbook.add_worksheet("Selection Members")
+    bold = workbook.add_format({'bold': True})
+    members_sheet.set_column(0, 0, 20)  # Member ID
+    members_sheet.set_column(1, 1, 10)  # Selected
+    members_sheet.set_column(2, 2, 20)  # Joined At
+    members_sheet.set_column(3, 15, 15)  # Attributes
+    members_sheet.write(0, 0, "Selection Summary:", bold)
+    members_sheet.write(0, 1, f"{selected_count} selected out of {total_count} total members")
+    for col, header in enumerate(["Member ID", "Selected", "Joined At"] + keys):
+        members_sheet.write(2, col, header, bold)
+    return members_sheet, workbook.add_format({'bg_color': '#E0EFE0'})  # Light green
+
+
+def _write_selection_rows(members_sheet, selected_format, row: int, rows: List[tuple], keys: List[str]) -> int:
+    for member_identifier, selected, joined_at, attributes in rows:
+        row_format = selected_format if selected else None
+        members_sheet.write(row, 0, member_identifier, row_format)
+        members_sheet.write(row, 1, "Yes" if selected else "No", row_format)
+        members_sheet.write(row, 2, joined_at.strftime("%Y-%m-%d %H:%M:%S") if joined_at else "N/A", row_format)
+        if isinstance(attributes, dict):
+            for j, key in enumerate(keys):
+                if key in attributes:
+                    members_sheet.write(row, j + 3, str(attributes[key]), row_format)
+        row += 1
+    return row
+
+
+async def _write_selection_members(workbook, session_id: int, db: AsyncSession) -> None:
+    counts = await db.exec(
+        select(func.count(SelectionMember.id), func.count(SelectionMember.id).filter(SelectionMember.selected == True))
+        .where(SelectionMember.selection_session_id == session_id)
+    )
+    total_count, selected_count = counts.one()
+    keys = await member_data_keys(session_id, "selection", db)
+    members_sheet, selected_format = await asyncio.to_thread(
+        _add_selection_sheet, workbook, keys, total_count, selected_count
+    )
+
+    # Selected members first
+    stmt = (
+        select(SelectionMember.member_identifier, SelectionMember.selected, SelectionMember.joined_at, SelectionMember.attributes)
+        .where(SelectionMember.selection_session_id == session_id)
+        .order_by(SelectionMember.selected.desc(), SelectionMember.id)
+        .execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE)
+    )
+    row = 3
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        row = await asyncio.to_thread(_write_selection_rows, members_sheet, selected_format, row, partition, keys)
+
+
+async def write_excel_stream(session_id: int, session_type: str, db: AsyncSession) -> Tuple[str, Dict[str, Any]]:
+    """Write a session's Excel export to a temporary file with bounded memory.
+
+    Same sheets as generate_excel_for_session, but the workbook runs in xlsxwriter's
+    constant_memory mode and members are read from a server-side cursor in batches of
+    EXPORT_STREAM_BATCH_SIZE, so memory does not grow with the number of members.
+
+    The reads stay on the event loop; every xlsxwriter call (each batch of rows, and the
+    compressing close) runs in a thread with asyncio.to_thread. The export pool's
+    run_render is not used: it takes one call with all the rows, and a process pool can't
+    keep an open workbook between batches.
+
+    Returns:
+        Tuple of (path of the temporary .xlsx file, metadata); the caller removes the file,
+        e.g. by sending it with iter_file_and_remove
+    """
+    meta = await get_session_meta(session_id, session_type, db)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx", prefix=f"{session_type}_session_{session_id}_")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        await asyncio.to_thread(_write_info_sheet, workbook, session_type, meta)
+        if session_type == "group":
+            await _write_group_members(workbook, session_id, db)
+        else:
+            await _write_selection_members(workbook, session_id, db)
+        await asyncio.to_thread(workbook.close)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return path, {
+        "session_name": meta["session"].name,
+        "session_description": meta["session"].description
+    }
+
+
+def iter_file_and_remove(path: str, chunk_size: int = EXPORT_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file in chunks and delete it once it has been sent (or the client went away)"""
+    try:
+        with open(path, "rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
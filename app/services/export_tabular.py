@@ -0,0 +1,206 @@
+# app/services/export_tabular.py
+import csv
+import io
+import re
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_session
+from app.models.groups import Group
+from app.models.group_member import GroupMember
+from app.models.selection_member import SelectionMember
+from app.models.field_definition import FieldDefinition
+from app.models.selection_field_definition import SelectionFieldDefinition
+from app.services.export_stream import EXPORT_STREAM_BATCH_SIZE, member_data_keys
+from app.utils.chunk_sink import ChunkSink
+
+
+# Fixed leading columns per session type; member_data / attributes keys follow
+BASE_COLUMNS = {
+    "group": [("group_name", "string"), ("member_identifier", "string"), ("joined_at", "datetime")],
+    "selection": [("member_identifier", "string"), ("selected", "boolean"), ("joined_at", "datetime")],
+}
+
+# FieldDefinition.data_type values with a non-string column type; anything else is a string
+NUMBER_TYPES = {"number", "float", "decimal"}
+INTEGER_TYPES = {"integer", "int"}
+BOOLEAN_TYPES = {"boolean", "bool"}
+
+Columns = List[Tuple[str, str]]
+
+# Text starting with one of these is read as a formula by spreadsheet apps (CSV injection)
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Signed numbers (phone numbers, negative amounts) start with one too but are plain data
+CSV_PLAIN_NUMBER = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+async def field_columns(session_id: int, session_type: str, db: AsyncSession) -> Columns:
+    """(field_key, data_type) of the session's field definitions, then any other keys found
+    in the members' JSONB data as strings, in a stable order."""
+    if session_type == "group":
+        definitions = select(FieldDefinition.field_key, FieldDefinition.data_type).where(
+            FieldDefinition.session_id == session_id
+        ).order_by(FieldDefinition.id)
+    elif session_type == "selection":
+        definitions = select(SelectionFieldDefinition.field_key, SelectionFieldDefinition.data_type).where(
+            SelectionFieldDefinition.selection_session_id == session_id
+        ).order_by(SelectionFieldDefinition.id)
+    else:
+        raise ValueError(f"Unknown session type: {session_type}")
+
+    reserved = {name for name, _ in BASE_COLUMNS[session_type]}
+    columns: Columns = []
+    for field_key, data_type in (await db.exec(definitions)).all():
+        if field_key not in reserved:
+            columns.append((field_key, (data_type or "string").lower()))
+            reserved.add(field_key)
+    for key in await member_data_keys(session_id, session_type, db):
+        if key not in reserved:
+            columns.append((key, "string"))
+            reserved.add(key)
+    return columns
+
+
+async def _member_batches(session_id: int, session_type: str, db: AsyncSession) -> AsyncIterator[list]:
+    """Member rows as (base column values..., data dict) tuples, EXPORT_STREAM_BATCH_SIZE at a time"""
+    if session_type == "group":
+        stmt = (
+            select(Group.name, GroupMember.member_identifier, GroupMember.joined_at, GroupMember.member_data)
+            .join(Group, Group.id == GroupMember.group_id)
+            .where(GroupMember.session_id == session_id)
+            .order_by(GroupMember.group_id, GroupMember.id)
+        )
+    else:
+        stmt = (
+            select(SelectionMember.member_identifier, SelectionMember.selected, SelectionMember.joined_at, SelectionMember.attributes)
+            .where(SelectionMember.selection_session_id == session_id)
+            .order_by(SelectionMember.selected.desc(), SelectionMember.id)
+        )
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE))
+    async for partition in result.partitions():
+        yield partition
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (dict, list)):
+        value = str(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) and not CSV_PLAIN_NUMBER.fullmatch(value):
+        # A leading quote makes the cell plain text
+        return "'" + value
+    return value
+
+
+async def iter_csv(session_id: int, session_type: str, columns: Columns) -> AsyncIterator[bytes]:
+    """Yield a session's members as CSV (UTF-8 with BOM, so Excel detects the encoding).
+
+    Reads with its own database session, since the response is sent after the request's
+    session has been released.
+    """
+    base = len(BASE_COLUMNS[session_type])
+    keys = [key for key, _ in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _ in BASE_COLUMNS[session_type]] + [_csv_value(key) for key in keys])
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async with async_session() as db:
+        async for partition in _member_batches(session_id, session_type, db):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in partition:
+                data = row[base] if isinstance(row[base], dict) else {}
+                writer.writerow(
+                    [_csv_value(value) for value in row[:base]] + [_csv_value(data.get(key)) for key in keys]
+                )
+            yield buffer.getvalue().encode("utf-8")
+
+
+def _arrow_schema(pa, session_type: str, columns: Columns):
+    def arrow_type(data_type: str):
+        if data_type in NUMBER_TYPES:
+            return pa.float64()
+        if data_type in INTEGER_TYPES:
+            return pa.int64()
+        if data_type in BOOLEAN_TYPES:
+            return pa.bool_()
+        if data_type == "datetime":
+            return pa.timestamp("us")
+        return pa.string()
+
+    return pa.schema([(name, arrow_type(data_type)) for name, data_type in BASE_COLUMNS[session_type] + columns])
+
+
+def _typed(value: Any, data_type: str) -> Optional[Any]:
+    """Coerce a JSONB value to its column type; values that do not convert become null"""
+    if value is None or value == "":
+        return None
+    try:
+        if data_type in NUMBER_TYPES:
+            return float(value)
+        if data_type in INTEGER_TYPES:
+            return int(value)
+        if data_type in BOOLEAN_TYPES:
+            if isinstance(value, str):
+                lowered = value.strip().lower()
+                if lowered in ("true", "yes", "1"):
+                    return True
+                if lowered in ("false", "no", "0"):
+                    return False
+                return None
+            return bool(value)
+        if data_type == "datetime":
+            parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+            # The column has no time zone; aware values are stored as UTC
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def iter_parquet(session_id: int, session_type: str, columns: Columns) -> AsyncIterator[bytes]:
+    """Yield a session's members as a Parquet file with typed field columns.
+
+    Each cursor batch becomes one row group and is sent as soon as it is written, so memory
+    stays bounded by EXPORT_STREAM_BATCH_SIZE rows. pyarrow is imported here, before the
+    response starts, so a missing install fails the request instead of the download.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires the pyarrow package") from exc
+    return _parquet_chunks(pa, pq, session_id, session_type, columns)
+
+
+async def _parquet_chunks(pa, pq, session_id: int, session_type: str, columns: Columns) -> AsyncIterator[bytes]:
+    base = len(BASE_COLUMNS[session_type])
+    schema = _arrow_schema(pa, session_type, columns)
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        async with async_session() as db:
+            async for partition in _member_batches(session_id, session_type, db):
+                arrays: Dict[str, list] = {name: [] for name in schema.names}
+                for row in partition:
+                    for (name, _), value in zip(BASE_COLUMNS[session_type], row[:base]):
+                        arrays[name].append(value)
+                    data = row[base] if isinstance(row[base], dict) else {}
+                    for key, data_type in columns:
+                        arrays[key].append(_typed(data.get(key), data_type))
+                writer.write_batch(pa.record_batch([arrays[name] for name in schema.names], schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
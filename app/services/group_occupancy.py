@@ -0,0 +1,170 @@
+# app/services/group_occupancy.py
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import true
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.group_member import GroupMember
+from app.models.group_session import GroupSession
+
+
+# Maximum number of group sessions whose occupancy is kept in memory per worker
+OCCUPANCY_CACHE_SIZE = int(os.getenv("GROUP_OCCUPANCY_CACHE_SIZE", "1024"))
+
+# A rule key identifies what a preferential rule counts inside a group:
+#   ("field", field_key, value)         -> exact value of a host-defined field
+#   ("value", field_key, value.lower()) -> case-insensitive value-based rule
+RuleKey = Tuple[str, str, str]
+
+
+class SessionOccupancy:
+    """Member counts and per-field value histograms for every group of one session."""
+
+    def __init__(self, session_id: int, group_ids: Iterable[int]):
+        self.session_id = session_id
+        # GroupSession.data_version the index reflects; None until it has been cached
+        self.version: Optional[int] = None
+        self.total = 0
+        self.counts: Dict[int, int] = {gid: 0 for gid in group_ids}
+        self.exact: Dict[int, Dict[Tuple[str, str], int]] = {gid: {} for gid in self.counts}
+        self.folded: Dict[int, Dict[Tuple[str, str], int]] = {gid: {} for gid in self.counts}
+
+    def _add_value(self, group_id: int, field: str, value: str, n: int = 1) -> None:
+        exact = self.exact.setdefault(group_id, {})
+        folded = self.folded.setdefault(group_id, {})
+        exact[(field, value)] = exact.get((field, value), 0) + n
+        folded[(field, value.lower())] = folded.get((field, value.lower()), 0) + n
+
+    def add_member(self, group_id: int, member_data: dict) -> None:
+        """Record a freshly inserted member."""
+        self.counts[group_id] = self.counts.get(group_id, 0) + 1
+        self.total += 1
+        for field, value in (member_data or {}).items():
+            self._add_value(group_id, field, str(value))
+
+    def matching(self, group_id: int, key: RuleKey) -> int:
+        kind, field, value = key
+        if kind == "field":
+            return self.exact.get(group_id, {}).get((field, value), 0)
+        return self.folded.get(group_id, {}).get((field, value), 0)
+
+
+def member_rule_keys(member_data: dict, pref_rules: list, field_keys: List[str]) -> List[Tuple[RuleKey, int]]:
+    """Return the (rule key, max_per_group) pairs a member is constrained by.
+
+    Field-based rules (rule.field_key is a defined field, e.g. "gender") cap members sharing
+    the member's exact value. Value-based rules (rule.field_key is a value, e.g. "female") cap
+    members whose matching field holds that value, compared case-insensitively.
+    """
+    keys: List[Tuple[RuleKey, int]] = []
+    for rule in pref_rules:
+        if rule.field_key in field_keys:
+            if rule.field_key not in member_data:
+                continue
+            keys.append((("field", rule.field_key, str(member_data[rule.field_key])), rule.max_per_group))
+        else:
+            wanted = rule.field_key.lower()
+            for field in member_data:
+                if str(member_data[field]).lower() == wanted:
+                    keys.append((("value", field, wanted), rule.max_per_group))
+                    break
+    return keys
+
+
+def group_is_eligible(
+    occupancy: SessionOccupancy,
+    group_id: int,
+    max_group_size: int,
+    rule_keys: List[Tuple[RuleKey, int]],
+) -> bool:
+    if occupancy.counts.get(group_id, 0) >= max_group_size:
+        return False
+    for key, limit in rule_keys:
+        if occupancy.matching(group_id, key) >= limit:
+            return False
+    return True
+
+
+_occupancy_cache: "OrderedDict[int, SessionOccupancy]" = OrderedDict()
+
+
+async def _session_version(session_id: int, db: AsyncSession) -> Optional[int]:
+    result = await db.exec(select(GroupSession.data_version).where(GroupSession.id == session_id))
+    return result.first()
+
+
+async def build_occupancy(session_id: int, group_ids: List[int], db: AsyncSession) -> SessionOccupancy:
+    """Build a fresh, uncached occupancy index from the database."""
+    occupancy = SessionOccupancy(session_id, group_ids)
+
+    # Member counts per group
+    count_rows = await db.exec(
+        select(GroupMember.group_id, func.count(GroupMember.id))
+        .where(GroupMember.session_id == session_id)
+        .group_by(GroupMember.group_id)
+    )
+    for group_id, count in count_rows.all():
+        occupancy.counts[group_id] = int(count)
+        occupancy.total += int(count)
+
+    # (field, value) histogram per group, aggregated in the database from member_data
+    kv = func.jsonb_each_text(GroupMember.member_data).table_valued("key", "value").alias("kv")
+    hist_rows = await db.exec(
+        select(GroupMember.group_id, kv.c.key, kv.c.value, func.count())
+        .select_from(GroupMember)
+        .join(kv, true())
+        .where(GroupMember.session_id == session_id)
+        .group_by(GroupMember.group_id, kv.c.key, kv.c.value)
+    )
+    for group_id, field, value, count in hist_rows.all():
+        occupancy._add_value(group_id, field, value, int(count))
+
+    return occupancy
+
+
+async def get_occupancy(session_id: int, group_ids: List[int], db: AsyncSession) -> SessionOccupancy:
+    """Return the occupancy index for a session, rebuilding it if missing or stale.
+
+    The cached index is validated against the session's data_version, which every join,
+    batch join and applied solve bumps, so changes committed by other workers are picked
+    up, including moves between groups that leave the member total unchanged.
+    """
+    version = await _session_version(session_id, db)
+    cached = _occupancy_cache.get(session_id)
+    if cached is not None:
+        if version is not None and cached.version == version:
+            _occupancy_cache.move_to_end(session_id)
+            return cached
+        _occupancy_cache.pop(session_id, None)
+
+    # Version read first: a write landing during the build only makes the index look stale
+    occupancy = await build_occupancy(session_id, group_ids, db)
+    occupancy.version = version
+    _occupancy_cache[session_id] = occupancy
+    while len(_occupancy_cache) > OCCUPANCY_CACHE_SIZE:
+        _occupancy_cache.popitem(last=False)
+    return occupancy
+
+
+def record_join(occupancy: SessionOccupancy, group_id: int, member_data: dict, version: Optional[int]) -> None:
+    """Keep a cached index current after a member row has been committed.
+
+    version is the data_version the join's commit set. The index is updated only if it is
+    still cached and was at the version just before, i.e. no other write came in between;
+    otherwise it is left stale and the next get_occupancy rebuilds it.
+    """
+    if _occupancy_cache.get(occupancy.session_id) is not occupancy:
+        return
+    if version is not None and occupancy.version is not None and occupancy.version == version - 1:
+        occupancy.add_member(group_id, member_data)
+        occupancy.version = version
+
+
+def invalidate_occupancy(session_id: Optional[int] = None) -> None:
+    if session_id is None:
+        _occupancy_cache.clear()
+    else:
+        _occupancy_cache.pop(session_id, None)
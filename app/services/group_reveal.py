@@ -0,0 +1,208 @@
+# app/services/group_reveal.py
+"""
+Server-Sent Events for participants waiting for the host to reveal their group.
+
+Each worker keeps one broadcast subscription per session that has waiting participants
+(a "room") and a future per connection. A reveal publishes every member's group in one
+message; each worker parses it once and resolves the futures of the participants it
+holds, so an idle connection costs a coroutine and a future, not a queue or a DB session.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.broadcast import broadcast, reveal_channel
+from app.core.database import async_session
+from app.services.access_code_cache import resolve_access_code
+from app.models.group_member import GroupMember
+from app.models.group_session import GroupSession
+
+logger = logging.getLogger(__name__)
+
+
+# Comment line sent on idle streams so proxies and clients keep the connection open
+REVEAL_SSE_HEARTBEAT_SECONDS = float(os.getenv("REVEAL_SSE_HEARTBEAT_SECONDS", "15"))
+# Reconnect delay suggested to EventSource clients
+REVEAL_SSE_RETRY_MS = int(os.getenv("REVEAL_SSE_RETRY_MS", "3000"))
+
+# (event id, group name)
+RevealResult = Tuple[str, str]
+
+
+class _RevealRoom:
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        self.waiters: Dict[str, Set[asyncio.Future]] = {}
+        self.subscription = broadcast.subscription()
+        self.ready = asyncio.Event()
+        self.reader: Optional[asyncio.Task] = None
+        # Set when the subscription failed; waiters that joined meanwhile raise it too
+        self.error: Optional[Exception] = None
+
+
+_rooms: Dict[int, _RevealRoom] = {}
+
+
+def reveal_event_id(session_id: int) -> str:
+    return f"reveal-{session_id}"
+
+
+async def _join_room(session_id: int, member_identifier: str) -> Tuple[_RevealRoom, asyncio.Future]:
+    room = _rooms.get(session_id)
+    if room is None:
+        room = _rooms[session_id] = _RevealRoom(session_id)
+        future = asyncio.get_running_loop().create_future()
+        room.waiters.setdefault(member_identifier, set()).add(future)
+        try:
+            await room.subscription.subscribe(reveal_channel(session_id))
+            room.reader = asyncio.create_task(_read_room(room))
+        except Exception as e:
+            _rooms.pop(session_id, None)
+            room.error = e
+            room.waiters.clear()
+            try:
+                await room.subscription.close()
+            except Exception as close_error:
+                logger.warning("Closing failed reveal subscription for session %s: %s", session_id, close_error)
+            raise
+        finally:
+            room.ready.set()
+        return room, future
+    future = asyncio.get_running_loop().create_future()
+    room.waiters.setdefault(member_identifier, set()).add(future)
+    # Joining while the first waiter is still subscribing: do not miss a reveal in between
+    await room.ready.wait()
+    if room.error is not None:
+        # The room was never subscribed and is no longer listed; nothing would resolve the future
+        raise room.error
+    return room, future
+
+
+async def _leave_room(room: _RevealRoom, member_identifier: str, future: asyncio.Future) -> None:
+    futures = room.waiters.get(member_identifier)
+    if futures is not None:
+        futures.discard(future)
+        if not futures:
+            del room.waiters[member_identifier]
+    if not room.waiters and _rooms.get(room.session_id) is room:
+        del _rooms[room.session_id]
+        if room.reader is not None:
+            room.reader.cancel()
+        await room.subscription.close()
+
+
+async def _read_room(room: _RevealRoom) -> None:
+    while True:
+        _, message = await room.subscription.get()
+        try:
+            payload = json.loads(message)
+            event_id, groups = payload["event_id"], payload["groups"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring malformed reveal message for session %s: %s", room.session_id, e)
+            continue
+        for member_identifier, futures in room.waiters.items():
+            group_name = groups.get(member_identifier)
+            if group_name is None:
+                continue
+            for future in futures:
+                if not future.done():
+                    future.set_result((event_id, group_name))
+
+
+async def publish_reveal(session_id: int, groups: Dict[str, str]) -> None:
+    """Send every waiting participant of the session, on every worker, their group"""
+    await broadcast.publish(
+        reveal_channel(session_id),
+        json.dumps({"event_id": reveal_event_id(session_id), "groups": groups})
+    )
+
+
+async def get_member_reveal_state(
+    session_id: int,
+    member_identifier: str,
+    db: AsyncSession
+) -> Optional[Tuple[str, bool]]:
+    """(group name, revealed) of a member of a group session, or None if they have not joined"""
+    row = (await db.exec(
+        select(GroupMember.group_name, GroupSession.reveal_immediately)
+        .join(GroupSession, GroupSession.id == GroupMember.session_id)
+        .where(GroupMember.session_id == session_id, GroupMember.member_identifier == member_identifier)
+    )).first()
+    if row is None:
+        return None
+    group_name, revealed = row
+    return group_name, bool(revealed)
+
+
+async def resolve_reveal_member(code: str, member_identifier: str, db: AsyncSession) -> Tuple[int, str]:
+    """(session id, session name) for a participant of a group session's access code"""
+    resolved = await resolve_access_code(code, db)
+    if resolved is None:
+        raise ValueError("Invalid or expired code")
+    if resolved["kind"] != "group":
+        raise ValueError("Group session not found")
+    if await get_member_reveal_state(resolved["session_id"], member_identifier, db) is None:
+        raise ValueError("Member has not joined this session")
+    return resolved["session_id"], resolved["name"]
+
+
+def _sse(event: str, event_id: str, data: dict) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def reveal_stream(session_id: int, session_name: str, member_identifier: str) -> AsyncIterator[str]:
+    """SSE stream that ends with one "reveal" event carrying the member's group.
+
+    The member is registered before the reveal state is read again, so a reveal that
+    lands between the two is delivered either way. Nothing is yielded until then.
+    """
+    room, future = await _join_room(session_id, member_identifier)
+    try:
+        # Inside the try, so a client that leaves after this chunk still releases its place
+        yield f"retry: {REVEAL_SSE_RETRY_MS}\n\n"
+        async with async_session() as db:
+            state = await get_member_reveal_state(session_id, member_identifier, db)
+        if state is not None and state[1]:
+            result: RevealResult = (reveal_event_id(session_id), state[0])
+        else:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=REVEAL_SSE_HEARTBEAT_SECONDS)
+                if done:
+                    result = future.result()
+                    break
+                yield ": heartbeat\n\n"
+        event_id, group_name = result
+        yield _sse("reveal", event_id, {"session": session_name, "member_identifier": member_identifier, "group_name": group_name})
+    finally:
+        await _leave_room(room, member_identifier, future)
+
+
+async def open_reveal_stream(session_id: int, session_name: str, member_identifier: str) -> AsyncIterator[str]:
+    """reveal_stream, already started: the participant is registered when this returns, so a
+    broadcast failure raises here instead of after the response has begun"""
+    stream = reveal_stream(session_id, session_name, member_identifier)
+    first = await stream.__anext__()
+    return _resume_stream(first, stream)
+
+
+async def _resume_stream(first: str, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+def reveal_waiter_count(session_id: Optional[int] = None) -> int:
+    """Participants waiting on this worker, for one session or in total"""
+    if session_id is not None:
+        rooms = [_rooms[session_id]] if session_id in _rooms else []
+    else:
+        rooms = list(_rooms.values())
+    return sum(len(futures) for room in rooms for futures in room.waiters.values())
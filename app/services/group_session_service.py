@@ -1,20 +1,78 @@
 # app/services/group_session_service.py
+import asyncio
+import contextlib
+import os
 import random
+import weakref
 
-from sqlmodel import select
+from sqlalchemy import and_, insert, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlmodel import select, func
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.group_session import GroupSession
 from app.models.access_code import AccessCode
 from app.models.groups import Group
 from app.models.field_definition import FieldDefinition
-from app.schemas.group_session import GroupSessionCreate, GroupSessionRead, GroupJoinResponse
+from app.schemas.group_session import (
+    GroupSessionCreate, GroupSessionRead, GroupJoinResponse,
+    GroupBatchJoinMember, GroupBatchJoinResult, GroupBatchJoinResponse, GroupSolveResponse,
+    GroupRevealResponse
+)
 from app.utils.code_generator import generate_group_code
 from datetime import datetime, timedelta, timezone
 from app.models.preferential_grouping_rule import PreferentialGroupingRule
 from app.models.group_member import GroupMember
+from app.services.group_occupancy import (
+    get_occupancy, build_occupancy, invalidate_occupancy,
+    member_rule_keys, group_is_eligible, record_join
+)
+from app.services.group_solver import solve_group_assignment
+from app.services.access_code_cache import ResolvedCode, resolve_access_code, ensure_code_active, invalidate_access_code
+from app.services.host_stats_service import bump_host_stats
+from app.services.data_version import bump_data_version
+from app.services.live_events import publish_session_event, PARTICIPANT_JOINED, MEMBERS_REGROUPED
+from app.services.group_reveal import publish_reveal
 from typing import Optional, List
 
 
+# How join_group picks eligible groups:
+#   "index" - in-memory occupancy index per session (app/services/group_occupancy.py)
+#   "sql"   - one aggregate query over group_members returning the eligible group ids
+GROUP_ASSIGNMENT_MODE = os.getenv("GROUP_ASSIGNMENT_MODE", "index").lower()
+
+# How concurrent joins to the same session are serialized:
+#   "advisory" - pg_advisory_xact_lock keyed on the group session id (default)
+#   "row"      - SELECT ... FOR UPDATE on the session's groups rows
+#   "none"     - no database lock; joins to a session are serialized within this worker
+#                only, so this is safe with a single worker
+GROUP_JOIN_LOCK = os.getenv("GROUP_JOIN_LOCK", "advisory").lower()
+GROUP_JOIN_MAX_RETRIES = int(os.getenv("GROUP_JOIN_MAX_RETRIES", "3"))
+
+# Largest roster accepted by join_group_batch in one request
+GROUP_BATCH_JOIN_MAX = int(os.getenv("GROUP_BATCH_JOIN_MAX", "5000"))
+
+# When set, a member's group depends only on this seed, the session, the member identifier
+# and the groups still eligible, so the same sequence of joins always assigns the same way
+GROUP_ASSIGNMENT_SEED = os.getenv("GROUP_ASSIGNMENT_SEED")
+
+# First key of the two-key advisory lock, so group-join locks don't collide with other users
+_GROUP_JOIN_LOCK_NAMESPACE = 7301
+
+# serialization_failure, deadlock_detected, lock_not_available
+_RETRYABLE_SQLSTATES = {"40001", "40P01", "55P03"}
+
+_assignment_random = random.Random()
+
+# Per-access-code locks for GROUP_JOIN_LOCK="none"; entries go away with their last holder
+_local_join_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _assignment_rng(session_id: int, member_identifier: str) -> random.Random:
+    if GROUP_ASSIGNMENT_SEED is None:
+        return _assignment_random
+    return random.Random(f"{GROUP_ASSIGNMENT_SEED}:{session_id}:{member_identifier}")
+
+
 async def create_group_session(
     data: GroupSessionCreate,
     host_id: int,
@@ -86,8 +144,11 @@ async def create_group_session(
         )
         session.add(rule_model)
 
+    await bump_host_stats(host_id, session, group_sessions=1)
     await session.commit()
     await session.refresh(group_session)
+    # A code string freed by an expired session may still be cached for the old one
+    await invalidate_access_code(access_code.code)
     
     # Create a response object that matches the GroupSessionRead schema
     response = GroupSessionRead(
@@ -104,178 +165,426 @@ async def create_group_session(
 
 
 async def validate_code_and_get_fields(code: str, session: AsyncSession) -> dict:
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
-    access_code_result = await session.exec(select(AccessCode).where(AccessCode.code == code))
-    access_code = access_code_result.first()
-    if not access_code or access_code.expires_at < now or access_code.status != "active":
-        raise ValueError("Invalid or expired code")
-
-    session_result = await session.exec(select(GroupSession).where(GroupSession.code_id == access_code.id))
-    group_session = session_result.first()
-    if not group_session:
-        raise ValueError("Group session not found")
+    resolved = await _get_active_group_session(code, session)
 
-    fields_result = await session.exec(select(FieldDefinition).where(FieldDefinition.session_id == group_session.id))
-    field_keys = [field.field_key for field in fields_result.all()]
-    
     # Return a dictionary instead of a list
-    return {"name": group_session.name, "description": group_session.description, 
-            "fields": field_keys, "identifier": group_session.member_identifier
+    return {"name": resolved["name"], "description": resolved["description"],
+            "fields": resolved["field_keys"], "identifier": resolved["identifier"]
             }
 
 
+async def eligible_group_ids_sql(
+    session_id: int,
+    max_group_size: int,
+    rule_keys: list,
+    session: AsyncSession
+) -> set:
+    """Return ids of groups that can take a member, using one GROUP BY over group_members.
+
+    Capacity and every preferential rule the member is subject to (see member_rule_keys)
+    become HAVING conditions on filtered counts, so no member rows leave the database.
+    """
+    conditions = [func.count(GroupMember.id) < max_group_size]
+    for (kind, field_key, value), limit in rule_keys:
+        field_value = GroupMember.member_data[field_key].astext
+        if kind == "field":
+            matches = field_value == value
+        else:
+            matches = func.lower(field_value) == value
+        conditions.append(func.count(GroupMember.id).filter(matches) < limit)
+
+    result = await session.exec(
+        select(Group.id)
+        .outerjoin(
+            GroupMember,
+            (GroupMember.group_id == Group.id) & (GroupMember.session_id == session_id)
+        )
+        .where(Group.session_id == session_id)
+        .group_by(Group.id)
+        .having(and_(*conditions))
+    )
+    return set(result.all())
+
+
+async def _get_active_group_session(code: str, session: AsyncSession) -> ResolvedCode:
+    # Access code, session, fields, rules and groups come from the resolution cache
+    resolved = await resolve_access_code(code, session)
+    if resolved is None:
+        raise ValueError("Invalid or expired code")
+    if resolved["kind"] != "group":
+        raise ValueError("Group session not found")
+    return resolved
+
+
+def _cached_rules(resolved: ResolvedCode) -> List[PreferentialGroupingRule]:
+    # Transient rule objects, only read by member_rule_keys
+    return [
+        PreferentialGroupingRule(group_session_id=resolved["session_id"], field_key=field_key, max_per_group=limit)
+        for field_key, limit in resolved["rules"]
+    ]
+
+
+def _cached_groups(resolved: ResolvedCode) -> List[Group]:
+    # Transient group objects carrying the id and name used for assignment
+    return [Group(id=group_id, session_id=resolved["session_id"], name=name) for group_id, name in resolved["groups"]]
+
+
+async def lock_group_session(group_session_id: int, session: AsyncSession) -> None:
+    """Serialize joins for one group session until the current transaction ends."""
+    if GROUP_JOIN_LOCK == "advisory":
+        await session.exec(select(func.pg_advisory_xact_lock(_GROUP_JOIN_LOCK_NAMESPACE, group_session_id)))
+    elif GROUP_JOIN_LOCK == "row":
+        await session.exec(select(Group.id).where(Group.session_id == group_session_id).with_for_update())
+
+
+def _local_join_lock(code: str):
+    """In-process join serialization when no database lock is used"""
+    if GROUP_JOIN_LOCK != "none":
+        return contextlib.nullcontext()
+    lock = _local_join_locks.get(code)
+    if lock is None:
+        lock = _local_join_locks[code] = asyncio.Lock()
+    return lock
+
+
+def _is_retryable(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    for candidate in (orig, getattr(orig, "__cause__", None)):
+        code = getattr(candidate, "sqlstate", None) or getattr(candidate, "pgcode", None)
+        if code in _RETRYABLE_SQLSTATES:
+            return True
+    return False
+
+
 async def join_group(
     code: str,
     member_identifier: str,
     member_data: dict,
     session: AsyncSession
 ) -> GroupJoinResponse:
+    """Assign a member to a group, retrying when the database reports a lock conflict."""
+    attempt = 0
+    while True:
+        try:
+            async with _local_join_lock(code):
+                return await _join_group_once(code, member_identifier, member_data, session)
+        except DBAPIError as exc:
+            await session.rollback()
+            attempt += 1
+            if attempt > GROUP_JOIN_MAX_RETRIES or not _is_retryable(exc):
+                raise
+            await asyncio.sleep(0.05 * attempt + random.random() * 0.05)
+
+
+async def _join_group_once(
+    code: str,
+    member_identifier: str,
+    member_data: dict,
+    session: AsyncSession
+) -> GroupJoinResponse:
     
     now = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    # Validate access code
-    access_code_result = await session.exec(select(AccessCode).where(AccessCode.code == code))
-    access_code = access_code_result.first()
-    if not access_code or access_code.expires_at < now or access_code.status != "active":
-        raise ValueError("Invalid or expired code")
+    # Validate access code and get group session, groups, rules and fields (cached)
+    resolved = await _get_active_group_session(code, session)
+    session_id = resolved["session_id"]
+    max_group_size = resolved["max_group_size"]
 
-    # Get group session
-    session_result = await session.exec(select(GroupSession).where(GroupSession.code_id == access_code.id))
-    group_session = session_result.first()
-    if not group_session:
-        raise ValueError("Group session not found")
+    # Serialize with other joins to this session so capacity and rules are checked
+    # against committed state only
+    await lock_group_session(session_id, session)
+    # The cached resolution may predate end_session on another worker
+    await ensure_code_active(resolved, session)
 
     # Check if member already joined
     dup_check = await session.exec(
-        select(GroupMember).where(
-            GroupMember.session_id == group_session.id,
+        select(GroupMember.id).where(
+            GroupMember.session_id == session_id,
             GroupMember.member_identifier == member_identifier
         )
     )
     if dup_check.first():
         raise ValueError("Member already joined")
 
-    # Get all groups for this session
-    group_result = await session.exec(select(Group).where(Group.session_id == group_session.id))
-    groups = group_result.all()
+    groups = _cached_groups(resolved)
+
+    # Field keys decide whether a rule is field-based ("gender") or value-based ("female")
+    rule_keys = member_rule_keys(member_data, _cached_rules(resolved), resolved["field_keys"])
 
-    # Get all preferential rules for this session
-    pref_result = await session.exec(
-        select(PreferentialGroupingRule).where(
-            PreferentialGroupingRule.group_session_id == group_session.id
-        )
-    )
-    pref_rules = pref_result.all()
-    
-    # Prepare for group assignment
-    eligible_groups = []
-    
     # Shuffle the groups for randomization
+    rng = _assignment_rng(session_id, member_identifier)
     shuffled_groups = list(groups)
-    random.shuffle(shuffled_groups)
-    
-    for group in shuffled_groups:
-        # Check if group is at maximum capacity
-        count_result = await session.exec(
-            select(GroupMember).where(GroupMember.group_id == group.id)
-        )
-        group_members = count_result.all()
-        member_count = len(group_members)
-        
-        if member_count >= group_session.max_group_size:
-            continue
-        
-        # Check all preferential rules
-        satisfies_all_rules = True
-        
-        for rule in pref_rules:
-            # Checking if rule applies to the current member
-            
-            # First, get all the fields defined for this session
-            fields_result = await session.exec(select(FieldDefinition).where(FieldDefinition.session_id == group_session.id))
-            field_keys = [field.field_key for field in fields_result.all()]
-            
-            # Check if rule.field_key is one of the defined fields or a specific value
-            if rule.field_key in field_keys:
-                # Standard field-based rule (e.g., "gender")
-                if rule.field_key not in member_data:
-                    continue
-                    
-                member_field_value = str(member_data[rule.field_key])
-                
-                # Count members in this group with the same field value
-                matching_members = 0
-                for existing_member in group_members:
-                    if rule.field_key in existing_member.member_data:
-                        existing_value = str(existing_member.member_data[rule.field_key])
-                        if existing_value == member_field_value:
-                            matching_members += 1
-                
-                # Check if adding this member would exceed the limit
-                if matching_members >= rule.max_per_group:
-                    satisfies_all_rules = False
-                    break
-            else:
-                # Value-based rule (e.g., field_key="female" or "advanced" or any specific value)
-                is_match = False
-                field_match = None
-                
-                # Check all fields to see if any matches the rule value
-                for field in member_data:
-                    if str(member_data[field]).lower() == rule.field_key.lower():
-                        is_match = True
-                        field_match = field
-                        break
-                
-                if is_match:
-                    # Count members in this group with the same value in the matching field
-                    matching_members = 0
-                    for existing_member in group_members:
-                        if field_match in existing_member.member_data:
-                            existing_value = str(existing_member.member_data[field_match])
-                            if existing_value.lower() == rule.field_key.lower():
-                                matching_members += 1
-                    
-                    # If this member matches and adding them would exceed the limit, mark group as ineligible
-                    if matching_members >= rule.max_per_group:
-                        satisfies_all_rules = False
-                        break
-                
-        if satisfies_all_rules:
-            eligible_groups.append(group)
+    rng.shuffle(shuffled_groups)
+
+    occupancy = None
+    if GROUP_ASSIGNMENT_MODE == "sql":
+        eligible_ids = await eligible_group_ids_sql(session_id, max_group_size, rule_keys, session)
+        eligible_groups = [group for group in shuffled_groups if group.id in eligible_ids]
+    else:
+        # Occupancy index (member counts and value histograms per group) instead of loading members
+        occupancy = await get_occupancy(session_id, [group.id for group in groups], session)
+        eligible_groups = [
+            group for group in shuffled_groups
+            if group_is_eligible(occupancy, group.id, max_group_size, rule_keys)
+        ]
     
     # If no eligible groups, raise error
     if not eligible_groups:
         raise ValueError("No suitable group available - all groups are either full or would violate preferential grouping rules")
     
     # Randomly select from eligible groups
-    selected_group = random.choice(eligible_groups)
+    selected_group = rng.choice(eligible_groups)
     
     # Create the new member
     member = GroupMember(
         group_id=selected_group.id,
-        session_id=group_session.id,
+        session_id=session_id,
         group_name=selected_group.name,
         member_identifier=member_identifier,
         member_data=member_data,
         joined_at=now
     )
     session.add(member)
-    await session.commit()
+    await bump_host_stats(resolved["host_id"], session, participants=1)
+    version = await bump_data_version("group", session_id, session)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # uq_group_members_session_member: the same identifier joined concurrently
+        await session.rollback()
+        raise ValueError("Member already joined")
     await session.refresh(member)
+    if occupancy is not None:
+        record_join(occupancy, selected_group.id, member_data, version)
+    publish_session_event(
+        "group", session_id, PARTICIPANT_JOINED,
+        {"member_identifier": member_identifier, "group_name": selected_group.name},
+        {"participants": 1, "groups": {selected_group.name: 1}}
+    )
 
-    if group_session.reveal_immediately:
+    if resolved["reveal_immediately"]:
         # If reveal is enabled, we can immediately return the response
         return GroupJoinResponse(
             message=f"Successfully joined group {selected_group.name}",
             group_name=selected_group.name,
-            session=group_session.name,
+            session=resolved["name"],
             member_identifier=member_identifier
         )
     else:
         return GroupJoinResponse(
             message="Successfully joined a group. Wait for the host to reveal your group.",
             group_name="Hidden",  # Provide a placeholder value
-            session=group_session.name,
+            session=resolved["name"],
             member_identifier=member_identifier
-        )
\ No newline at end of file
+        )
+
+
+async def join_group_batch(
+    code: str,
+    members: List[GroupBatchJoinMember],
+    host_id: int,
+    session: AsyncSession
+) -> GroupBatchJoinResponse:
+    """Assign a whole roster to groups in one transaction.
+
+    The access code, groups and rules are loaded once, every member is assigned in memory
+    with the same rule semantics as join_group, and all accepted members are written with
+    a single bulk INSERT. Duplicates and members no group can take are reported per row.
+    """
+    if len(members) > GROUP_BATCH_JOIN_MAX:
+        raise ValueError(f"Too many members in one batch (maximum {GROUP_BATCH_JOIN_MAX})")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    resolved = await _get_active_group_session(code, session)
+    if resolved["host_id"] != host_id:
+        raise ValueError("You are not authorized to add members to this session")
+    session_id = resolved["session_id"]
+    max_group_size = resolved["max_group_size"]
+
+    await lock_group_session(session_id, session)
+    await ensure_code_active(resolved, session)
+
+    # Identifiers that already joined, in one query
+    identifiers = list({m.member_identifier for m in members})
+    existing_result = await session.exec(
+        select(GroupMember.member_identifier).where(
+            GroupMember.session_id == session_id,
+            GroupMember.member_identifier.in_(identifiers)
+        )
+    )
+    seen = set(existing_result.all())
+
+    groups = _cached_groups(resolved)
+    pref_rules = _cached_rules(resolved)
+    field_keys = resolved["field_keys"]
+
+    # Private index: it is mutated while assigning and must not leak into the shared cache
+    occupancy = await build_occupancy(session_id, [group.id for group in groups], session)
+
+    results: List[GroupBatchJoinResult] = []
+    rows = []
+    for item in members:
+        if item.member_identifier in seen:
+            results.append(GroupBatchJoinResult(
+                member_identifier=item.member_identifier,
+                status="duplicate",
+                detail="Member already joined"
+            ))
+            continue
+        seen.add(item.member_identifier)
+
+        rule_keys = member_rule_keys(item.member_data, pref_rules, field_keys)
+        eligible_groups = [
+            group for group in groups
+            if group_is_eligible(occupancy, group.id, max_group_size, rule_keys)
+        ]
+        if not eligible_groups:
+            results.append(GroupBatchJoinResult(
+                member_identifier=item.member_identifier,
+                status="rejected",
+                detail="No suitable group available - all groups are either full or would violate preferential grouping rules"
+            ))
+            continue
+
+        selected_group = _assignment_rng(session_id, item.member_identifier).choice(eligible_groups)
+        occupancy.add_member(selected_group.id, item.member_data)
+        rows.append({
+            "group_id": selected_group.id,
+            "session_id": session_id,
+            "group_name": selected_group.name,
+            "member_identifier": item.member_identifier,
+            "member_data": item.member_data,
+            "joined_at": now,
+        })
+        results.append(GroupBatchJoinResult(
+            member_identifier=item.member_identifier,
+            status="joined",
+            group_name=selected_group.name if resolved["reveal_immediately"] else "Hidden"
+        ))
+
+    if rows:
+        await session.exec(insert(GroupMember), params=rows)
+        await bump_host_stats(host_id, session, participants=len(rows))
+        await bump_data_version("group", session_id, session)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise ValueError("Some members already joined while the batch was running; retry the batch")
+    invalidate_occupancy(session_id)
+    for row in rows:
+        publish_session_event(
+            "group", session_id, PARTICIPANT_JOINED,
+            {"member_identifier": row["member_identifier"], "group_name": row["group_name"]},
+            {"participants": 1, "groups": {row["group_name"]: 1}}
+        )
+
+    return GroupBatchJoinResponse(
+        session=resolved["name"],
+        joined=len(rows),
+        failed=len(results) - len(rows),
+        results=results
+    )
+
+
+async def solve_group_session(
+    code: str,
+    host_id: int,
+    apply: bool,
+    session: AsyncSession
+) -> GroupSolveResponse:
+    """Recompute a balanced assignment of every current member of a group session.
+
+    Unlike join_group, which places members greedily one at a time, this looks at all
+    members together. When apply is set and a feasible assignment is found, moved members
+    are updated in one bulk UPDATE.
+    """
+    resolved = await _get_active_group_session(code, session)
+    if resolved["host_id"] != host_id:
+        raise ValueError("You are not authorized to regroup this session")
+    session_id = resolved["session_id"]
+
+    await lock_group_session(session_id, session)
+
+    group_names = dict(resolved["groups"])
+
+    members_result = await session.exec(
+        select(GroupMember.id, GroupMember.group_id, GroupMember.member_data)
+        .where(GroupMember.session_id == session_id)
+        .order_by(GroupMember.id)
+    )
+    member_rows = members_result.all()
+    current_group = {member_id: group_id for member_id, group_id, _ in member_rows}
+
+    solution = solve_group_assignment(
+        [(member_id, member_data) for member_id, _, member_data in member_rows],
+        list(group_names),
+        resolved["max_group_size"],
+        _cached_rules(resolved),
+        resolved["field_keys"],
+    )
+
+    moves = [
+        {"id": member_id, "group_id": group_id, "group_name": group_names[group_id]}
+        for member_id, group_id in solution["assignment"].items()
+        if current_group.get(member_id) != group_id
+    ]
+
+    applied = False
+    if apply and solution["feasible"]:
+        if moves:
+            await session.exec(update(GroupMember), params=moves)
+            await bump_data_version("group", session_id, session)
+        await session.commit()
+        invalidate_occupancy(session_id)
+        applied = True
+        if moves:
+            group_delta = {}
+            for move in moves:
+                old_name = group_names[current_group[move["id"]]]
+                group_delta[old_name] = group_delta.get(old_name, 0) - 1
+                group_delta[move["group_name"]] = group_delta.get(move["group_name"], 0) + 1
+            publish_session_event("group", session_id, MEMBERS_REGROUPED, {"moved": len(moves)}, {"groups": group_delta})
+
+    sizes = {name: 0 for name in group_names.values()}
+    for group_id in solution["assignment"].values():
+        sizes[group_names[group_id]] += 1
+
+    return GroupSolveResponse(
+        feasible=solution["feasible"],
+        applied=applied,
+        total_members=len(member_rows),
+        moved=len(moves),
+        group_sizes=sizes,
+        certificate=solution["certificate"]
+    )
+
+
+async def reveal_group_session(
+    code: str,
+    host_id: int,
+    session: AsyncSession
+) -> GroupRevealResponse:
+    """Reveal every member's group: later joins see their group at once, and participants
+    waiting on the reveal stream get theirs in one fan-out built from a single query."""
+    resolved = await _get_active_group_session(code, session)
+    if resolved["host_id"] != host_id:
+        raise ValueError("You are not authorized to reveal this session")
+    session_id = resolved["session_id"]
+
+    group_session = await session.get(GroupSession, session_id)
+    if not group_session.reveal_immediately:
+        group_session.reveal_immediately = True
+        session.add(group_session)
+        await session.commit()
+    await invalidate_access_code(code)
+
+    members_result = await session.exec(
+        select(GroupMember.member_identifier, GroupMember.group_name)
+        .where(GroupMember.session_id == session_id)
+    )
+    groups = {member_identifier: group_name for member_identifier, group_name in members_result.all()}
+    await publish_reveal(session_id, groups)
+
+    return GroupRevealResponse(session=resolved["name"], revealed=len(groups))
@@ -0,0 +1,341 @@
+# app/services/group_solver.py
+import heapq
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.group_occupancy import RuleKey, member_rule_keys
+
+
+# Chain steps the repair pass may explore when the greedy pass leaves members unassigned
+GROUP_SOLVER_REPAIR_LIMIT = int(os.getenv("GROUP_SOLVER_REPAIR_LIMIT", "20000"))
+# Sessions up to this many members get an exhaustive search if repair also fails
+GROUP_SOLVER_EXACT_MAX_MEMBERS = int(os.getenv("GROUP_SOLVER_EXACT_MAX_MEMBERS", "200"))
+# Placements the exhaustive search may try
+GROUP_SOLVER_SEARCH_LIMIT = int(os.getenv("GROUP_SOLVER_SEARCH_LIMIT", "200000"))
+
+
+def solve_group_assignment(
+    members: List[Tuple[int, dict]],
+    group_ids: List[int],
+    max_group_size: int,
+    pref_rules: list,
+    field_keys: List[str],
+) -> Dict[str, Any]:
+    """Compute a balanced assignment of all members to groups.
+
+    Constraints are max_group_size and, for every preferential rule, at most max_per_group
+    members sharing the rule key (see member_rule_keys) in one group.
+
+    Before searching, the per-key and total capacity bounds are checked; any violation is a
+    proof that no assignment exists and is returned as the certificate. Otherwise members are
+    placed most-constrained key set first, each into the least loaded group that can still
+    take it, which keeps group sizes within one of each other. This is exact when every member
+    is subject to at most one rule key. With overlapping keys the greedy pass can strand
+    members; each is then placed by moving the members that block it to other groups
+    (_repair). If some are still left and the session has at most
+    GROUP_SOLVER_EXACT_MAX_MEMBERS members, an exhaustive search (_search) finds an
+    assignment, balanced if possible, or proves that none exists. Larger sessions report a
+    failure that is not proven.
+
+    Args:
+        members: (member_id, member_data) pairs
+        group_ids: groups available in the session
+        max_group_size: capacity of every group
+        pref_rules: PreferentialGroupingRule rows of the session
+        field_keys: field keys defined for the session
+
+    Returns:
+        Dict with feasible, assignment (member_id -> group_id), unassigned and certificate
+    """
+    n_groups = len(group_ids)
+    certificate: List[str] = []
+
+    # Rule keys per member; a key constrained by several rules keeps the tightest limit
+    limits: Dict[RuleKey, int] = {}
+    key_counts: Dict[RuleKey, int] = {}
+    signatures: Dict[Tuple[RuleKey, ...], List[int]] = {}
+    for member_id, member_data in members:
+        keys = member_rule_keys(member_data or {}, pref_rules, field_keys)
+        signature = tuple(sorted({key for key, _ in keys}))
+        for key, limit in keys:
+            limits[key] = min(limit, limits.get(key, limit))
+        for key in signature:
+            key_counts[key] = key_counts.get(key, 0) + 1
+        signatures.setdefault(signature, []).append(member_id)
+
+    # Necessary conditions: each one that fails proves infeasibility
+    if n_groups == 0 and members:
+        certificate.append("The session has no groups")
+    if len(members) > n_groups * max_group_size:
+        certificate.append(
+            f"{len(members)} members exceed total capacity of {n_groups} groups x {max_group_size}"
+        )
+    for key, count in sorted(key_counts.items()):
+        per_group = min(limits[key], max_group_size)
+        if count > n_groups * per_group:
+            _, field_key, value = key
+            certificate.append(
+                f"{count} members with {field_key}={value} but at most {per_group} per group "
+                f"across {n_groups} groups ({n_groups * per_group} places)"
+            )
+    if certificate:
+        return {
+            "feasible": False,
+            "assignment": {},
+            "unassigned": [member_id for member_id, _ in members],
+            "certificate": certificate,
+        }
+
+    load = {gid: 0 for gid in group_ids}
+    key_load: Dict[RuleKey, Dict[int, int]] = {key: {gid: 0 for gid in group_ids} for key in limits}
+    assignment: Dict[int, int] = {}
+    unassigned: List[int] = []
+
+    def tightness(signature: Tuple[RuleKey, ...]) -> float:
+        if not signature:
+            return -1.0
+        return max(key_counts[key] / (n_groups * limits[key]) for key in signature)
+
+    # Most constrained key sets first, unconstrained members fill the remaining space last
+    for signature in sorted(signatures, key=tightness, reverse=True):
+        heap = [
+            (load[gid], gid) for gid in group_ids
+            if load[gid] < max_group_size and all(key_load[key][gid] < limits[key] for key in signature)
+        ]
+        heapq.heapify(heap)
+        for member_id in signatures[signature]:
+            if not heap:
+                unassigned.append(member_id)
+                continue
+            _, gid = heapq.heappop(heap)
+            assignment[member_id] = gid
+            load[gid] += 1
+            for key in signature:
+                key_load[key][gid] += 1
+            # Loads only change through this loop, so the popped group is re-pushed if still open
+            if load[gid] < max_group_size and all(key_load[key][gid] < limits[key] for key in signature):
+                heapq.heappush(heap, (load[gid], gid))
+
+    if unassigned:
+        signature_of = {member_id: signature for signature, ids in signatures.items() for member_id in ids}
+        unassigned = _repair(unassigned, signature_of, assignment, group_ids, limits, load, key_load, max_group_size)
+
+    if unassigned and len(members) <= GROUP_SOLVER_EXACT_MAX_MEMBERS:
+        order = [
+            (member_id, signature)
+            for signature in sorted(signatures, key=tightness, reverse=True)
+            for member_id in signatures[signature]
+        ]
+        balanced = -(-len(members) // n_groups)
+        exhausted = False
+        for min_size, cap in ((len(members) // n_groups, balanced), (0, max_group_size)):
+            found, complete = _search(order, group_ids, limits, min_size, min(cap, max_group_size))
+            if found is not None:
+                return {"feasible": True, "assignment": found, "unassigned": [], "certificate": []}
+            exhausted = exhausted or not complete
+        if not exhausted:
+            certificate.append("An exhaustive search over the overlapping rules found no assignment")
+    if unassigned and not certificate:
+        certificate.append(
+            f"{len(unassigned)} members could not be placed; no capacity or rule bound is "
+            "violated, so overlapping rules may still admit an assignment"
+        )
+
+    return {
+        "feasible": not unassigned,
+        "assignment": assignment,
+        "unassigned": unassigned,
+        "certificate": certificate,
+    }
+
+
+def _repair(
+    unassigned: List[int],
+    signature_of: Dict[int, Tuple[RuleKey, ...]],
+    assignment: Dict[int, int],
+    group_ids: List[int],
+    limits: Dict[RuleKey, int],
+    load: Dict[int, int],
+    key_load: Dict[RuleKey, Dict[int, int]],
+    max_size: int,
+) -> List[int]:
+    """Place stranded members by ejection chains; returns the members still unassigned.
+
+    For a stranded member, a breadth-first search looks for a group it fits, or a group it
+    would fit once one member leaves, that member then needing a group in turn. Members
+    with the same key set in the same group are interchangeable, so each (key set, group)
+    is expanded once. A chain visits every group at most once, so applying all of its moves
+    together keeps every bound. Updates assignment, load and key_load in place.
+    """
+    members_in: Dict[int, Dict[Tuple[RuleKey, ...], List[int]]] = {gid: {} for gid in group_ids}
+    for member_id, gid in assignment.items():
+        members_in[gid].setdefault(signature_of[member_id], []).append(member_id)
+
+    def options(signature: Tuple[RuleKey, ...]) -> Tuple[List[int], List[Tuple[int, Tuple[RuleKey, ...]]]]:
+        """Groups the key set fits as is, least loaded first, and (group, key set) of members
+        whose leaving would let it in"""
+        open_groups = []
+        swaps = []
+        for gid in group_ids:
+            blocked = [key for key in signature if key_load[key][gid] >= limits[key]]
+            if not blocked and load[gid] < max_size:
+                open_groups.append(gid)
+                continue
+            for other_signature, ids in members_in[gid].items():
+                if ids and all(key in other_signature for key in blocked):
+                    swaps.append((gid, other_signature))
+        open_groups.sort(key=lambda gid: load[gid])
+        return open_groups, swaps
+
+    steps = 0
+    still: List[int] = []
+    for stranded in unassigned:
+        # Nothing moves during one search, so options are worked out once per key set
+        cached: Dict[Tuple[RuleKey, ...], tuple] = {}
+        # Nodes: (member, its key set, group it must leave or None, parent node index, group it takes)
+        nodes: List[list] = [[stranded, signature_of[stranded], None, -1, None]]
+        seen = set()
+        found = -1
+        head = 0
+        while head < len(nodes) and steps < GROUP_SOLVER_REPAIR_LIMIT:
+            member_id, signature, source, parent, _ = nodes[head]
+            steps += 1
+            path_groups = set()
+            index = head
+            while index >= 0:
+                if nodes[index][2] is not None:
+                    path_groups.add(nodes[index][2])
+                index = nodes[index][3]
+            if signature not in cached:
+                cached[signature] = options(signature)
+            open_groups, swaps = cached[signature]
+            target = next((gid for gid in open_groups if gid not in path_groups), None)
+            if target is not None:
+                nodes[head][4] = target
+                found = head
+                break
+            for gid, other_signature in swaps:
+                if gid in path_groups or (other_signature, gid) in seen:
+                    continue
+                seen.add((other_signature, gid))
+                nodes.append([members_in[gid][other_signature][-1], other_signature, gid, head, None])
+                # Goal test on creation, so a short chain does not wait for its whole level
+                if other_signature not in cached:
+                    cached[other_signature] = options(other_signature)
+                target = next(
+                    (other for other in cached[other_signature][0] if other != gid and other not in path_groups), None
+                )
+                if target is not None:
+                    nodes[-1][4] = target
+                    found = len(nodes) - 1
+                    break
+            if found >= 0:
+                break
+            head += 1
+        if found < 0:
+            still.append(stranded)
+            continue
+
+        # Each member in the chain takes the group its child vacates; the last one an open group
+        moves = []
+        index = found
+        target = nodes[found][4]
+        while index >= 0:
+            member_id, signature, source, parent, _ = nodes[index]
+            moves.append((member_id, signature, source, target))
+            target = source
+            index = parent
+        for member_id, signature, source, target in moves:
+            if source is not None:
+                members_in[source][signature].remove(member_id)
+                load[source] -= 1
+                for key in signature:
+                    key_load[key][source] -= 1
+        for member_id, signature, source, target in moves:
+            members_in[target].setdefault(signature, []).append(member_id)
+            assignment[member_id] = target
+            load[target] += 1
+            for key in signature:
+                key_load[key][target] += 1
+    return still
+
+
+def _search(
+    order: List[Tuple[int, Tuple[RuleKey, ...]]],
+    group_ids: List[int],
+    limits: Dict[RuleKey, int],
+    min_size: int,
+    max_size: int,
+) -> Tuple[Optional[Dict[int, int]], bool]:
+    """Depth-first search for an assignment with every group size in [min_size, max_size].
+
+    Members with the same key set are interchangeable, so each one goes to a group at or
+    after the previous one's; a branch is cut as soon as the remaining members of some key,
+    or the places still needed to reach min_size, no longer fit. Returns (assignment or
+    None, whether the search finished within GROUP_SOLVER_SEARCH_LIMIT).
+    """
+    n = len(order)
+    positions = range(len(group_ids))
+    load = [0] * len(group_ids)
+    key_load: Dict[RuleKey, List[int]] = {key: [0] * len(group_ids) for key in limits}
+    remaining: Dict[RuleKey, int] = {key: 0 for key in limits}
+    for _, signature in order:
+        for key in signature:
+            remaining[key] += 1
+
+    def fits(position: int, signature: Tuple[RuleKey, ...]) -> bool:
+        return load[position] < max_size and all(key_load[key][position] < limits[key] for key in signature)
+
+    def still_possible(left: int, signature: Tuple[RuleKey, ...]) -> bool:
+        # Only the placed member's keys lost places; the other keys were checked before
+        if sum(max(min_size - size, 0) for size in load) > left:
+            return False
+        for key in signature:
+            if remaining[key] and remaining[key] > sum(
+                min(limits[key] - key_load[key][p], max_size - load[p]) for p in positions
+            ):
+                return False
+        return True
+
+    def apply(depth: int, position: int, step: int) -> None:
+        load[position] += step
+        for key in order[depth][1]:
+            key_load[key][position] += step
+            remaining[key] -= step
+
+    chosen: List[int] = [-1] * n
+    choices: List[Optional[List[int]]] = [None] * n
+    depth = 0
+    placements = 0
+    while 0 <= depth < n:
+        signature = order[depth][1]
+        if choices[depth] is None:
+            first = chosen[depth - 1] if depth and order[depth - 1][1] == signature else 0
+            # Popped from the end: least loaded group first
+            choices[depth] = sorted(
+                (p for p in positions[first:] if fits(p, signature)), key=lambda p: (-load[p], -p)
+            )
+        elif chosen[depth] >= 0:
+            apply(depth, chosen[depth], -1)
+            chosen[depth] = -1
+        while choices[depth]:
+            position = choices[depth].pop()
+            apply(depth, position, 1)
+            placements += 1
+            if still_possible(n - depth - 1, signature):
+                chosen[depth] = position
+                break
+            apply(depth, position, -1)
+            if placements >= GROUP_SOLVER_SEARCH_LIMIT:
+                return None, False
+        if chosen[depth] >= 0:
+            depth += 1
+        else:
+            choices[depth] = None
+            depth -= 1
+        if placements >= GROUP_SOLVER_SEARCH_LIMIT and depth < n:
+            return None, False
+
+    if depth < 0:
+        return None, True
+    return {order[i][0]: group_ids[chosen[i]] for i in range(n)}, True
@@ -0,0 +1,117 @@
+# app/services/host_stats_service.py
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.host_stat import HostStat
+from app.models.user import User
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from app.models.group_member import GroupMember
+from app.models.selection_member import SelectionMember
+
+
+COUNTERS = ("group_sessions", "selection_sessions", "participants", "selections", "exports")
+
+# Hosts recomputed per query batch and transaction by rebuild_host_stats
+REBUILD_CHUNK_SIZE = 1000
+
+
+async def bump_host_stats(host_id: int, db: AsyncSession, **deltas: int) -> None:
+    """Add deltas to a host's counters, e.g. bump_host_stats(host_id, db, participants=1).
+
+    Runs as an upsert inside the caller's transaction and does not commit, so the counters
+    change if and only if the caller's write commits.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown host stat counters: {sorted(unknown)}")
+
+    now = datetime.now()
+    stmt = insert(HostStat).values(host_id=host_id, updated_at=now, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[HostStat.host_id],
+        set_={
+            **{name: getattr(HostStat, name) + stmt.excluded[name] for name in deltas},
+            "updated_at": now,
+        },
+    )
+    await db.exec(stmt)
+
+
+async def _rebuild_chunk(db: AsyncSession, host_ids: list) -> None:
+    counts = {hid: {name: 0 for name in COUNTERS if name != "exports"} for hid in host_ids}
+
+    queries = [
+        ("group_sessions", select(GroupSession.host_id, func.count(GroupSession.id))
+            .where(GroupSession.host_id.in_(host_ids)).group_by(GroupSession.host_id)),
+        ("selection_sessions", select(SelectionSession.host_id, func.count(SelectionSession.id))
+            .where(SelectionSession.host_id.in_(host_ids)).group_by(SelectionSession.host_id)),
+        ("participants", select(GroupSession.host_id, func.count(GroupMember.id))
+            .join(GroupMember, GroupMember.session_id == GroupSession.id)
+            .where(GroupSession.host_id.in_(host_ids)).group_by(GroupSession.host_id)),
+        ("participants", select(SelectionSession.host_id, func.count(SelectionMember.id))
+            .join(SelectionMember, SelectionMember.selection_session_id == SelectionSession.id)
+            .where(SelectionSession.host_id.in_(host_ids)).group_by(SelectionSession.host_id)),
+        ("selections", select(SelectionSession.host_id, func.count(SelectionMember.id))
+            .join(SelectionMember, SelectionMember.selection_session_id == SelectionSession.id)
+            .where(SelectionSession.host_id.in_(host_ids), SelectionMember.selected == True)
+            .group_by(SelectionSession.host_id)),
+    ]
+    for name, query in queries:
+        for hid, count in (await db.exec(query)).all():
+            counts[hid][name] += int(count)
+
+    now = datetime.now()
+    rows = [{"host_id": hid, "updated_at": now, **values} for hid, values in counts.items()]
+    stmt = insert(HostStat).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[HostStat.host_id],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != "host_id"},
+    )
+    await db.exec(stmt)
+
+
+async def rebuild_host_stats(db: AsyncSession, host_id: Optional[int] = None) -> int:
+    """Recompute counters from the session and member tables; returns the number of hosts.
+
+    Exports are not stored anywhere else, so the existing exports counter is kept.
+    """
+    hosts = select(User.id).order_by(User.id)
+    if host_id is not None:
+        hosts = hosts.where(User.id == host_id)
+    host_ids = list((await db.exec(hosts)).all())
+
+    for start in range(0, len(host_ids), REBUILD_CHUNK_SIZE):
+        await _rebuild_chunk(db, host_ids[start:start + REBUILD_CHUNK_SIZE])
+        await db.commit()
+    return len(host_ids)
+
+
+async def get_host_stats(host_id: int, db: AsyncSession) -> HostStat:
+    """Read a host's counters by primary key, building the row on first access."""
+    stats = await db.get(HostStat, host_id)
+    if stats is None:
+        await rebuild_host_stats(db, host_id)
+        stats = await db.get(HostStat, host_id)
+    return stats or HostStat(host_id=host_id)
+
+
+if __name__ == "__main__":
+    # python -m app.services.host_stats_service
+    from app.core.database import async_session
+    import app.models  # noqa: F401  register every table for the foreign keys
+
+    async def _main():
+        async with async_session() as db:
+            rebuilt = await rebuild_host_stats(db)
+        print(f"Rebuilt host stats for {rebuilt} hosts")
+
+    asyncio.run(_main())
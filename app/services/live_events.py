@@ -0,0 +1,169 @@
+# app/services/live_events.py
+"""
+Typed per-session events for the host dashboard's live feed.
+
+Call sites publish after their transaction commits. Events for the same session are
+coalesced: a burst of joins goes out as one "session_events" message holding the events
+(up to LIVE_EVENT_MAX_EVENTS) and the summed counts delta, instead of one message each.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.broadcast import broadcast, session_channel
+from app.models.group_session import GroupSession
+from app.models.groups import Group
+from app.models.group_member import GroupMember
+from app.models.selection_session import SelectionSession
+from app.models.selection_member import SelectionMember
+
+logger = logging.getLogger(__name__)
+
+
+# Quiet period after the last event before a session's batch is sent
+LIVE_EVENT_DEBOUNCE_MS = int(os.getenv("LIVE_EVENT_DEBOUNCE_MS", "250"))
+# Longest an event waits while a burst keeps extending the quiet period
+LIVE_EVENT_MAX_DELAY_MS = int(os.getenv("LIVE_EVENT_MAX_DELAY_MS", "1000"))
+# Events listed per batch; beyond it only the counts delta and a dropped count are sent
+LIVE_EVENT_MAX_EVENTS = int(os.getenv("LIVE_EVENT_MAX_EVENTS", "50"))
+
+# Event types
+PARTICIPANT_JOINED = "participant_joined"
+MEMBERS_REGROUPED = "members_regrouped"
+SELECTION_MADE = "selection_made"
+SELECTIONS_CLEARED = "selections_cleared"
+SESSION_ENDED = "session_ended"
+
+
+class _Batch:
+    def __init__(self, now: float):
+        self.started = now
+        self.events = []
+        self.dropped = 0
+        self.counts: Dict[str, Any] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+_batches: Dict[Tuple[str, int], _Batch] = {}
+_sending: Set[asyncio.Task] = set()
+
+
+def _add_counts(total: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """Sum delta into total; nested dicts (e.g. per-group counts) are summed key by key"""
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            _add_counts(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def publish_session_event(
+    session_type: str,
+    session_id: int,
+    event_type: str,
+    data: Optional[Dict[str, Any]] = None,
+    counts: Optional[Dict[str, Any]] = None
+) -> None:
+    """Queue an event for the session's channel; it is sent with the rest of its burst.
+
+    counts is this event's change to the session's counts, e.g. {"participants": 1,
+    "groups": {"Group A": 1}}; batches carry the sum.
+    """
+    loop = asyncio.get_running_loop()
+    key = (session_type, session_id)
+    now = loop.time()
+    batch = _batches.get(key)
+    if batch is None:
+        batch = _batches[key] = _Batch(now)
+
+    if len(batch.events) < LIVE_EVENT_MAX_EVENTS:
+        batch.events.append({"type": event_type, "data": data or {}})
+    else:
+        batch.dropped += 1
+    if counts:
+        _add_counts(batch.counts, counts)
+
+    if batch.timer is not None:
+        batch.timer.cancel()
+    deadline = min(now + LIVE_EVENT_DEBOUNCE_MS / 1000, batch.started + LIVE_EVENT_MAX_DELAY_MS / 1000)
+    batch.timer = loop.call_at(deadline, _flush, key)
+
+
+def _flush(key: Tuple[str, int]) -> None:
+    batch = _batches.pop(key, None)
+    if batch is None:
+        return
+    session_type, session_id = key
+    message = json.dumps({
+        "type": "session_events",
+        "timestamp": datetime.now().isoformat(),
+        "data": {
+            "session_type": session_type,
+            "session_id": session_id,
+            "events": batch.events,
+            "dropped": batch.dropped,
+            "counts_delta": batch.counts,
+        }
+    })
+    task = asyncio.create_task(_send(session_channel(session_type, session_id), message))
+    _sending.add(task)
+    task.add_done_callback(_sending.discard)
+
+
+async def _send(channel: str, message: str) -> None:
+    try:
+        await broadcast.publish(channel, message)
+    except Exception as e:
+        logger.warning("Live event publish to %s failed: %s", channel, e)
+
+
+async def flush_session_events() -> None:
+    """Send every pending batch now (used on shutdown)"""
+    for key in list(_batches):
+        batch = _batches.get(key)
+        if batch and batch.timer is not None:
+            batch.timer.cancel()
+        _flush(key)
+    if _sending:
+        await asyncio.gather(*list(_sending), return_exceptions=True)
+
+
+async def get_session_snapshot(session_type: str, session_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """Current counts of a session, the baseline that session_events deltas apply to"""
+    if session_type == "group":
+        status = (await db.exec(select(GroupSession.status).where(GroupSession.id == session_id))).first()
+        if status is None:
+            raise ValueError("Session not found")
+        rows = (await db.exec(
+            select(Group.name, func.count(GroupMember.id))
+            .outerjoin(GroupMember, GroupMember.group_id == Group.id)
+            .where(Group.session_id == session_id)
+            .group_by(Group.id, Group.name)
+            .order_by(Group.id)
+        )).all()
+        groups = {name: count for name, count in rows}
+        return {
+            "status": status,
+            "participants": sum(groups.values()),
+            "groups": groups,
+        }
+    if session_type == "selection":
+        if (await db.exec(select(SelectionSession.id).where(SelectionSession.id == session_id))).first() is None:
+            raise ValueError("Session not found")
+        participants, selected = (await db.exec(
+            select(
+                func.count(SelectionMember.id),
+                func.count(SelectionMember.id).filter(SelectionMember.selected == True)
+            ).where(SelectionMember.selection_session_id == session_id)
+        )).one()
+        return {
+            "participants": participants,
+            "selected": selected,
+        }
+    raise ValueError(f"Unknown session type: {session_type}")
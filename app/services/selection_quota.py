@@ -0,0 +1,340 @@
+# app/services/selection_quota.py
+import os
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# A quota is a dict with:
+#   field_key - attribute it applies to; None matches the value in any of the given fields
+#   value     - value to match (case-insensitive); None makes max apply to each value separately
+#   min, max  - bounds on selected members in the stratum, counting earlier selections
+#   prefer    - draw matching members before any others (legacy preferential_selection)
+Quota = Dict[str, Any]
+# (quota index, stratum value)
+Stratum = Tuple[int, str]
+
+# Steps the exact search may take when the greedy draw misses a quota set that can be met
+SELECTION_QUOTA_SEARCH_LIMIT = int(os.getenv("SELECTION_QUOTA_SEARCH_LIMIT", "100000"))
+
+
+def build_quotas(
+    quotas: list,
+    preferential_selection: Optional[Dict[str, str]],
+    pref_rules: list,
+    field_keys: List[str],
+    total_count: int,
+) -> List[Quota]:
+    """Turn request quotas, preferential_selection entries and session rules into quota dicts.
+
+    share is a fraction of total_count and fills whichever of min and max is not given.
+    Rules naming a field (e.g. "department") cap every value of it; rules naming a value
+    (e.g. "female") cap members holding that value in any field, as in group sessions.
+    """
+    built: List[Quota] = []
+    for quota in quotas:
+        minimum, maximum = quota.min, quota.max
+        if quota.share is not None:
+            target = round(quota.share * total_count)
+            minimum = target if minimum is None else minimum
+            maximum = target if maximum is None else maximum
+        if quota.value is None and minimum:
+            raise ValueError(f"Quota on {quota.field_key} needs a value to have a minimum or share")
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise ValueError(f"Quota on {quota.field_key} has min {minimum} above max {maximum}")
+        built.append({
+            "field_key": quota.field_key,
+            "value": quota.value.lower() if quota.value is not None else None,
+            "min": minimum,
+            "max": maximum,
+            "prefer": False,
+        })
+    for field_key, value in (preferential_selection or {}).items():
+        built.append({"field_key": field_key, "value": value.lower(), "min": None, "max": None, "prefer": True})
+    for rule in pref_rules:
+        if rule.field_key in field_keys:
+            built.append({"field_key": rule.field_key, "value": None, "min": None, "max": rule.preference_max_selection, "prefer": False})
+        else:
+            built.append({"field_key": None, "value": rule.field_key.lower(), "min": None, "max": rule.preference_max_selection, "prefer": False})
+    return built
+
+
+def quota_fields(quotas: List[Quota], field_keys: List[str]) -> List[str]:
+    """Attribute keys the quotas read, in a stable order"""
+    needed = set()
+    for quota in quotas:
+        if quota["field_key"] is None:
+            needed.update(field_keys)
+        else:
+            needed.add(quota["field_key"])
+    return sorted(needed)
+
+
+def _strata(quotas: List[Quota], values: Dict[str, Optional[str]]) -> List[Stratum]:
+    strata: List[Stratum] = []
+    for index, quota in enumerate(quotas):
+        field_key, wanted = quota["field_key"], quota["value"]
+        if field_key is None:
+            if any(value is not None and value.lower() == wanted for value in values.values()):
+                strata.append((index, wanted))
+        elif wanted is None:
+            if values.get(field_key) is not None:
+                strata.append((index, values[field_key]))
+        else:
+            value = values.get(field_key)
+            if value is not None and value.lower() == wanted:
+                strata.append((index, wanted))
+    return strata
+
+
+def sample_with_quotas(
+    candidates: List[Tuple[int, Dict[str, Optional[str]]]],
+    already_selected: List[Dict[str, Optional[str]]],
+    count: int,
+    quotas: List[Quota],
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Draw up to count candidates at random while keeping every quota's bounds.
+
+    Candidates are shuffled (by random.Random(seed), so a seed makes the draw repeatable)
+    and walked once with per-stratum counts. A candidate is skipped for good if it would
+    push a stratum past its max. It is taken only if the places left after it still cover
+    the outstanding minimums, and if every max it counts towards keeps room for the
+    minimums nested inside that stratum (a cap on "gender" must leave room for a minimum
+    on gender "female"); otherwise it is held back. Held-back candidates are tried again
+    at the end, first under the same checks and then against the max alone. If the walk
+    still leaves a minimum unmet or places empty, an exact search (_search) looks for a
+    draw that meets every quota; minimums the pool cannot meet are reported, not raised.
+
+    Args:
+        candidates: (member_id, {field_key: value}) of unselected members, in a stable order
+        already_selected: {field_key: value} of members selected earlier
+        count: number of members to draw
+        quotas: from build_quotas
+        seed: seed for the shuffle; None draws from system randomness
+
+    Returns:
+        Dict with selected [(member_id, "preferential"|"random")] and fill, one entry per
+        stratum: {field_key, value, min, max, selected, met}
+    """
+    counts: Dict[Stratum, int] = {}
+    for values in already_selected:
+        for stratum in _strata(quotas, values):
+            counts[stratum] = counts.get(stratum, 0) + 1
+    earlier = dict(counts)
+
+    # Outstanding minimums per stratum; quotas repeating a stratum share the larger one
+    deficit: Dict[Tuple[Optional[str], str], int] = {}
+    for index, quota in enumerate(quotas):
+        if quota["min"]:
+            target = (quota["field_key"], quota["value"])
+            short = max(quota["min"] - counts.get((index, quota["value"]), 0), 0)
+            deficit[target] = max(deficit.get(target, 0), short)
+
+    def places_needed(helps: List[Tuple[Optional[str], str]]) -> int:
+        # Values of one field never share a member, but one member can meet minimums on
+        # several fields at once, so the busiest field bounds the places still needed
+        per_field: Dict[Tuple[Optional[str], str], int] = {}
+        for (field_key, value), short in deficit.items():
+            group = (field_key, "") if field_key is not None else (None, value)
+            per_field[group] = per_field.get(group, 0) + short - ((field_key, value) in helps)
+        return max(per_field.values(), default=0)
+
+    # Minimums whose members all count towards a capped stratum, keyed by (cap index, value)
+    nested: Dict[Stratum, List[Tuple[Optional[str], str]]] = {}
+    for field_key, value in deficit:
+        for cap_index, cap in enumerate(quotas):
+            if cap["max"] is not None and cap["field_key"] in (field_key, None) and (
+                cap["value"] == value or cap["value"] is None and cap["field_key"] == field_key
+            ):
+                nested.setdefault((cap_index, value), []).append((field_key, value))
+
+    def fits(strata: List[Stratum]) -> bool:
+        for stratum in strata:
+            limit = quotas[stratum[0]]["max"]
+            if limit is not None and counts.get(stratum, 0) >= limit:
+                return False
+        return True
+
+    def helping(strata: List[Stratum]) -> List[Tuple[Optional[str], str]]:
+        targets = {(quotas[index]["field_key"], quotas[index]["value"]) for index, _ in strata}
+        return [target for target in targets if deficit.get(target, 0) > 0]
+
+    def keeps_minimums(strata: List[Stratum], helps: List[Tuple[Optional[str], str]]) -> bool:
+        # Places and capped room left once this candidate is taken
+        if places_needed(helps) > count - len(selected) - 1:
+            return False
+        for stratum in strata:
+            limit = quotas[stratum[0]]["max"]
+            if limit is None:
+                continue
+            reserved = sum(
+                deficit[target] - (target in helps)
+                for target in nested.get((stratum[0], stratum[1].lower()), ())
+            )
+            if limit - counts.get(stratum, 0) - 1 < reserved:
+                return False
+        return True
+
+    def take(
+        member_id: int, strata: List[Stratum], helps: List[Tuple[Optional[str], str]], selection_type: str
+    ) -> None:
+        for stratum in strata:
+            counts[stratum] = counts.get(stratum, 0) + 1
+        for target in helps:
+            deficit[target] -= 1
+        selected.append((member_id, selection_type))
+
+    pool = list(candidates)
+    random.Random(seed).shuffle(pool)
+    prefer = [index for index, quota in enumerate(quotas) if quota["prefer"]]
+    if prefer:
+        # Stable sort: preferred members first, each part still in random order
+        pool.sort(key=lambda entry: not any(
+            index in prefer for index, _ in _strata(quotas, entry[1])
+        ))
+
+    selected: List[Tuple[int, str]] = []
+    held_back: List[Tuple[int, List[Stratum]]] = []
+    for member_id, values in pool:
+        if len(selected) >= count:
+            break
+        # Strata are worked out only for the part of the pool that is walked
+        strata = _strata(quotas, values)
+        if not fits(strata):
+            continue
+        helps = helping(strata)
+        if not keeps_minimums(strata, helps):
+            held_back.append((member_id, strata))
+            continue
+        preferred = helps or any(quotas[index]["prefer"] for index, _ in strata)
+        take(member_id, strata, helps, "preferential" if preferred else "random")
+
+    # Held-back candidates that now keep the minimums go first; minimums the pool
+    # could not meet then leave places free for the rest
+    for checked in (True, False):
+        for member_id, strata in list(held_back):
+            if len(selected) >= count:
+                break
+            if not fits(strata):
+                continue
+            helps = helping(strata)
+            if checked and not keeps_minimums(strata, helps):
+                continue
+            held_back.remove((member_id, strata))
+            take(member_id, strata, helps, "preferential" if helps else "random")
+
+    if len(selected) < min(count, len(pool)) or any(deficit.values()):
+        exact = _search(pool, quotas, earlier, min(count, len(pool)))
+        if exact is not None:
+            selected, counts = exact
+
+    fill = []
+    for index, quota in enumerate(quotas):
+        if quota["value"] is not None:
+            values = [quota["value"]]
+        else:
+            values = sorted(value for quota_index, value in counts if quota_index == index)
+        for value in values:
+            filled = counts.get((index, value), 0)
+            fill.append({
+                "field_key": quota["field_key"],
+                "value": value,
+                "min": quota["min"],
+                "max": quota["max"],
+                "selected": filled,
+                "met": (quota["min"] is None or filled >= quota["min"])
+                and (quota["max"] is None or filled <= quota["max"]),
+            })
+
+    return {"selected": selected, "fill": fill}
+
+
+def _search(
+    pool: List[Tuple[int, Dict[str, Optional[str]]]],
+    quotas: List[Quota],
+    counts: Dict[Stratum, int],
+    target: int,
+) -> Optional[Tuple[List[Tuple[int, str]], Dict[Stratum, int]]]:
+    """Depth-first search for target candidates that keep every min and max.
+
+    Candidates with the same strata are interchangeable, so the search only picks how many
+    to take from each such group, preferred and minimum-helping groups first and as many
+    as fit first; the earliest candidates of a group in pool order are the ones taken. A
+    branch is cut once the groups left cannot make up the places or some minimum. Returns
+    (selected, counts), or None if no draw exists or SELECTION_QUOTA_SEARCH_LIMIT ran out.
+    """
+    groups: Dict[Tuple[Stratum, ...], List[int]] = {}
+    for member_id, values in pool:
+        groups.setdefault(tuple(_strata(quotas, values)), []).append(member_id)
+
+    def rank(signature: Tuple[Stratum, ...]) -> Tuple[bool, bool]:
+        return (
+            not any(quotas[index]["prefer"] for index, _ in signature),
+            not any(quotas[index]["min"] for index, _ in signature),
+        )
+
+    order = sorted(groups, key=rank)
+    minimums = [(index, quota["value"], quota["min"]) for index, quota in enumerate(quotas) if quota["min"]]
+    # Candidates, and candidates in each minimum's stratum, from each depth onwards
+    left = [0] * (len(order) + 1)
+    supply = [[0] * len(minimums) for _ in range(len(order) + 1)]
+    for depth in range(len(order) - 1, -1, -1):
+        size = len(groups[order[depth]])
+        left[depth] = left[depth + 1] + size
+        for position, (index, value, _) in enumerate(minimums):
+            supply[depth][position] = supply[depth + 1][position] + size * ((index, value) in order[depth])
+
+    counts = dict(counts)
+    chosen = 0
+
+    def possible(depth: int) -> bool:
+        if left[depth] < target - chosen:
+            return False
+        return all(
+            counts.get((index, value), 0) + supply[depth][position] >= minimum
+            for position, (index, value, minimum) in enumerate(minimums)
+        )
+
+    def room(depth: int) -> int:
+        most = min(len(groups[order[depth]]), target - chosen)
+        for stratum in order[depth]:
+            limit = quotas[stratum[0]]["max"]
+            if limit is not None:
+                most = min(most, limit - counts.get(stratum, 0))
+        return max(most, 0)
+
+    def apply(depth: int, step: int) -> None:
+        nonlocal chosen
+        chosen += step
+        for stratum in order[depth]:
+            counts[stratum] = counts.get(stratum, 0) + step
+
+    taken: List[int] = []
+    # Popped from the end: as many of the group as fit first
+    options: List[List[int]] = [list(range(room(0) + 1))] if order and possible(0) else []
+    steps = 0
+    while options:
+        depth = len(options) - 1
+        if len(taken) > depth:
+            apply(depth, -taken.pop())
+        if not options[-1]:
+            options.pop()
+            continue
+        steps += 1
+        if steps > SELECTION_QUOTA_SEARCH_LIMIT:
+            return None
+        taken.append(options[-1].pop())
+        apply(depth, taken[-1])
+        if chosen == target:
+            if possible(len(order)):
+                break
+        elif depth + 1 < len(order) and possible(depth + 1):
+            options.append(list(range(room(depth + 1) + 1)))
+    else:
+        return None
+
+    picked: Dict[int, str] = {}
+    for signature, number in zip(order, taken):
+        preferred = not all(rank(signature))
+        for member_id in groups[signature][:number]:
+            picked[member_id] = "preferential" if preferred else "random"
+    return [(member_id, picked[member_id]) for member_id, _ in pool if member_id in picked], counts
@@ -1,21 +1,37 @@
 # app/services/selection_service.py
-import random
-from functools import lru_cache
+import secrets
 
 from app.schemas.selection_session import SelectionSessionCreate, SelectionSessionRead, SelectionJoinResponse
-from app.schemas.selection import SelectMembersRequest, SelectionResult, MemberSelectionDetail
-from sqlmodel import select, and_, not_, func
+from app.schemas.selection import SelectMembersRequest, SelectionResult, MemberSelectionDetail, SelectionQuota, SelectionReplay
+from sqlalchemy import ARRAY, Integer, String, all_, any_, bindparam, cast, false, insert, literal, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, not_, func
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.selection_session import SelectionSession
 from app.models.access_code import AccessCode
 from app.models.selection_member import SelectionMember
 from app.models.selection_log import SelectionLog
-from app.models.field_definition import FieldDefinition
+from app.models.selection_draw import SelectionDraw
 from app.models.selection_field_definition import SelectionFieldDefinition
 from app.utils.code_generator import generate_group_code
 from datetime import datetime, timedelta, timezone
 from app.models.preferential_selection_rule import PreferentialSelectionRule
-from typing import Optional, List, Dict, Tuple, Set
+from app.services.access_code_cache import ResolvedCode, resolve_access_code, ensure_code_active, invalidate_access_code
+from app.services.host_stats_service import bump_host_stats
+from app.services.data_version import bump_data_version
+from app.services.live_events import publish_session_event, PARTICIPANT_JOINED, SELECTION_MADE, SELECTIONS_CLEARED
+from app.services.selection_quota import build_quotas, quota_fields, sample_with_quotas
+from typing import List, Dict, Tuple
+
+
+# Stored with every draw; bump when a change would make earlier draws replay differently
+PREFERENTIAL_DRAW_VERSION = "preferential-md5-1"
+QUOTA_DRAW_VERSION = "quota-1"
+
+
+def _id_array(ids: List[int]):
+    """Bind a list of ids as one Postgres array parameter, for = ANY / != ALL"""
+    return bindparam(None, ids, type_=ARRAY(Integer))
 
 
 async def create_selection_session(
@@ -82,8 +98,11 @@ async def create_selection_session(
         )
         session.add(rule_model)
 
+    await bump_host_stats(host_id, session, selection_sessions=1)
     await session.commit()
     await session.refresh(selection_session)
+    # A code string freed by an expired session may still be cached for the old one
+    await invalidate_access_code(access_code.code)
     
     # Create a response object that matches the SelectionSessionRead schema
     response = SelectionSessionRead(
@@ -97,34 +116,26 @@ async def create_selection_session(
     return response
 
 
-async def validate_code_and_get_fields(code: str, session: AsyncSession) -> dict:
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
-    access_code_result = await session.exec(select(AccessCode).where(AccessCode.code == code))
-    access_code = access_code_result.first()
-    if not access_code or access_code.expires_at < now or access_code.status != "active":
+async def _get_active_selection_session(code: str, session: AsyncSession) -> ResolvedCode:
+    # Access code, session and fields come from the resolution cache
+    resolved = await resolve_access_code(code, session)
+    if resolved is None:
         raise ValueError("Invalid or expired code")
-
-    session_result = await session.exec(select(SelectionSession).where(SelectionSession.code_id == access_code.id))
-    selection_session = session_result.first()
-    if not selection_session:
+    if resolved["kind"] != "selection":
         raise ValueError("Selection session not found")
+    return resolved
 
-    # Fetch fields from selection-specific table; fallback to legacy shared table if needed
-    fields_result = await session.exec(
-        select(SelectionFieldDefinition).where(SelectionFieldDefinition.selection_session_id == selection_session.id)
-    )
-    s_fields = fields_result.all()
-    field_keys = [field.field_key for field in s_fields]
-    if not field_keys:
-        legacy_result = await session.exec(select(FieldDefinition).where(FieldDefinition.session_id == selection_session.id))
-        field_keys = [f.field_key for f in legacy_result.all()]
+
+async def validate_code_and_get_fields(code: str, session: AsyncSession) -> dict:
+    # Fields come from the selection-specific table, falling back to the legacy shared table
+    resolved = await _get_active_selection_session(code, session)
     
     # Return enriched metadata for UI
     return {
-        "name": selection_session.name,
-        "description": selection_session.description,
-        "fields": field_keys,
-        "identifier": selection_session.member_identifier,
+        "name": resolved["name"],
+        "description": resolved["description"],
+        "fields": resolved["field_keys"],
+        "identifier": resolved["identifier"],
     }
 
 
@@ -137,22 +148,16 @@ async def join_group(
     
     now = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    # Validate access code
-    access_code_result = await session.exec(select(AccessCode).where(AccessCode.code == code))
-    access_code = access_code_result.first()
-    if not access_code or access_code.expires_at < now or access_code.status != "active":
-        raise ValueError("Invalid or expired code")
-
-    # Get selection session
-    selection_query = await session.exec(select(SelectionSession).where(SelectionSession.code_id == access_code.id))
-    selection_session = selection_query.first()
-    if not selection_session:
-        raise ValueError("Selection session not found")
+    # Validate access code and get selection session
+    resolved = await _get_active_selection_session(code, session)
+    selection_session_id = resolved["session_id"]
+    # The cached resolution may predate end_session on another worker
+    await ensure_code_active(resolved, session)
 
     # Check if member already joined
     dup_check = await session.exec(
-        select(SelectionMember).where(
-            SelectionMember.selection_session_id == selection_session.id,
+        select(SelectionMember.id).where(
+            SelectionMember.selection_session_id == selection_session_id,
             SelectionMember.member_identifier == member_identifier
         )
     )
@@ -161,54 +166,21 @@ async def join_group(
 
     # Count total members for this session
     count_result = await session.exec(
-        select(SelectionMember).where(
-            SelectionMember.selection_session_id == selection_session.id
+        select(func.count(SelectionMember.id)).where(
+            SelectionMember.selection_session_id == selection_session_id
         )
     )
-    member_count = len(count_result.all())
+    member_count = count_result.one() or 0
     
     # Check if selection session is at maximum capacity
-    if member_count >= selection_session.max_group_size:
+    if member_count >= resolved["max_group_size"]:
         raise ValueError("Selection session has reached maximum capacity")
     
-    # Get all preferential rules for this session
-    pref_result = await session.exec(
-        select(PreferentialSelectionRule).where(
-            PreferentialSelectionRule.selection_session_id == selection_session.id
-        )
-    )
-    pref_rules = pref_result.all()
-    
-    # Check all preferential rules to see if joining would violate any rules
-    for rule in pref_rules:
-        # Check if the rule applies to this member
-        if rule.field_key in member_data:
-            member_field_value = str(member_data[rule.field_key])
-            
-            # Count members with the same field value already selected
-            selected_count = await session.exec(
-                select(SelectionMember).where(
-                    SelectionMember.selection_session_id == selection_session.id,
-                    SelectionMember.selected == True
-                )
-            )
-            selected_members = selected_count.all()
-            
-            matching_selected = 0
-            for existing_member in selected_members:
-                if rule.field_key in existing_member.attributes:
-                    if str(existing_member.attributes[rule.field_key]) == member_field_value:
-                        matching_selected += 1
-            
-            # Check if adding this member would exceed the preferential limit
-            if matching_selected >= rule.preference_max_selection:
-                # The rule is violated, but we don't reject the member - they just won't be selected
-                # The member can still join but might not be selected based on this rule
-                pass
+    # Preferential rules never reject a join; they are applied when the host selects members
     
     # Create the new selection member
     selection_member = SelectionMember(
-        selection_session_id=selection_session.id,
+        selection_session_id=selection_session_id,
         member_identifier=member_identifier,
         attributes=member_data,
         selected=False,
@@ -216,36 +188,224 @@ async def join_group(
     )
     
     session.add(selection_member)
-    await session.commit()
+    await bump_host_stats(resolved["host_id"], session, participants=1)
+    await bump_data_version("selection", resolved["session_id"], session)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # uq_selection_members_session_member: the same identifier joined concurrently
+        await session.rollback()
+        raise ValueError("Member already joined")
     await session.refresh(selection_member)
+    publish_session_event(
+        "selection", resolved["session_id"], PARTICIPANT_JOINED,
+        {"member_identifier": member_identifier},
+        {"participants": 1}
+    )
 
     # Return successful join response
     return SelectionJoinResponse(
         message="Successfully joined the selection session.",
-        session=selection_session.name,
+        session=resolved["name"],
         member_identifier=member_identifier
     )
 
 
-async def select_members(
-    data: SelectMembersRequest,
-    host_id: int, 
+async def _record_selection(
+    session_id: int,
+    host_id: int,
+    draw: SelectionDraw,
+    newly_selected: List[Tuple[int, str, str]],
     db_session: AsyncSession
-) -> SelectionResult:
-    """
-    Select members from a session based on count and preferential selection criteria.
-    
-    Args:
-        data: Contains code, count, and optional preferential_selection
-        host_id: ID of the host making the request (for ownership verification)
-        db_session: Database session
+) -> None:
+    """Store the draw, mark (member_id, member_identifier, selection_type) as selected, log
+    them and commit"""
+    draw.result = [[member_id, selection_type] for member_id, _, selection_type in newly_selected]
+    db_session.add(draw)
+    await db_session.flush()
+
+    # One UPDATE and one multi-row INSERT for every newly selected member
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if newly_selected:
+        await db_session.exec(
+            update(SelectionMember)
+            .where(SelectionMember.id == any_(_id_array([member_id for member_id, _, _ in newly_selected])))
+            .values(selected=True)
+            .execution_options(synchronize_session=False)
+        )
+        await db_session.exec(insert(SelectionLog), params=[
+            {
+                "selection_session_id": session_id,
+                "member_id": member_id,
+                "selected_at": now,
+                "selection_type": selection_type,
+                "draw_id": draw.id,
+                "seed": draw.seed,
+                "algorithm_version": draw.algorithm_version,
+            }
+            for member_id, _, selection_type in newly_selected
+        ])
+    
+    await bump_host_stats(host_id, db_session, selections=len(newly_selected))
+    if newly_selected:
+        await bump_data_version("selection", session_id, db_session)
+
+    # Commit the changes
+    await db_session.commit()
+    for _, identifier, selection_type in newly_selected:
+        publish_session_event(
+            "selection", session_id, SELECTION_MADE,
+            {"member_identifier": identifier, "selection_type": selection_type},
+            {"selected": 1}
+        )
+
+
+def _draw_pool(session_id: int, params: dict) -> list:
+    """Members a draw picks from: those that had joined and were not selected when it ran"""
+    conditions = [
+        SelectionMember.selection_session_id == session_id,
+        SelectionMember.id <= params["max_member_id"],
+    ]
+    if params["previous_ids"]:
+        conditions.append(SelectionMember.id != all_(_id_array(params["previous_ids"])))
+    return conditions
+
+
+def _seeded_order(seed: int):
+    """Random order that depends only on the seed and the member id"""
+    return (func.md5(literal(f"{seed}:") + cast(SelectionMember.id, String)), SelectionMember.id)
+
+
+async def _draw_preferential(
+    session_id: int,
+    params: dict,
+    seed: int,
+    db_session: AsyncSession
+) -> Dict[str, list]:
+    """Preferential-then-random draw (PREFERENTIAL_DRAW_VERSION), computed without writing"""
+    preference = None
+    rule_max = params["rule_max"]
+    if params["preferential_selection"]:
+        field_key, field_value = next(iter(params["preferential_selection"].items()))
+        preference = func.coalesce(
+            func.lower(SelectionMember.attributes[field_key].astext) == field_value.lower(), False
+        )
+
+    # Members already selected, and whether each matches the preference
+    already_rows = []
+    if params["previous_ids"]:
+        already_rows = (await db_session.exec(
+            select(SelectionMember.id, SelectionMember.member_identifier, preference if preference is not None else false())
+            .where(SelectionMember.id == any_(_id_array(params["previous_ids"])))
+            .order_by(SelectionMember.id)
+        )).all()
+    remaining_to_select = params["count"] - len(already_rows)
+    already_preferential_count = sum(1 for _, _, matches in already_rows if matches)
+    
+    preferential_selected: List[Tuple[int, str]] = []
+    random_selected: List[Tuple[int, str]] = []
+
+    # If we have preferential selection criteria, prioritize those members
+    if preference is not None:
+        preferential_max = remaining_to_select if rule_max is None else min(remaining_to_select, rule_max)
+        # Adjust max based on already selected members with this preference
+        preferential_max = max(preferential_max - already_preferential_count, 0)
+
+        if preferential_max > 0:
+            # Seeded random sample of the matching members, drawn in the database
+            preferential_selected = list((await db_session.exec(
+                select(SelectionMember.id, SelectionMember.member_identifier)
+                .where(*_draw_pool(session_id, params), preference)
+                .order_by(*_seeded_order(seed))
+                .limit(preferential_max)
+            )).all())
+            remaining_to_select -= len(preferential_selected)
     
-    Returns:
-        SelectionResult with details of the selection
-    """
+    # If we still need more members, select them randomly
+    if remaining_to_select > 0:
+        conditions = _draw_pool(session_id, params)
+        if preferential_selected:
+            conditions.append(SelectionMember.id != all_(_id_array([member_id for member_id, _ in preferential_selected])))
+        # Once the rule limit is reached, members with the preferred value are not drawn at random.
+        # Below it, every matching member is already in preferential_selected, so the random
+        # part can't take the selection past rule_max
+        if rule_max is not None and already_preferential_count + len(preferential_selected) >= rule_max:
+            conditions.append(not_(preference))
+        random_selected = list((await db_session.exec(
+            select(SelectionMember.id, SelectionMember.member_identifier)
+            .where(*conditions)
+            .order_by(*_seeded_order(seed))
+            .limit(remaining_to_select)
+        )).all())
+
+    newly_selected = [(member_id, identifier, "preferential") for member_id, identifier in preferential_selected]
+    newly_selected += [(member_id, identifier, "random") for member_id, identifier in random_selected]
+    return {
+        "already": [identifier for _, identifier, _ in already_rows],
+        "selected": newly_selected,
+        "quota_fill": None,
+    }
+
+
+async def _draw_quota(
+    session_id: int,
+    params: dict,
+    seed: int,
+    db_session: AsyncSession
+) -> Dict[str, list]:
+    """Stratified draw (QUOTA_DRAW_VERSION) over request quotas, preferential_selection and
+    the session rules as they were when the draw ran, computed without writing"""
+    field_keys = params["field_keys"]
+    pref_rules = [
+        PreferentialSelectionRule(field_key=field_key, preference_max_selection=limit)
+        for field_key, limit in params["rules"]
+    ]
+    quotas = build_quotas(
+        [SelectionQuota(**quota) for quota in params["quotas"]],
+        params["preferential_selection"], pref_rules, field_keys, params["count"]
+    )
+
+    # Only the attributes the quotas read leave the database, in id order so a seed replays
+    keys = quota_fields(quotas, field_keys)
+    columns = [SelectionMember.attributes[key].astext for key in keys]
+    already_rows = []
+    if params["previous_ids"]:
+        already_rows = (await db_session.exec(
+            select(SelectionMember.id, SelectionMember.member_identifier, *columns)
+            .where(SelectionMember.id == any_(_id_array(params["previous_ids"])))
+            .order_by(SelectionMember.id)
+        )).all()
+    candidate_rows = (await db_session.exec(
+        select(SelectionMember.id, SelectionMember.member_identifier, *columns)
+        .where(*_draw_pool(session_id, params))
+        .order_by(SelectionMember.id)
+    )).all()
+
+    identifiers = {row[0]: row[1] for row in candidate_rows}
+    draw = sample_with_quotas(
+        [(row[0], dict(zip(keys, row[2:]))) for row in candidate_rows],
+        [dict(zip(keys, row[2:])) for row in already_rows],
+        params["count"] - len(already_rows),
+        quotas,
+        seed=seed
+    )
+    return {
+        "already": [row[1] for row in already_rows],
+        "selected": [(member_id, identifiers[member_id], selection_type) for member_id, selection_type in draw["selected"]],
+        "quota_fill": draw["fill"],
+    }
+
+
+_DRAWS = {
+    PREFERENTIAL_DRAW_VERSION: _draw_preferential,
+    QUOTA_DRAW_VERSION: _draw_quota,
+}
+
+
+async def _get_host_selection_session(code: str, host_id: int, db_session: AsyncSession) -> SelectionSession:
     # Validate access code and get the selection session
     now = datetime.now(timezone.utc).replace(tzinfo=None)
-    access_code_result = await db_session.exec(select(AccessCode).where(AccessCode.code == data.code))
+    access_code_result = await db_session.exec(select(AccessCode).where(AccessCode.code == code))
     access_code = access_code_result.first()
     if not access_code or access_code.expires_at < now or access_code.status != "active":
         raise ValueError("Invalid or expired code")
@@ -261,183 +421,136 @@ async def select_members(
     selection_session = session_result.first()
     if not selection_session:
         raise ValueError("Selection session not found")
+    return selection_session
+
+
+async def select_members(
+    data: SelectMembersRequest,
+    host_id: int, 
+    db_session: AsyncSession
+) -> SelectionResult:
+    """
+    Select members from a session based on count and preferential selection criteria.
+
+    Every run uses data.seed, or a fresh seed when none is given, and is stored as a
+    SelectionDraw with the inputs replay_selection_draw needs to recompute it.
     
-    # Get all members that have already been selected
-    selected_members_query = await db_session.exec(
-        select(SelectionMember).where(
-            SelectionMember.selection_session_id == selection_session.id,
-            SelectionMember.selected == True
-        )
-    )
-    already_selected_members = selected_members_query.all()
-    already_selected_ids = {member.id for member in already_selected_members}
-    
-    # If we have more selected members than requested, raise an error
-    if len(already_selected_members) >= data.count:
-        raise ValueError(f"Already selected {len(already_selected_members)} members, which is equal to or more than requested count of {data.count}")
-    
-    # Number of members we still need to select
-    remaining_to_select = data.count - len(already_selected_members)
-    
-    # Track selection details for preferential and random selections
-    preferential_selected = []
-    random_selected = []
-    
-    # Get all members in the session who have not been selected yet
-    unselected_members_query = await db_session.exec(
-        select(SelectionMember).where(
-            SelectionMember.selection_session_id == selection_session.id,
-            SelectionMember.selected == False
-        )
-    )
-    unselected_members = unselected_members_query.all()
+    Args:
+        data: Contains code, count, and optional preferential_selection; with quotas the
+            draw goes through the quota engine (app/services/selection_quota.py)
+        host_id: ID of the host making the request (for ownership verification)
+        db_session: Database session
     
-    # If we have preferential selection criteria, prioritize those members
-    if data.preferential_selection and remaining_to_select > 0:
-        field_key = list(data.preferential_selection.keys())[0]  # Get the field key
-        field_value = data.preferential_selection[field_key]  # Get the field value
-        
-        # Get all preferential rules for this session
-        pref_rule_query = await db_session.exec(
-            select(PreferentialSelectionRule).where(
-                PreferentialSelectionRule.selection_session_id == selection_session.id
-            )
-        )
-        pref_rules = pref_rule_query.all()
-        
-        # Determine max number for this preference
-        preferential_max = remaining_to_select  # Default to all remaining
-        
-        # Handle two types of rules:
-        for rule in pref_rules:
-            
-            # Direct match with the value (e.g., rule.field_key = "female")
-            if rule.field_key.lower() == field_value.lower():
-                print(f"Value match found! Setting max to: {rule.preference_max_selection}")
-                preferential_max = min(preferential_max, rule.preference_max_selection)
-        
-        # Count how many of this preference are already selected
-        already_preferential_count = 0
-        for member in already_selected_members:
-            # For field:value pair match (e.g., gender=female)
-            if field_key in member.attributes and str(member.attributes[field_key]).lower() == field_value.lower():
-                already_preferential_count += 1
-        
-        # Adjust max based on already selected members with this preference
-        if already_preferential_count >= preferential_max:
-            preferential_max = 0  # Already reached the limit
-        else:
-            preferential_max -= already_preferential_count
-            
-        # Find members that match the preferential criteria
-        preferential_members = []
-        for member in unselected_members:
-            if field_key in member.attributes and str(member.attributes[field_key]).lower() == field_value.lower():
-                preferential_members.append(member)
-        
-        # Randomly shuffle the preferential members for fair selection
-        random.shuffle(preferential_members)
-        
-        # Select up to preferential_max members (respecting the preference limit)
-        # or remaining_to_select, whichever is smaller
-        max_to_select = min(preferential_max, remaining_to_select)
-        
-        preferential_selected = preferential_members[:max_to_select]
-        remaining_to_select -= len(preferential_selected)
+    Returns:
+        SelectionResult with details of the selection
+    """
+    selection_session = await _get_host_selection_session(data.code, host_id, db_session)
+    session_id = selection_session.id
+
+    previous_ids = list((await db_session.exec(
+        select(SelectionMember.id)
+        .where(SelectionMember.selection_session_id == session_id, SelectionMember.selected == True)
+        .order_by(SelectionMember.id)
+    )).all())
     
-    # If we still need more members, select them randomly
-    if remaining_to_select > 0:
-        # Get the remaining unselected members who were not selected in the preferential round
-        remaining_unselected = [m for m in unselected_members if m not in preferential_selected]
-        
-        # For members selected by preference with gender=female, we need to avoid selecting more females
-        # if we have a rule limiting females
+    # If we have more selected members than requested, raise an error
+    if len(previous_ids) >= data.count:
+        raise ValueError(f"Already selected {len(previous_ids)} members, which is equal to or more than requested count of {data.count}")
+
+    max_member_id = (await db_session.exec(
+        select(func.max(SelectionMember.id)).where(SelectionMember.selection_session_id == session_id)
+    )).one() or 0
+    seed = data.seed if data.seed is not None else secrets.randbits(63)
+    params = {
+        "count": data.count,
+        "preferential_selection": data.preferential_selection,
+        "max_member_id": max_member_id,
+        "previous_ids": previous_ids,
+    }
+
+    if data.quotas is not None:
+        algorithm_version = QUOTA_DRAW_VERSION
+        resolved = await resolve_access_code(data.code, db_session)
+        rules = (await db_session.exec(
+            select(PreferentialSelectionRule.field_key, PreferentialSelectionRule.preference_max_selection)
+            .where(PreferentialSelectionRule.selection_session_id == session_id)
+            .order_by(PreferentialSelectionRule.id)
+        )).all()
+        params.update({
+            "quotas": [quota.dict() for quota in data.quotas],
+            "rules": [[field_key, limit] for field_key, limit in rules],
+            "field_keys": resolved["field_keys"] if resolved else [],
+        })
+    else:
+        algorithm_version = PREFERENTIAL_DRAW_VERSION
+        rule_max = None
         if data.preferential_selection:
+            # Only the first preference is used; rules name the preferred value (e.g.
+            # rule.field_key = "female") and the tightest one applies
             field_key = list(data.preferential_selection.keys())[0]
             field_value = data.preferential_selection[field_key]
-            
-            # Check if there's a rule for this specific value
-            rule_for_value = False
-            max_allowed = None
-            for rule in pref_rules:
-                if rule.field_key.lower() == field_value.lower():
-                    rule_for_value = True
-                    max_allowed = rule.preference_max_selection
-                    break
-                    
-            if rule_for_value:
-                # Count total selected including already selected and newly preferential selected
-                current_count = already_preferential_count + len(preferential_selected)
-                
-                # If we're already at or over the limit, exclude members with this value from random selection
-                if current_count >= max_allowed:
-                    remaining_unselected = [m for m in remaining_unselected if not (
-                        field_key in m.attributes and str(m.attributes[field_key]).lower() == field_value.lower()
-                    )]
-        
-        # Randomly shuffle the remaining unselected members
-        random.shuffle(remaining_unselected)
-        
-        # Select up to remaining_to_select random members
-        random_selected = remaining_unselected[:remaining_to_select]
-    
-    # Combine all selected members
-    newly_selected_members = preferential_selected + random_selected
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
-    
-    # Create SelectionLog entries and update member selection status
-    for member in newly_selected_members:
-        # Determine selection type
-        selection_type = "preferential" if member in preferential_selected else "random"
-        
-        # Create log entry
-        selection_log = SelectionLog(
-            selection_session_id=selection_session.id,
-            member_id=member.id,
-            selected_at=now,
-            selection_type=selection_type
-        )
-        db_session.add(selection_log)
-        
-        # Update member status to selected
-        member.selected = True
-        db_session.add(member)
-    
-    # Commit the changes
-    await db_session.commit()
-    
-    # Create response with details
-    selected_member_identifiers = [m.member_identifier for m in already_selected_members] + [m.member_identifier for m in newly_selected_members]
-    
-    # For debugging, count how many of the selected members match the preferential criteria
-    if data.preferential_selection:
-        field_key = list(data.preferential_selection.keys())[0]
-        field_value = data.preferential_selection[field_key]
-        
-        # Count in all selected members (already selected + newly selected)
-        all_selected = already_selected_members + newly_selected_members
-        matching_count = 0
-        
-        for member in all_selected:
-            if field_key in member.attributes and str(member.attributes[field_key]).lower() == field_value.lower():
-                matching_count += 1
+            params["preferential_selection"] = {field_key: field_value}
+            rule_max = (await db_session.exec(
+                select(func.min(PreferentialSelectionRule.preference_max_selection)).where(
+                    PreferentialSelectionRule.selection_session_id == session_id,
+                    func.lower(PreferentialSelectionRule.field_key) == field_value.lower()
+                )
+            )).one()
+        params["rule_max"] = rule_max
 
-        
-        # Check against rule limits
-        for rule in pref_rules:
-            if rule.field_key.lower() == field_value.lower():
-                if matching_count > rule.preference_max_selection:
-                    print("WARNING: Selected more than the rule limit!")
-
-    # Create the result object
-    result = SelectionResult(
-        selected_count=len(already_selected_members) + len(newly_selected_members),
-        preferential_count=len(preferential_selected),
-        random_count=len(random_selected) + len(already_selected_members),
-        member_identifiers=selected_member_identifiers
+    outcome = await _DRAWS[algorithm_version](session_id, params, seed, db_session)
+    newly_selected = outcome["selected"]
+    draw = SelectionDraw(
+        selection_session_id=session_id,
+        seed=seed,
+        algorithm_version=algorithm_version,
+        draw_params=params,
+        result=[]
+    )
+    await _record_selection(session_id, host_id, draw, newly_selected, db_session)
+
+    preferential_count = sum(1 for _, _, selection_type in newly_selected if selection_type == "preferential")
+    return SelectionResult(
+        selected_count=len(outcome["already"]) + len(newly_selected),
+        preferential_count=preferential_count,
+        random_count=len(newly_selected) - preferential_count + len(outcome["already"]),
+        member_identifiers=outcome["already"] + [identifier for _, identifier, _ in newly_selected],
+        quota_fill=outcome["quota_fill"],
+        seed=seed,
+        draw_id=draw.id
+    )
+
+
+async def replay_selection_draw(
+    code: str,
+    draw_id: int,
+    host_id: int,
+    db_session: AsyncSession
+) -> SelectionReplay:
+    """Recompute a stored draw from its seed and inputs and compare it with what was selected"""
+    selection_session = await _get_host_selection_session(code, host_id, db_session)
+    draw = await db_session.get(SelectionDraw, draw_id)
+    if not draw or draw.selection_session_id != selection_session.id:
+        raise ValueError("Selection draw not found")
+    recompute = _DRAWS.get(draw.algorithm_version)
+    if recompute is None:
+        raise ValueError(f"Draws made with {draw.algorithm_version} can no longer be replayed")
+
+    outcome = await recompute(selection_session.id, draw.draw_params, draw.seed, db_session)
+    recomputed = [[member_id, selection_type] for member_id, _, selection_type in outcome["selected"]]
+
+    identifiers = dict((await db_session.exec(
+        select(SelectionMember.id, SelectionMember.member_identifier)
+        .where(SelectionMember.id == any_(_id_array([member_id for member_id, _ in draw.result])))
+    )).all()) if draw.result else {}
+    return SelectionReplay(
+        draw_id=draw.id,
+        seed=draw.seed,
+        algorithm_version=draw.algorithm_version,
+        matches=recomputed == draw.result,
+        recorded=[identifiers.get(member_id, str(member_id)) for member_id, _ in draw.result],
+        recomputed=[identifier for _, identifier, _ in outcome["selected"]]
     )
-    
-    return result
 
 
 async def get_selected_members(
@@ -560,8 +673,16 @@ async def clear_selections(
     for log in logs:
         await db_session.delete(log)
     
+    await bump_host_stats(host_id, db_session, selections=-len(selected_members))
+    await bump_data_version("selection", selection_session.id, db_session)
+
     # Commit the changes
     await db_session.commit()
+    publish_session_event(
+        "selection", selection_session.id, SELECTIONS_CLEARED,
+        {"cleared": len(selected_members)},
+        {"selected": -len(selected_members)}
+    )
     
     # Return the number of cleared selections
     return len(selected_members)
\ No newline at end of file
@@ -0,0 +1,190 @@
+# app/services/session_history_service.py
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, or_, case, literal_column, tuple_, union_all, String
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.access_code import AccessCode
+from app.models.group_session import GroupSession
+from app.models.selection_session import SelectionSession
+from app.models.group_member import GroupMember
+from app.models.selection_member import SelectionMember
+from app.models.groups import Group
+
+
+def encode_cursor(created_at: datetime, session_type: str, session_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), session_type, session_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, session_type, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(session_type), int(session_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def escape_like(text: str) -> str:
+    """Make %, _ and \\ in user input match literally in a LIKE pattern (escape "\\")"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _history_branch(model, kind: str, host_id: int, session_status: Optional[str], q: Optional[str], now: datetime):
+    is_active = and_(AccessCode.status == "active", AccessCode.expires_at > now)
+    stmt = (
+        select(
+            model.id.label("id"),
+            model.name.label("name"),
+            literal_column(f"'{kind}'", String).label("type"),
+            case((is_active, "active"), else_="expired").label("status"),
+            AccessCode.created_at.label("created_at"),
+            AccessCode.expires_at.label("expires_at"),
+            model.max_group_size.label("max_group_size"),
+            AccessCode.code.label("access_code"),
+        )
+        .join(AccessCode, model.code_id == AccessCode.id)
+        # Filtering on the code's host lets ix_access_codes_host_id_created_at drive the scan
+        .where(AccessCode.host_id == host_id)
+    )
+    if q:
+        # Backed by the pg_trgm index on lower(name)
+        stmt = stmt.where(func.lower(model.name).like(f"%{escape_like(q.lower())}%", escape="\\"))
+    if session_status:
+        if session_status.lower() == "active":
+            stmt = stmt.where(is_active)
+        elif session_status.lower() in ("expired", "inactive"):
+            stmt = stmt.where(or_(AccessCode.status != "active", AccessCode.expires_at <= now))
+    return stmt
+
+
+async def get_session_history(
+    host_id: int,
+    include_group: bool,
+    include_selection: bool,
+    session_status: Optional[str],
+    q: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    db: AsyncSession
+) -> dict:
+    """Return one page of a host's group and selection sessions, newest first.
+
+    Both kinds come from a single UNION ALL ordered by (created_at, type, id). With a cursor
+    (next_cursor of the previous page) the page starts right after that key, so deep pages
+    cost the same as the first one; without one, offset is applied to the merged list.
+    Counts are computed only for the rows of the page. total_count is only computed for
+    the first page (no cursor) and is None on the pages after it.
+    """
+    now = datetime.now()
+    branches = []
+    if include_group:
+        branches.append(_history_branch(GroupSession, "group", host_id, session_status, q, now))
+    if include_selection:
+        branches.append(_history_branch(SelectionSession, "selection", host_id, session_status, q, now))
+    if not branches:
+        return {"sessions": [], "total_count": 0, "next_cursor": None}
+
+    history = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery("history")
+
+    total_count = None
+    if not cursor:
+        total_count = int((await db.exec(select(func.count()).select_from(history))).one() or 0)
+
+    sort_key = (history.c.created_at.desc(), history.c.type.desc(), history.c.id.desc())
+    page_stmt = select(history).order_by(*sort_key).limit(limit)
+    if cursor:
+        created_at, session_type, session_id = decode_cursor(cursor)
+        page_stmt = page_stmt.where(
+            tuple_(history.c.created_at, history.c.type, history.c.id) < tuple_(created_at, session_type, session_id)
+        )
+    else:
+        page_stmt = page_stmt.offset(offset)
+    page = page_stmt.subquery("page")
+
+    participant_count = case(
+        (
+            page.c.type == "group",
+            select(func.count(GroupMember.id)).where(GroupMember.session_id == page.c.id).scalar_subquery()
+        ),
+        else_=select(func.count(SelectionMember.id))
+        .where(SelectionMember.selection_session_id == page.c.id)
+        .scalar_subquery()
+    )
+    # groups created for group sessions, selected members for selection sessions
+    kind_count = case(
+        (
+            page.c.type == "group",
+            select(func.count(Group.id)).where(Group.session_id == page.c.id).scalar_subquery()
+        ),
+        else_=select(func.count(SelectionMember.id))
+        .where(SelectionMember.selection_session_id == page.c.id, SelectionMember.selected == True)
+        .scalar_subquery()
+    )
+
+    rows = (await db.exec(
+        select(page, participant_count.label("participant_count"), kind_count.label("kind_count"))
+        .order_by(page.c.created_at.desc(), page.c.type.desc(), page.c.id.desc())
+    )).all()
+
+    sessions = []
+    for row in rows:
+        item = {
+            "id": row.id,
+            "name": row.name,
+            "type": row.type,
+            "status": row.status,
+            "participant_count": int(row.participant_count or 0),
+            "created_at": row.created_at,
+            "expires_at": row.expires_at,
+            "max_group_size": row.max_group_size,
+            "access_code": row.access_code,
+        }
+        if row.type == "group":
+            item["group_created"] = int(row.kind_count or 0)
+        else:
+            item["selected"] = int(row.kind_count or 0)
+        sessions.append(item)
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.type, last.id)
+
+    return {"sessions": sessions, "total_count": total_count, "next_cursor": next_cursor}
+
+
+async def find_host_sessions(
+    host_id: int,
+    include_group: bool,
+    include_selection: bool,
+    session_status: Optional[str],
+    q: Optional[str],
+    limit: int,
+    db: AsyncSession
+) -> list:
+    """(type, id, name) of a host's sessions matching the history filters, newest first.
+
+    One query; every row is owned by host_id, so callers need no per-session access check.
+    """
+    now = datetime.now()
+    branches = []
+    if include_group:
+        branches.append(_history_branch(GroupSession, "group", host_id, session_status, q, now))
+    if include_selection:
+        branches.append(_history_branch(SelectionSession, "selection", host_id, session_status, q, now))
+    if not branches:
+        return []
+
+    history = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery("history")
+    rows = await db.exec(
+        select(history.c.type, history.c.id, history.c.name)
+        .order_by(history.c.created_at.desc(), history.c.type.desc(), history.c.id.desc())
+        .limit(limit)
+    )
+    return [(row.type, row.id, row.name) for row in rows.all()]
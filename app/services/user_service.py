@@ -4,6 +4,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from app.models.user import User
 from app.core.cache import store_temp_user, get_temp_user, delete_temp_user
+from app.core.dependencies import invalidate_user_cache
 from app.utils.email_utils import send_email, generate_code
 from app.utils.email_template import registration_message, registration_success
 from app.schemas.user import RegisterRequest
@@ -173,7 +174,7 @@ class AuthService:
             )
         
         # Generate access token
-        access_token = create_access_token(data={"sub": user.email})
+        access_token = create_access_token(data={"sub": user.email, "uid": user.id})
 
         # Optionally set HttpOnly access token cookie for cross-site auth
         if response is not None:
@@ -340,6 +341,7 @@ class AuthService:
             user.password = hash_password(new_password)
             session.add(user)
             await session.commit()
+            invalidate_user_cache(user.email)
         except Exception as exc:
             await session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to reset password") from exc
@@ -396,6 +398,7 @@ class AuthService:
             user.password = hash_password(new_password)
             session.add(user)
             await session.commit()
+            invalidate_user_cache(user.email)
         except Exception as e:
             await session.rollback()
             raise HTTPException(
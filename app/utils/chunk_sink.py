@@ -0,0 +1,34 @@
+"""
+Write-only file for writers that stream their output (ParquetWriter, zipfile)
+"""
+import io
+from typing import List
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file that hands out what was written since the last drain().
+
+    Being non-seekable matters for zipfile: it then writes each entry with a trailing data
+    descriptor, so the archive can be sent while it is being built.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
@@ -3,7 +3,7 @@ Helper functions to handle file exports (stream-only, no local storage)
 """
 from io import BytesIO
 from fastapi.responses import StreamingResponse
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterator, Tuple
 
 def process_file_export(
     file_buffer: BytesIO,
@@ -41,3 +41,35 @@ def process_file_export(
         media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     ), filename
+
+
+def stream_file_export(
+    chunks: Iterator[bytes],
+    session_type: str,
+    session_id: int,
+    metadata: Dict[str, Any],
+    file_extension: str,
+    media_type: str
+) -> Tuple[StreamingResponse, str]:
+    """
+    Return a streaming response that sends the file chunk by chunk instead of from one buffer.
+    Uses the same filename scheme as process_file_export.
+    
+    Args:
+        chunks: Iterator over the file contents
+        session_type: Type of session (group or selection)
+        session_id: ID of the session
+        metadata: Session metadata
+        file_extension: File extension (xlsx, pdf, ...)
+        media_type: Content type for the response
+        
+    Returns:
+        Tuple of (StreamingResponse, filename)
+    """
+    filename = f"{session_type}_session_{metadata['session_name'].replace(' ', '_')}_{session_id}.{file_extension}"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    ), filename
@@ -0,0 +1,185 @@
+"""
+Table layout for FPDF exports: measured once, wrapped and paginated without multi_cell
+"""
+import logging
+import os
+from typing import Dict, List, Sequence, Tuple
+
+from fpdf import FPDF
+
+# Path to a Unicode TrueType font (e.g. DejaVuSans.ttf); without it the core Arial font is
+# used and characters outside latin-1 are replaced with '?'
+EXPORT_PDF_FONT = os.getenv("EXPORT_PDF_FONT")
+# Optional bold variant; the regular file is used for bold text when unset
+EXPORT_PDF_FONT_BOLD = os.getenv("EXPORT_PDF_FONT_BOLD")
+
+UNICODE_FAMILY = "ExportUnicode"
+
+logger = logging.getLogger(__name__)
+
+
+def new_pdf() -> Tuple[FPDF, str]:
+    """Create a document with one page and return it with the font family to use"""
+    pdf = FPDF()
+    family = "Arial"
+    if EXPORT_PDF_FONT:
+        try:
+            pdf.add_font(UNICODE_FAMILY, "", EXPORT_PDF_FONT, uni=True)
+            pdf.add_font(UNICODE_FAMILY, "B", EXPORT_PDF_FONT_BOLD or EXPORT_PDF_FONT, uni=True)
+            family = UNICODE_FAMILY
+        except Exception as e:
+            logger.warning("PDF font %s could not be loaded, using Arial: %s", EXPORT_PDF_FONT, e)
+    pdf.add_page()
+    return pdf, family
+
+
+def pdf_text(family: str, value) -> str:
+    """Text safe for the document's font: unchanged with a Unicode font, latin-1 otherwise"""
+    text = "" if value is None else str(value)
+    if family == UNICODE_FAMILY:
+        return text
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+class TextMeasure:
+    """String widths from per-character widths measured once per font and size.
+
+    Call select() after changing the font; widths are then summed from a dict lookup per
+    character instead of asking FPDF for every string.
+    """
+
+    def __init__(self, pdf: FPDF):
+        self.pdf = pdf
+        self._widths: Dict[Tuple[str, str, float], Dict[str, float]] = {}
+        self._active: Dict[str, float] = {}
+
+    def select(self) -> None:
+        key = (self.pdf.font_family, self.pdf.font_style, self.pdf.font_size_pt)
+        self._active = self._widths.setdefault(key, {})
+
+    def width(self, text: str) -> float:
+        table = self._active
+        try:
+            return sum(map(table.__getitem__, text))
+        except KeyError:
+            for char in text:
+                if char not in table:
+                    table[char] = self.pdf.get_string_width(char)
+            return sum(map(table.__getitem__, text))
+
+    def wrap(self, text: str, max_width: float) -> List[str]:
+        """Greedy word wrap to max_width; words longer than a line are split by character"""
+        if not text:
+            return [""]
+        if "\n" not in text and self.width(text) <= max_width:
+            return [text]
+        table = self._active
+        space = self.width(" ")
+        lines: List[str] = []
+        for paragraph in text.split("\n"):
+            line, line_width = "", 0.0
+            for word in paragraph.split(" "):
+                word_width = self.width(word)
+                if line and line_width + space + word_width <= max_width:
+                    line, line_width = f"{line} {word}", line_width + space + word_width
+                    continue
+                if line:
+                    lines.append(line)
+                line, line_width = "", 0.0
+                while word_width > max_width and len(word) > 1:
+                    # Break an overlong word at the last character that fits
+                    cut, cut_width = 0, 0.0
+                    while cut < len(word) - 1 and cut_width + table[word[cut]] <= max_width:
+                        cut_width += table[word[cut]]
+                        cut += 1
+                    cut = max(cut, 1)
+                    lines.append(word[:cut])
+                    word = word[cut:]
+                    word_width = self.width(word)
+                line, line_width = word, word_width
+            lines.append(line)
+        return lines
+
+
+class PdfTable:
+    """Bordered table with fixed column widths.
+
+    Rows grow to fit wrapped text; a row that does not fit on the page starts a new page
+    and repeats the header. Text is drawn with FPDF.text and borders as one line per row
+    plus column lines per page, so no per-cell width checks, cells or multi_cell layout
+    happen in FPDF itself.
+    """
+
+    def __init__(
+        self,
+        pdf: FPDF,
+        family: str,
+        columns: Sequence[Tuple[str, float]],
+        line_height: float = 10,
+        font_size: float = 11
+    ):
+        self.pdf = pdf
+        self.family = family
+        self.columns = list(columns)
+        self.line_height = line_height
+        self.font_size = font_size
+        self.width = sum(width for _, width in self.columns)
+        self.measure = TextMeasure(pdf)
+        self._top = pdf.get_y()
+
+    def _fits(self, height: float) -> bool:
+        return self.pdf.get_y() + height <= self.pdf.h - self.pdf.b_margin
+
+    def _draw(self, cells: List[List[str]], height: float, fill: bool) -> None:
+        """Draw one row's shading, text and bottom border; column lines are drawn per page"""
+        pdf = self.pdf
+        x, y = pdf.l_margin, pdf.get_y()
+        if fill:
+            pdf.rect(x, y, self.width, height, "F")
+        # Vertical offset of the first baseline, as FPDF.cell centres single lines
+        baseline = 0.5 * self.line_height + 0.3 * pdf.font_size
+        for (_, width), lines in zip(self.columns, cells):
+            for i, line in enumerate(lines):
+                if line:
+                    pdf.text(x + pdf.c_margin, y + i * self.line_height + baseline, line)
+            x += width
+        pdf.line(pdf.l_margin, y + height, pdf.l_margin + self.width, y + height)
+        pdf.set_xy(pdf.l_margin, y + height)
+
+    def _close(self) -> None:
+        """Draw the column lines of the part of the table on the current page"""
+        pdf = self.pdf
+        x, bottom = pdf.l_margin, pdf.get_y()
+        pdf.line(x, self._top, x, bottom)
+        for _, width in self.columns:
+            x += width
+            pdf.line(x, self._top, x, bottom)
+
+    def header(self) -> None:
+        self.pdf.set_font(self.family, "B", self.font_size)
+        headers = [[pdf_text(self.family, title)] for title, _ in self.columns]
+        if not self._fits(self.line_height * 2):
+            self.pdf.add_page()
+        self._top = self.pdf.get_y()
+        self.pdf.line(self.pdf.l_margin, self._top, self.pdf.l_margin + self.width, self._top)
+        self._draw(headers, self.line_height, fill=False)
+        self.pdf.set_font(self.family, "", self.font_size)
+
+    def rows(self, rows: Sequence[Sequence], fill: Sequence[bool] = ()) -> None:
+        """Draw rows of cell values below header(); fill[i] shades row i with the current fill colour"""
+        pdf = self.pdf
+        pdf.set_font(self.family, "", self.font_size)
+        self.measure.select()
+        for index, values in enumerate(rows):
+            cells = [
+                self.measure.wrap(pdf_text(self.family, value), width - 2 * pdf.c_margin)
+                for value, (_, width) in zip(values, self.columns)
+            ]
+            height = self.line_height * max(len(lines) for lines in cells)
+            if not self._fits(height):
+                self._close()
+                pdf.add_page()
+                self.header()
+                self.measure.select()
+            self._draw(cells, height, fill=index < len(fill) and fill[index])
+        self._close()
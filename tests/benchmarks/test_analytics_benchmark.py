@@ -0,0 +1,91 @@
+"""Yearly dashboard analytics (three years of daily buckets) against a warm bucket cache"""
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.models.groups import Group
+from app.models.selection_log import SelectionLog
+from app.models.selection_member import SelectionMember
+from app.services.analytics_service import get_daily_buckets, roll_up
+from tests.conftest import BENCHMARK_SCALE
+from tests.factories import make_group_session, make_host, make_selection_session
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+DAYS = 365 * 3
+GROUP_JOINS = int(30_000 * BENCHMARK_SCALE)
+SELECTION_JOINS = int(20_000 * BENCHMARK_SCALE)
+SELECTIONS = SELECTION_JOINS // 2
+RUNS = 10
+BUDGET_SECONDS = 0.05
+
+
+async def _seed(db):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host)
+    selection_session = await make_selection_session(db, host)
+    rng = random.Random(8)
+    now = datetime.now()
+
+    def moment():
+        return now - timedelta(seconds=rng.randrange(DAYS * 86400))
+
+    async with db() as session:
+        group_id = (await session.exec(select(Group.id).where(Group.session_id == group_session.id))).first()
+        groups = [
+            {"group_id": group_id, "session_id": group_session.id, "group_name": "A",
+             "member_identifier": f"g{index}", "member_data": {}, "joined_at": moment()}
+            for index in range(GROUP_JOINS)
+        ]
+        members = [
+            {"selection_session_id": selection_session.id, "member_identifier": f"s{index}",
+             "attributes": {}, "selected": index < SELECTIONS, "joined_at": moment()}
+            for index in range(SELECTION_JOINS)
+        ]
+        for start in range(0, GROUP_JOINS, 5000):
+            await session.exec(insert(GroupMember), params=groups[start:start + 5000])
+        for start in range(0, SELECTION_JOINS, 5000):
+            await session.exec(insert(SelectionMember), params=members[start:start + 5000])
+        member_ids = (await session.exec(
+            select(SelectionMember.id).where(SelectionMember.selected == True).order_by(SelectionMember.id)
+        )).all()
+        logs = [
+            {"selection_session_id": selection_session.id, "member_id": member_id, "selected_at": moment()}
+            for member_id in member_ids
+        ]
+        for start in range(0, len(logs), 5000):
+            await session.exec(insert(SelectionLog), params=logs[start:start + 5000])
+        await session.commit()
+    return host
+
+
+async def test_yearly_analytics_from_a_warm_cache(db):
+    host = await _seed(db)
+    first_day = date.today() - timedelta(days=DAYS)
+
+    async with db() as session:
+        started = time.perf_counter()
+        days = await get_daily_buckets(host.id, first_day, session)
+        cold = time.perf_counter() - started
+
+        timings = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            warm = roll_up(await get_daily_buckets(host.id, first_day, session), "%Y")
+            timings.append(time.perf_counter() - started)
+
+    totals = {metric: sum(counts[metric] for counts in days.values()) for metric in days[first_day]}
+    assert totals["group_joins"] == GROUP_JOINS
+    assert totals["selection_joins"] == SELECTION_JOINS
+    assert totals["selections"] == SELECTIONS
+    assert warm == roll_up(days, "%Y")
+
+    median = statistics.median(timings)
+    print(f"\nyearly analytics over {DAYS} days: cold {cold * 1000:.1f} ms, warm median {median * 1000:.1f} ms")
+    assert median < BUDGET_SECONDS
@@ -0,0 +1,45 @@
+"""Peak Python memory of the streamed Excel export as the session grows"""
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from app.services.export_stream import write_excel_stream
+from tests.conftest import BENCHMARK_SCALE
+from tests.factories import make_group_session, make_host, seed_group_members
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+SMALL = int(5000 * BENCHMARK_SCALE)
+LARGE = SMALL * 4
+
+
+async def _export_peak(db, members: int) -> float:
+    host = await make_host(db, f"host{members}@example.com")
+    group_session = await make_group_session(db, host, name=f"{members} members", group_names=[f"G{i}" for i in range(50)])
+    await seed_group_members(
+        db, group_session.id, members,
+        lambda i: {"dept": f"department {i % 13}", "city": f"city {i % 101}", "note": "x" * 40},
+    )
+
+    async with db() as session:
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            path, _ = await write_excel_stream(group_session.id, "group", session)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path)
+    os.remove(path)
+    print(f"\n{members} members: peak {peak / 2**20:.1f} MiB, {elapsed:.1f} s, file {size / 2**20:.1f} MiB")
+    return peak
+
+
+async def test_streamed_excel_memory_does_not_grow_with_members(db):
+    small = await _export_peak(db, SMALL)
+    large = await _export_peak(db, LARGE)
+    # Four times the members; a buffered export would need about four times the memory
+    assert large < small * 1.5
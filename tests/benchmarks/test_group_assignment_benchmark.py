@@ -0,0 +1,104 @@
+"""SQL eligibility (GROUP_ASSIGNMENT_MODE=sql) against the occupancy index path"""
+import random
+import time
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.models.groups import Group
+from app.models.preferential_grouping_rule import PreferentialGroupingRule
+from app.services import group_session_service
+from app.services.group_occupancy import build_occupancy, group_is_eligible, member_rule_keys
+from app.services.group_session_service import eligible_group_ids_sql
+from tests.conftest import BENCHMARK_SCALE
+from tests.factories import make_group_session, make_host
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+GROUPS = 40
+MEMBERS = int(2000 * BENCHMARK_SCALE)
+JOINS = 100
+DEPARTMENTS = ["sales", "ops", "eng", "hr", "legal"]
+
+
+async def _seed(db):
+    host = await make_host(db)
+    group_session = await make_group_session(
+        db, host, group_names=[f"G{i}" for i in range(GROUPS)], max_size=MEMBERS // GROUPS + 10,
+        fields=["gender", "department"], rules={"gender": MEMBERS // GROUPS // 2 + 2, "female": MEMBERS // GROUPS // 2 + 2},
+    )
+    rng = random.Random(2)
+    async with db() as session:
+        groups = (await session.exec(select(Group.id, Group.name).where(Group.session_id == group_session.id))).all()
+        rows = []
+        for index in range(MEMBERS):
+            group_id, group_name = groups[index % GROUPS]
+            rows.append({
+                "group_id": group_id,
+                "session_id": group_session.id,
+                "group_name": group_name,
+                "member_identifier": f"seed{index}",
+                "member_data": {"gender": rng.choice(["male", "female"]), "department": rng.choice(DEPARTMENTS)},
+            })
+        await session.exec(insert(GroupMember), params=rows)
+        await session.commit()
+        rules = (await session.exec(
+            select(PreferentialGroupingRule).where(PreferentialGroupingRule.group_session_id == group_session.id)
+        )).all()
+    return group_session, [group_id for group_id, _ in groups], rules
+
+
+async def test_sql_eligibility_is_one_query_and_matches_the_index(db, count_statements):
+    group_session, group_ids, rules = await _seed(db)
+    rng = random.Random(3)
+    probes = [
+        {"gender": rng.choice(["male", "female"]), "department": rng.choice(DEPARTMENTS)}
+        for _ in range(JOINS)
+    ]
+    max_size = MEMBERS // GROUPS + 10
+
+    async with db() as session:
+        started = time.perf_counter()
+        occupancy = await build_occupancy(group_session.id, group_ids, session)
+        build_seconds = time.perf_counter() - started
+
+        index_seconds = sql_seconds = 0.0
+        for member_data in probes:
+            rule_keys = member_rule_keys(member_data, rules, ["gender", "department"])
+
+            started = time.perf_counter()
+            from_index = {gid for gid in group_ids if group_is_eligible(occupancy, gid, max_size, rule_keys)}
+            index_seconds += time.perf_counter() - started
+
+            with count_statements() as statements:
+                started = time.perf_counter()
+                from_sql = await eligible_group_ids_sql(group_session.id, max_size, rule_keys, session)
+                sql_seconds += time.perf_counter() - started
+
+            assert len(statements) == 1
+            assert from_sql == from_index
+
+    print(
+        f"\n{MEMBERS} members, {GROUPS} groups, {JOINS} eligibility checks: "
+        f"index build {build_seconds * 1000:.1f} ms + {index_seconds / JOINS * 1e6:.1f} us/check, "
+        f"sql {sql_seconds / JOINS * 1000:.2f} ms/check"
+    )
+
+
+@pytest.mark.parametrize("assignment_mode", ["index", "sql"])
+async def test_join_latency(db, monkeypatch, assignment_mode):
+    monkeypatch.setattr(group_session_service, "GROUP_ASSIGNMENT_MODE", assignment_mode)
+    group_session, _, _ = await _seed(db)
+    rng = random.Random(4)
+
+    started = time.perf_counter()
+    for index in range(JOINS):
+        async with db() as session:
+            await group_session_service.join_group(
+                group_session.code_id, f"bench{index}",
+                {"gender": rng.choice(["male", "female"]), "department": rng.choice(DEPARTMENTS)}, session,
+            )
+    elapsed = time.perf_counter() - started
+    print(f"\n{assignment_mode}: {JOINS} joins into {MEMBERS} members, {elapsed / JOINS * 1000:.2f} ms/join")
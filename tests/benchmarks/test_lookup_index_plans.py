@@ -0,0 +1,114 @@
+"""Query plans of the hot lookups with and without the hot-lookup index migration's indexes"""
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import engine
+from tests.conftest import BENCHMARK_SCALE
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ROWS = int(20_000 * BENCHMARK_SCALE)
+SESSIONS = 200
+
+_spec = importlib.util.spec_from_file_location(
+    "hot_lookup_indexes",
+    Path(__file__).resolve().parents[2] / "alembic" / "versions" / "c4e8a1f29b7d_add_hot_lookup_indexes.py",
+)
+migration = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(migration)
+
+SEED = [
+    f"""INSERT INTO users (email, password, country, is_active, created_at)
+        SELECT 'user' || g || '@example.com', 'x', 'NG', true, now() FROM generate_series(1, {ROWS}) g""",
+    f"""INSERT INTO access_codes (code, host_id, created_at, expires_at, status)
+        SELECT 'CODE' || g, 1 + g % {ROWS}, now(), now() + interval '1 day',
+               CASE WHEN g % 4 = 0 THEN 'active' ELSE 'expired' END
+        FROM generate_series(1, {ROWS}) g""",
+    f"""INSERT INTO group_sessions (name, description, code_id, host_id, member_identifier, max_group_size, reveal_immediately, status, data_version)
+        SELECT 'session ' || g, '', g, 1, 'email', 50, false, 'active', 0 FROM generate_series(1, {SESSIONS}) g""",
+    f"""INSERT INTO groups (name, session_id)
+        SELECT 'Group ' || g, 1 + g % {SESSIONS} FROM generate_series(1, {SESSIONS * 10}) g""",
+    f"""INSERT INTO group_members (group_id, session_id, group_name, member_data, member_identifier, joined_at)
+        SELECT 1 + g % {SESSIONS * 10}, 1 + (g % {SESSIONS * 10}) % {SESSIONS}, 'Group', '{{}}'::jsonb, 'member' || g, now()
+        FROM generate_series(1, {ROWS * 5}) g""",
+    f"""INSERT INTO selection_sessions (name, description, code_id, member_identifier, host_id, max_group_size, data_version)
+        SELECT 'selection ' || g, '', g, 'email', 1, 1000, 0 FROM generate_series(1, {SESSIONS}) g""",
+    f"""INSERT INTO selection_members (selection_session_id, attributes, member_identifier, selected, joined_at)
+        SELECT 1 + g % {SESSIONS}, '{{}}'::jsonb, 'member' || g, g % 10 = 0, now() FROM generate_series(1, {ROWS * 5}) g""",
+    "ANALYZE",
+]
+
+# (description, query, indexes the planner may use for it)
+LOOKUPS = [
+    ("join: resolve active access code",
+     "SELECT * FROM access_codes WHERE code = 'CODE4000' AND status = 'active' ORDER BY id DESC",
+     {"uq_access_codes_code_active", "ix_access_codes_code"}),
+    ("auth: user by email",
+     "SELECT * FROM users WHERE email = 'user777@example.com'",
+     {"ix_users_email"}),
+    ("join: group duplicate check",
+     "SELECT id FROM group_members WHERE session_id = 17 AND member_identifier = 'member4217'",
+     {"uq_group_members_session_member"}),
+    ("join: selection duplicate check",
+     "SELECT id FROM selection_members WHERE selection_session_id = 17 AND member_identifier = 'member4217'",
+     {"uq_selection_members_session_member"}),
+    ("occupancy: members of a group",
+     "SELECT count(*) FROM group_members WHERE group_id = 42",
+     {"ix_group_members_group_id"}),
+    ("select: unselected members of a session",
+     "SELECT id FROM selection_members WHERE selection_session_id = 17 AND selected = false",
+     {"ix_selection_members_session_selected", "uq_selection_members_session_member"}),
+]
+
+
+def _indexes_used(plan: dict) -> set:
+    used = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        used |= _indexes_used(child)
+    return used
+
+
+async def _explain(conn, query: str):
+    started = time.perf_counter()
+    raw = (await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"))).scalar()
+    elapsed = time.perf_counter() - started
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return plan, elapsed
+
+
+async def test_hot_lookups_use_the_migration_indexes(db):
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+
+    after = {}
+    async with engine.connect() as conn:
+        for name, query, _ in LOOKUPS:
+            after[name] = await _explain(conn, query)
+
+    # The same lookups without the migration's indexes, rolled back afterwards
+    before = {}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        for index_name, _, _, _, _ in migration.INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        for name, query, _ in LOOKUPS:
+            before[name] = await _explain(conn, query)
+        await transaction.rollback()
+
+    print(f"\n{ROWS} users/codes, {ROWS * 5} group and selection members")
+    for name, _, expected in LOOKUPS:
+        before_plan, before_seconds = before[name]
+        after_plan, after_seconds = after[name]
+        print(
+            f"{name}: {before_plan['Plan']['Node Type']} {before_plan['Execution Time']:.2f} ms "
+            f"-> {after_plan['Plan']['Node Type']} {sorted(_indexes_used(after_plan['Plan']))} "
+            f"{after_plan['Execution Time']:.2f} ms"
+        )
+        assert not (_indexes_used(before_plan["Plan"]) & expected), name
+        assert _indexes_used(after_plan["Plan"]) & expected, (name, after_plan)
@@ -0,0 +1,44 @@
+"""sample_with_quotas over 100k candidates: a seeded draw is repeatable and stays interactive"""
+import random
+import time
+
+import pytest
+
+from app.schemas.selection import SelectionQuota
+from app.services.selection_quota import build_quotas, sample_with_quotas
+from tests.conftest import BENCHMARK_SCALE
+
+pytestmark = pytest.mark.benchmark
+
+CANDIDATES = int(100_000 * BENCHMARK_SCALE)
+COUNT = 1_000
+BUDGET_SECONDS = 1.0 * BENCHMARK_SCALE
+
+
+def test_seeded_quota_draw_over_100k_candidates():
+    rng = random.Random(11)
+    candidates = [
+        (member_id, {
+            "gender": rng.choice(["male", "female"]),
+            "department": rng.choice(["sales", "ops", "eng", "hr", "legal", "finance"]),
+        })
+        for member_id in range(1, CANDIDATES + 1)
+    ]
+    quotas = build_quotas(
+        [
+            SelectionQuota(field_key="gender", value="female", share=0.5),
+            SelectionQuota(field_key="department", max=200),
+        ],
+        None, [], ["gender", "department"], COUNT,
+    )
+
+    started = time.perf_counter()
+    first = sample_with_quotas(candidates, [], COUNT, quotas, seed=99)
+    elapsed = time.perf_counter() - started
+    second = sample_with_quotas(candidates, [], COUNT, quotas, seed=99)
+
+    print(f"\nquota draw: {COUNT} of {CANDIDATES} candidates in {elapsed * 1000:.0f} ms")
+    assert first == second
+    assert len(first["selected"]) == COUNT
+    assert all(fill["met"] for fill in first["fill"])
+    assert elapsed < BUDGET_SECONDS
@@ -0,0 +1,75 @@
+"""
+Shared fixtures.
+
+Tests that need Postgres use the db fixture and are skipped unless TEST_DATABASE_URL
+points at a disposable database (its tables are dropped and recreated per test), e.g.
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost:5432/groupify_test pytest
+"""
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+# Multiplies the data sizes of tests/benchmarks
+BENCHMARK_SCALE = float(os.getenv("BENCHMARK_SCALE", "1"))
+# app.core.database builds its engine at import time; it only connects on first use
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/groupify_test"
+
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import app.main  # noqa: E402,F401  registers every model on SQLModel.metadata
+from app.core.database import engine, async_session  # noqa: E402
+from app.services import access_code_cache, analytics_service  # noqa: E402
+from app.services.group_occupancy import invalidate_occupancy  # noqa: E402
+from app.services.live_events import flush_session_events  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def count_statements():
+    """Context manager collecting the SQL statements the app's engine runs inside it"""
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    return counting
+
+
+@pytest.fixture
+async def db():
+    """Empty schema on TEST_DATABASE_URL; yields the app's session factory"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    # Ids and codes restart with the schema; so must the per-worker caches keyed on them
+    access_code_cache._lru.clear()
+    analytics_service._bucket_cache.clear()
+    invalidate_occupancy()
+    try:
+        yield async_session
+    finally:
+        # Batched live events and pooled connections belong to this test's event loop
+        await flush_session_events()
+        await engine.dispose()
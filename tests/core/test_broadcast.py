@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.core.broadcast import RedisBroadcast, user_channel
+
+fakeredis = pytest.importorskip("fakeredis")
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis_hubs():
+    """Two workers' hubs sharing one Redis server, plus a client to inspect it"""
+    server = fakeredis.FakeServer()
+
+    def client():
+        return fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    hubs = [RedisBroadcast(client=client()), RedisBroadcast(client=client())]
+    yield hubs, client()
+    for hub in hubs:
+        await hub.close()
+
+
+async def _next(subscription):
+    return await asyncio.wait_for(subscription.get(), timeout=2)
+
+
+async def test_publish_on_one_worker_reaches_subscriptions_on_another(redis_hubs):
+    (first, second), _ = redis_hubs
+    async with first.subscription() as subscription:
+        await subscription.subscribe(user_channel(1))
+
+        await second.publish(user_channel(1), "hello")
+
+        assert await _next(subscription) == (user_channel(1), "hello")
+
+
+async def test_each_socket_of_a_user_gets_every_message_once(redis_hubs):
+    (first, second), redis = redis_hubs
+    sockets = [first.subscription(), first.subscription(), second.subscription()]
+    for socket in sockets:
+        await socket.subscribe(user_channel(1))
+    other_user = second.subscription()
+    await other_user.subscribe(user_channel(2))
+
+    # One Redis subscription per worker, however many local sockets share the channel
+    assert first.subscriber_count(user_channel(1)) == 2
+    assert await redis.pubsub_numsub(user_channel(1)) == [(user_channel(1), 2)]
+
+    await first.publish(user_channel(1), "one")
+    await first.publish(user_channel(1), "two")
+
+    for socket in sockets:
+        assert [await _next(socket), await _next(socket)] == [(user_channel(1), "one"), (user_channel(1), "two")]
+        assert socket.queue.empty()
+    assert other_user.queue.empty()
+    for socket in sockets + [other_user]:
+        await socket.close()
+
+
+async def test_unsubscribe_and_close_release_the_redis_subscription(redis_hubs):
+    (first, second), redis = redis_hubs
+    left, stays = first.subscription(), first.subscription()
+    await left.subscribe(user_channel(1))
+    await stays.subscribe(user_channel(1))
+
+    await left.unsubscribe(user_channel(1))
+    assert first.subscriber_count(user_channel(1)) == 1
+    assert await redis.pubsub_numsub(user_channel(1)) == [(user_channel(1), 1)]
+
+    await second.publish(user_channel(1), "after unsubscribe")
+    assert await _next(stays) == (user_channel(1), "after unsubscribe")
+    assert left.queue.empty()
+
+    await stays.close()
+    assert first.subscriber_count() == 0
+    assert await redis.pubsub_numsub(user_channel(1)) == [(user_channel(1), 0)]
+
+    await second.publish(user_channel(1), "after close")
+    await asyncio.sleep(0.05)
+    assert stays.queue.empty()
@@ -0,0 +1,109 @@
+"""Rows for database tests, created through the services the routes use"""
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.models.groups import Group
+from app.models.selection_member import SelectionMember
+from app.models.user import User
+from app.schemas.group_session import GroupSessionCreate, PreferentialRuleInput as GroupRuleInput
+from app.schemas.selection_session import SelectionSessionCreate, PreferentialRuleInput as SelectionRuleInput
+from app.services.group_session_service import create_group_session
+from app.services.selection_service import create_selection_session
+
+
+async def make_host(db, email: str = "host@example.com") -> User:
+    async with db() as session:
+        user = User(email=email, password="x", country="NG", is_active=True)
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+async def make_group_session(
+    db,
+    host: User,
+    name: str = "Group session",
+    group_names: Optional[List[str]] = None,
+    max_size: int = 5,
+    fields: Optional[List[str]] = None,
+    rules: Optional[dict] = None,
+    reveal: bool = True,
+):
+    """GroupSessionRead; code_id is the access code string"""
+    async with db() as session:
+        return await create_group_session(
+            GroupSessionCreate(
+                name=name,
+                description=name,
+                max=max_size,
+                reveal=reveal,
+                group_names=group_names or ["A", "B"],
+                fields=fields or [],
+                identifier="email",
+                preferential_rules=[GroupRuleInput(field_key=key, max_per_group=limit) for key, limit in (rules or {}).items()],
+            ),
+            host.id,
+            session,
+        )
+
+
+async def make_selection_session(
+    db,
+    host: User,
+    name: str = "Selection session",
+    fields: Optional[List[str]] = None,
+    rules: Optional[dict] = None,
+):
+    """SelectionSessionRead; code_id is the access code string"""
+    async with db() as session:
+        return await create_selection_session(
+            SelectionSessionCreate(
+                name=name,
+                description=name,
+                max=100,
+                fields=fields or [],
+                identifier="email",
+                preferential_rules=[SelectionRuleInput(field_key=key, preference_max_selection=limit) for key, limit in (rules or {}).items()],
+            ),
+            host.id,
+            session,
+        )
+
+
+async def seed_group_members(db, session_id: int, count: int, member_data=lambda index: {}) -> None:
+    """Bulk-insert count members spread round-robin over the session's groups"""
+    async with db() as session:
+        groups = (await session.exec(select(Group.id, Group.name).where(Group.session_id == session_id).order_by(Group.id))).all()
+        rows = [
+            {
+                "group_id": groups[index % len(groups)][0],
+                "session_id": session_id,
+                "group_name": groups[index % len(groups)][1],
+                "member_identifier": f"member{index}@example.com",
+                "member_data": member_data(index),
+            }
+            for index in range(count)
+        ]
+        for start in range(0, count, 5000):
+            await session.exec(insert(GroupMember), params=rows[start:start + 5000])
+        await session.commit()
+
+
+async def seed_selection_members(db, session_id: int, count: int, attributes=lambda index: {}, selected=lambda index: False) -> None:
+    async with db() as session:
+        rows = [
+            {
+                "selection_session_id": session_id,
+                "member_identifier": f"member{index}@example.com",
+                "attributes": attributes(index),
+                "selected": selected(index),
+            }
+            for index in range(count)
+        ]
+        for start in range(0, count, 5000):
+            await session.exec(insert(SelectionMember), params=rows[start:start + 5000])
+        await session.commit()
@@ -0,0 +1,56 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.core.database import get_session
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.services import session_history_service
+
+
+@pytest.fixture
+def client():
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=7, email="host@example.com", password="x", country="NG")
+    app.dependency_overrides[get_session] = no_db
+    try:
+        yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+async def test_history_route_calls_history_service(client, monkeypatch):
+    calls = []
+
+    async def fake_history(**kwargs):
+        calls.append(kwargs)
+        return {"sessions": [{"id": 1, "type": "group"}], "total_count": 1, "next_cursor": "abc"}
+
+    monkeypatch.setattr(session_history_service, "get_session_history", fake_history)
+    async with client:
+        response = await client.get("/api/dashboard/sessions/history", params={"session_type": "group", "q": "maths", "limit": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sessions"] == [{"id": 1, "type": "group"}]
+    assert body["next_cursor"] == "abc"
+    assert calls[0]["host_id"] == 7
+    assert calls[0]["include_group"] is True
+    assert calls[0]["include_selection"] is False
+    assert calls[0]["q"] == "maths"
+    assert calls[0]["limit"] == 5
+
+
+@pytest.mark.anyio
+async def test_history_route_rejects_bad_cursor(client, monkeypatch):
+    async def fake_history(**kwargs):
+        session_history_service.decode_cursor(kwargs["cursor"])
+
+    monkeypatch.setattr(session_history_service, "get_session_history", fake_history)
+    async with client:
+        response = await client.get("/api/dashboard/sessions/history", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
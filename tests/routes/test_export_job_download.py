@@ -0,0 +1,72 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.routes import export as export_routes
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: User(id=7, email="host@example.com", password="x", country="NG")
+    try:
+        yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+async def test_finished_job_downloads_from_the_cache(client, monkeypatch):
+    calls = []
+
+    async def fake_load(job_id, host_id):
+        calls.append((job_id, host_id))
+        return b"%PDF-1.4 test", {"session_name": "Maths club"}, {"format": "pdf", "session_type": "group", "session_id": 3}
+
+    monkeypatch.setattr(export_routes, "load_export_job_file", fake_load)
+    async with client:
+        response = await client.get("/api/export/jobs/abc123/download")
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.4 test"
+    assert response.headers["content-type"] == "application/pdf"
+    assert "group_session_Maths_club_3.pdf" in response.headers["content-disposition"]
+    assert calls == [("abc123", 7)]
+
+
+@pytest.mark.anyio
+async def test_unavailable_job_file_is_404(client, monkeypatch):
+    async def fake_load(job_id, host_id):
+        raise ValueError("Export file is no longer available; queue the export again")
+
+    monkeypatch.setattr(export_routes, "load_export_job_file", fake_load)
+    async with client:
+        response = await client.get("/api/export/jobs/abc123/download")
+
+    assert response.status_code == 404
+    assert "no longer available" in response.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_streamed_workbook_is_removed_when_recording_the_export_fails(client, monkeypatch, tmp_path):
+    workbook = tmp_path / "export.xlsx"
+
+    async def allow(**kwargs):
+        return True
+
+    async def fake_write(session_id, session_type, db):
+        workbook.write_bytes(b"PK test")
+        return str(workbook), {"session_name": "Maths club"}
+
+    async def failing_record(host_id, db):
+        raise RuntimeError("database gone")
+
+    monkeypatch.setattr(export_routes, "validate_host_access", allow)
+    monkeypatch.setattr(export_routes, "write_excel_stream", fake_write)
+    monkeypatch.setattr(export_routes, "record_export", failing_record)
+    async with client:
+        response = await client.get("/api/export/group-session/3/excel/stream", params={"access_code": "ABC123"})
+
+    assert response.status_code == 500
+    assert not workbook.exists()
@@ -0,0 +1,22 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.routes import group_session as group_session_routes
+
+
+@pytest.mark.anyio
+async def test_broadcast_failure_is_503_before_streaming(monkeypatch):
+    async def fake_resolve(code, member_identifier, db):
+        return 5, "Workshop"
+
+    async def failing_open(session_id, session_name, member_identifier):
+        raise ConnectionError("broadcast down")
+
+    monkeypatch.setattr(group_session_routes, "resolve_reveal_member", fake_resolve)
+    monkeypatch.setattr(group_session_routes, "open_reveal_stream", failing_open)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/groups/reveal/stream", params={"code": "ABC123", "member_identifier": "a@example.com"})
+
+    assert response.status_code == 503
+    assert "broadcast down" in response.json()["detail"]
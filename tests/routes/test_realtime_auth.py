@@ -0,0 +1,48 @@
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.main import app
+from app.core import dependencies
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture
+def token(monkeypatch):
+    """Access token of user 7, resolved from the user cache so no database is needed"""
+    monkeypatch.setattr(dependencies, "_user_cache", type(dependencies._user_cache)())
+    monkeypatch.setattr(dependencies, "USER_CACHE_TTL", 60)
+    dependencies._remember_user("host@example.com", User(id=7, email="host@example.com", password="x", country="NG"))
+    return create_access_token({"sub": "host@example.com", "uid": 7})
+
+
+def _closed_before_accept(client: TestClient, url: str, **kwargs) -> int:
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(url, **kwargs):
+            pass
+    return closed.value.code
+
+
+def test_dashboard_socket_requires_a_token():
+    with TestClient(app) as client:
+        assert _closed_before_accept(client, "/api/realtime/dashboard/7") == 1008
+        assert _closed_before_accept(client, "/api/realtime/dashboard/7?token=not-a-jwt") == 1008
+
+
+def test_dashboard_socket_rejects_another_users_id(token):
+    with TestClient(app) as client:
+        assert _closed_before_accept(client, f"/api/realtime/dashboard/8?token={token}") == 1008
+
+
+@pytest.mark.parametrize("by_cookie", [False, True])
+def test_dashboard_socket_accepts_its_own_user(token, by_cookie):
+    with TestClient(app) as client:
+        if by_cookie:
+            client.cookies.set(dependencies.AUTH_COOKIE_NAME, token)
+            url = "/api/realtime/dashboard/7"
+        else:
+            url = f"/api/realtime/dashboard/7?token={token}"
+        with client.websocket_connect(url) as websocket:
+            websocket.send_text("ping")
+            assert websocket.receive_text() == "pong"
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.access_code import AccessCode
+from app.services import group_session_service, selection_service
+from app.services.access_code_cache import resolve_access_code
+from tests.factories import make_group_session, make_host, make_selection_session
+
+
+async def _end_elsewhere(db, code: str) -> None:
+    """What end_session on another worker leaves behind: the code expired, this worker's cache untouched"""
+    async with db() as session:
+        assert await resolve_access_code(code, session) is not None
+        await session.exec(
+            update(AccessCode).where(AccessCode.code == code).values(expires_at=datetime.now() - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+@pytest.mark.anyio
+async def test_group_join_rechecks_code_after_cached_resolution(db):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host)
+    await _end_elsewhere(db, group_session.code_id)
+
+    async with db() as session:
+        with pytest.raises(ValueError, match="Invalid or expired code"):
+            await group_session_service.join_group(group_session.code_id, "late@example.com", {}, session)
+    # The stale entry is dropped, so the next lookup goes to the database
+    async with db() as session:
+        assert await resolve_access_code(group_session.code_id, session) is None
+
+
+@pytest.mark.anyio
+async def test_selection_join_rechecks_code_after_cached_resolution(db):
+    host = await make_host(db)
+    selection_session = await make_selection_session(db, host)
+    await _end_elsewhere(db, selection_session.code_id)
+
+    async with db() as session:
+        with pytest.raises(ValueError, match="Invalid or expired code"):
+            await selection_service.join_group(selection_session.code_id, "late@example.com", {}, session)
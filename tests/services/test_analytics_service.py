@@ -0,0 +1,81 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.models.groups import Group
+from app.models.selection_log import SelectionLog
+from app.models.selection_member import SelectionMember
+from app.services.analytics_service import get_daily_buckets, roll_up
+from tests.factories import make_group_session, make_host, make_selection_session
+
+
+def _counts(**values):
+    counts = dict.fromkeys(("group_sessions", "selection_sessions", "group_joins", "selection_joins", "selections"), 0)
+    counts.update(values)
+    return counts
+
+
+def test_roll_up_merges_days_into_period_buckets_in_order():
+    days = {
+        date(2024, 1, 30): _counts(group_joins=2),
+        date(2024, 1, 31): _counts(group_joins=1, selections=4),
+        date(2024, 2, 1): _counts(selection_sessions=1),
+    }
+
+    assert roll_up(days, "%Y-%m") == [
+        ("2024-01", _counts(group_joins=3, selections=4)),
+        ("2024-02", _counts(selection_sessions=1)),
+    ]
+    assert roll_up(days, "%Y") == [("2024", _counts(group_joins=3, selections=4, selection_sessions=1))]
+
+
+@pytest.mark.anyio
+async def test_past_days_are_cached_but_today_and_selections_are_not(db, count_statements):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host)
+    selection_session = await make_selection_session(db, host)
+    today = date.today()
+    yesterday, two_days_ago = today - timedelta(days=1), today - timedelta(days=2)
+
+    async with db() as session:
+        group_id = (await session.exec(select(Group.id).where(Group.session_id == group_session.id))).first()
+
+        def group_member(identifier, day):
+            return GroupMember(
+                group_id=group_id, session_id=group_session.id, group_name="A", member_identifier=identifier,
+                member_data={}, joined_at=datetime.combine(day, time(12)),
+            )
+
+        session.add(group_member("a", two_days_ago))
+        member = SelectionMember(
+            selection_session_id=selection_session.id, member_identifier="b", attributes={}, selected=True,
+            joined_at=datetime.combine(yesterday, time(9)),
+        )
+        session.add(member)
+        await session.flush()
+        session.add(SelectionLog(selection_session_id=selection_session.id, member_id=member.id, selected_at=datetime.combine(yesterday, time(10))))
+        await session.commit()
+
+    async with db() as session:
+        days = await get_daily_buckets(host.id, today - timedelta(days=3), session)
+    assert list(days) == [today - timedelta(days=3), two_days_ago, yesterday, today]
+    assert days[two_days_ago] == _counts(group_joins=1)
+    assert days[yesterday] == _counts(selection_joins=1, selections=1)
+    assert days[today] == _counts(group_sessions=1, selection_sessions=1)
+
+    # Another worker adds a join today and clears the selections; nothing is invalidated here
+    async with db() as session:
+        session.add(group_member("c", today))
+        await session.exec(delete(SelectionLog))
+        await session.commit()
+
+    async with db() as session:
+        with count_statements() as statements:
+            days = await get_daily_buckets(host.id, today - timedelta(days=3), session)
+    assert len(statements) == 1
+    assert days[two_days_ago] == _counts(group_joins=1)
+    assert days[yesterday] == _counts(selection_joins=1)
+    assert days[today] == _counts(group_sessions=1, selection_sessions=1, group_joins=1)
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.services import export_cache, export_jobs, export_pool
+from tests.factories import make_group_session, make_host, seed_group_members
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    """Fresh job queue and workers per test, bound to the test's event loop"""
+    monkeypatch.setattr(export_jobs, "_jobs", type(export_jobs._jobs)())
+    monkeypatch.setattr(export_jobs, "_pending", {})
+    monkeypatch.setattr(export_jobs, "_queue", None)
+    monkeypatch.setattr(export_jobs, "_workers", [])
+    monkeypatch.setattr(export_pool, "_executor", None)
+    monkeypatch.setattr(export_pool, "_slots", None)
+    yield export_jobs
+    for worker in export_jobs._workers:
+        worker.cancel()
+    export_pool.shutdown_export_pool()
+
+
+async def _finish(job_id: str, host_id: int) -> dict:
+    await asyncio.wait_for(export_jobs._queue.join(), timeout=30)
+    return export_jobs.get_export_job(job_id, host_id)
+
+
+async def test_job_renders_through_the_export_cache(db, jobs, tmp_path, monkeypatch):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host, group_names=["A", "B", "C"])
+    await seed_group_members(db, group_session.id, 30)
+    renders = []
+    render = export_cache.EXPORT_RENDERERS["pdf"]
+
+    async def counting(*args, **kwargs):
+        renders.append(args[:2])
+        return await render[1](*args, **kwargs)
+
+    monkeypatch.setitem(export_cache.EXPORT_RENDERERS, "pdf", (render[0], counting))
+
+    async with db() as session:
+        queued = await jobs.enqueue_export(host.id, "group", group_session.id, "pdf", str(tmp_path), session)
+        # The same export requested again while queued shares the job
+        again = await jobs.enqueue_export(host.id, "group", group_session.id, "pdf", str(tmp_path), session)
+    assert again["job_id"] == queued["job_id"]
+    finished = await _finish(queued["job_id"], host.id)
+    assert finished["status"] == "done", finished["error"]
+    assert finished["download_url"] == f"/api/export/jobs/{queued['job_id']}/download"
+
+    # Unchanged session: a new job is done at once from the cache a sync export would also use
+    async with db() as session:
+        repeat = await jobs.enqueue_export(host.id, "group", group_session.id, "pdf", str(tmp_path), session)
+    assert repeat["status"] == "done" and repeat["cached"]
+    data, metadata, job = await jobs.load_export_job_file(repeat["job_id"], host.id)
+    assert data.startswith(b"%PDF")
+    assert metadata["session_name"] == "Group session"
+    assert renders == [(group_session.id, "group")]
+
+    with pytest.raises(ValueError, match="not found"):
+        await jobs.load_export_job_file(repeat["job_id"], host.id + 1)
+
+
+async def test_failed_job_is_reported(db, jobs, tmp_path, monkeypatch):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("renderer down")
+
+    monkeypatch.setitem(export_cache.EXPORT_RENDERERS, "excel", ("xlsx", broken))
+    async with db() as session:
+        queued = await jobs.enqueue_export(host.id, "group", group_session.id, "excel", str(tmp_path), session)
+    finished = await _finish(queued["job_id"], host.id)
+
+    assert finished["status"] == "failed"
+    assert finished["error"] == "renderer down"
+    assert finished["download_url"] is None
+    with pytest.raises(ValueError, match="not finished"):
+        await jobs.load_export_job_file(queued["job_id"], host.id)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import export_pool
+from app.services.export_pool import ExportPoolBusy, export_pool_metrics, run_render
+from app.services.export_service import render_group_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+def _group_session_data(members: int, groups: int = 20) -> dict:
+    return {
+        "session": {"name": "Workshop", "description": "Pool test", "max_group_size": members, "status": "active"},
+        "access_code": "ABC123",
+        "groups": [(group_id, f"Group {group_id}") for group_id in range(groups)],
+        "members": [
+            (index % groups, f"member{index}@example.com", {"dept": f"d{index % 7}", "city": "Lagos"})
+            for index in range(members)
+        ],
+        "preferential_rules": [("dept", 3)],
+        "field_definitions": [],
+    }
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Fresh pool state per test; the executor is shut down afterwards"""
+    monkeypatch.setattr(export_pool, "_executor", None)
+    monkeypatch.setattr(export_pool, "_slots", None)
+    monkeypatch.setattr(export_pool, "_metrics", dict.fromkeys(export_pool._metrics, 0))
+    yield export_pool
+    export_pool.shutdown_export_pool()
+
+
+async def test_large_pdf_render_leaves_the_loop_responsive(pool):
+    data = _group_session_data(3000)
+    worst = 0.0
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.005)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    pdf = await run_render(render_group_pdf, data)
+    elapsed = time.perf_counter() - started
+    task.cancel()
+
+    assert pdf.startswith(b"%PDF")
+    print(f"\nrender {elapsed * 1000:.0f} ms, worst loop stall {worst * 1000:.1f} ms")
+    # A render on the loop would stall it for the whole render
+    assert worst < min(0.05, elapsed / 4)
+    assert export_pool_metrics()["completed"] == 1
+
+
+async def test_full_queue_is_refused(pool, monkeypatch):
+    monkeypatch.setattr(pool, "EXPORT_POOL_KIND", "thread")
+    monkeypatch.setattr(pool, "EXPORT_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(pool, "EXPORT_MAX_QUEUE", 1)
+    release = threading.Event()
+
+    running = asyncio.create_task(run_render(release.wait, 5))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(run_render(release.wait, 5))
+    await asyncio.sleep(0.05)
+    assert export_pool_metrics()["running"] == 1
+    assert export_pool_metrics()["queued"] == 1
+
+    with pytest.raises(ExportPoolBusy):
+        await run_render(release.wait, 5)
+    release.set()
+    assert await running and await queued
+    metrics = export_pool_metrics()
+    assert (metrics["completed"], metrics["rejected"], metrics["running"], metrics["queued"]) == (2, 1, 0, 0)
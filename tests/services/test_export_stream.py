@@ -0,0 +1,70 @@
+import os
+import threading
+
+import pytest
+from openpyxl import load_workbook
+from xlsxwriter.workbook import Workbook
+from xlsxwriter.worksheet import Worksheet
+
+from app.services.export_stream import write_excel_stream
+from tests.factories import make_group_session, make_host, make_selection_session, seed_group_members, seed_selection_members
+
+pytestmark = pytest.mark.anyio
+
+MEMBERS = 5000
+
+
+@pytest.fixture
+def xlsxwriter_threads(monkeypatch):
+    """Names of the threads that ran Worksheet.write and Workbook.close"""
+    threads = set()
+    for cls, name in ((Worksheet, "write"), (Workbook, "close")):
+        original = getattr(cls, name)
+
+        def spy(self, *args, _original=original, **kwargs):
+            threads.add(threading.current_thread().name)
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(cls, name, spy)
+    return threads
+
+
+async def test_group_excel_stream_rows_are_written_off_the_event_loop(db, xlsxwriter_threads):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host, group_names=["A", "B", "C"], fields=["dept", "city"])
+    await seed_group_members(db, group_session.id, MEMBERS, lambda i: {"dept": f"d{i % 7}", "city": "Lagos", "name": "x"})
+
+    async with db() as session:
+        path, metadata = await write_excel_stream(group_session.id, "group", session)
+    try:
+        assert metadata["session_name"] == group_session.name
+        sheet = load_workbook(path, read_only=True)["Group Members"]
+        rows = list(sheet.iter_rows(values_only=True))
+    finally:
+        os.remove(path)
+
+    assert rows[0] == ("Group Name", "Member ID", "Field: city", "Field: dept")
+    assert len(rows) == MEMBERS + 1
+    assert rows[1] == ("A", "member0@example.com", "Lagos", "d0")
+    # Rows come grouped: all of A, then B, then C
+    assert [row[0] for row in rows[1:]] == sorted(row[0] for row in rows[1:])
+    # Only the batch reads run on the event loop
+    assert xlsxwriter_threads
+    assert threading.main_thread().name not in xlsxwriter_threads
+
+
+async def test_selection_excel_stream_lists_selected_first(db):
+    host = await make_host(db)
+    selection_session = await make_selection_session(db, host)
+    await seed_selection_members(db, selection_session.id, 50, lambda i: {"team": f"t{i}"}, lambda i: i % 10 == 0)
+
+    async with db() as session:
+        path, _ = await write_excel_stream(selection_session.id, "selection", session)
+    try:
+        rows = list(load_workbook(path, read_only=True)["Selection Members"].iter_rows(values_only=True))
+    finally:
+        os.remove(path)
+
+    assert rows[0][:2] == ("Selection Summary:", "5 selected out of 50 total members")
+    members = [row for row in rows[3:] if row[0]]
+    assert [row[1] for row in members] == ["Yes"] * 5 + ["No"] * 45
@@ -0,0 +1,51 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from app.services.export_tabular import _arrow_schema, _csv_value, _typed, field_columns, iter_csv
+from tests.factories import make_group_session, make_host, seed_group_members
+
+
+@pytest.mark.parametrize("value", ["=HYPERLINK(\"http://x\")", "+1+2", "-2+3", "@SUM(A1)", "\tcmd", "\r=1", "-1 ", "\t5", "-inf"])
+def test_formula_like_text_is_quoted(value):
+    assert _csv_value(value) == "'" + value
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Lagos", "Lagos"), ("a=b", "a=b"), (-5, -5), (None, ""), (True, True),
+        ("+2348012345678", "+2348012345678"), ("-12.5", "-12.5"), ("+1e3", "+1e3"),
+    ],
+)
+def test_other_values_are_unchanged(value, expected):
+    assert _csv_value(value) == expected
+
+
+def test_datetime_fields_are_parsed_for_parquet():
+    pa = pytest.importorskip("pyarrow")
+    schema = _arrow_schema(pa, "selection", [("starts_at", "datetime")])
+    values = ["2024-05-01T09:30:00", "2024-05-01T09:30:00+02:00", "next week", ""]
+
+    typed = [_typed(value, "datetime") for value in values]
+
+    assert typed == [datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 1, 7, 30), None, None]
+    batch = pa.record_batch([[None] * 4, [None] * 4, [None] * 4, typed], schema=schema)
+    assert batch.column(3).to_pylist() == typed
+
+
+@pytest.mark.anyio
+async def test_csv_export_neutralises_member_data(db):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host, fields=["note"])
+    await seed_group_members(db, group_session.id, 2, lambda index: {"note": "=cmd|' /C calc'!A0" if index else "fine"})
+
+    async with db() as session:
+        columns = await field_columns(group_session.id, "group", session)
+    body = b"".join([chunk async for chunk in iter_csv(group_session.id, "group", columns)]).decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(body)))
+
+    assert rows[0] == ["group_name", "member_identifier", "joined_at", "note"]
+    assert [row[3] for row in rows[1:]] == ["fine", "'=cmd|' /C calc'!A0"]
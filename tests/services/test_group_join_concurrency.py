@@ -0,0 +1,58 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.services import group_session_service
+from tests.factories import make_group_session, make_host
+
+GROUPS = ["A", "B", "C", "D"]
+MAX_GROUP_SIZE = 5
+MAX_PER_GENDER = 2
+JOINERS = 40
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("assignment_mode", ["index", "sql"])
+@pytest.mark.parametrize("lock_mode", ["advisory", "row", "none"])
+async def test_concurrent_joins_keep_capacity_and_rules(db, monkeypatch, lock_mode, assignment_mode):
+    monkeypatch.setattr(group_session_service, "GROUP_JOIN_LOCK", lock_mode)
+    monkeypatch.setattr(group_session_service, "GROUP_ASSIGNMENT_MODE", assignment_mode)
+    host = await make_host(db)
+    group_session = await make_group_session(
+        db, host, group_names=GROUPS, max_size=MAX_GROUP_SIZE,
+        fields=["gender"], rules={"gender": MAX_PER_GENDER},
+    )
+    start = asyncio.Event()
+
+    async def join(index: int):
+        gender = "female" if index % 2 else "male"
+        async with db() as session:
+            await start.wait()
+            try:
+                await group_session_service.join_group(
+                    group_session.code_id, f"member{index}@example.com", {"gender": gender}, session
+                )
+                return True
+            except ValueError as e:
+                assert "No suitable group" in str(e)
+                return False
+
+    tasks = [asyncio.create_task(join(index)) for index in range(JOINERS)]
+    await asyncio.sleep(0)
+    start.set()
+    joined = await asyncio.gather(*tasks)
+
+    async with db() as session:
+        rows = (await session.exec(
+            select(GroupMember.group_name, GroupMember.member_data).where(GroupMember.session_id == group_session.id)
+        )).all()
+    per_group = Counter(group_name for group_name, _ in rows)
+    per_gender = Counter((group_name, data["gender"]) for group_name, data in rows)
+
+    assert max(per_group.values()) <= MAX_GROUP_SIZE
+    assert max(per_gender.values()) <= MAX_PER_GENDER
+    # Every (group, gender) slot fills up: the rule, not a lost update, turns the rest away
+    assert len(rows) == sum(joined) == len(GROUPS) * MAX_PER_GENDER * 2
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.models.group_member import GroupMember
+from app.models.groups import Group
+from app.services import group_occupancy, group_session_service
+from app.services.data_version import bump_data_version
+from tests.factories import make_group_session, make_host, seed_group_members
+
+pytestmark = pytest.mark.anyio
+
+
+async def _group_ids(db, session_id: int):
+    async with db() as session:
+        return list((await session.exec(select(Group.id).where(Group.session_id == session_id).order_by(Group.id))).all())
+
+
+async def test_moves_by_another_worker_invalidate_the_cached_index(db):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host, group_names=["A", "B"], max_size=4)
+    await seed_group_members(db, group_session.id, 4)
+    first, second = await _group_ids(db, group_session.id)
+
+    async with db() as session:
+        cached = await group_occupancy.get_occupancy(group_session.id, [first, second], session)
+    assert cached.counts == {first: 2, second: 2}
+
+    # Another worker's solve moves a member without changing the total; this worker's
+    # invalidate_occupancy never runs, only the version moves
+    async with db() as session:
+        moved = (await session.exec(select(GroupMember.id).where(GroupMember.group_id == first))).first()
+        await session.exec(update(GroupMember).where(GroupMember.id == moved).values(group_id=second))
+        await bump_data_version("group", group_session.id, session)
+        await session.commit()
+
+    async with db() as session:
+        fresh = await group_occupancy.get_occupancy(group_session.id, [first, second], session)
+    assert fresh is not cached
+    assert fresh.counts == {first: 1, second: 3}
+
+
+async def test_local_joins_keep_the_cached_index_current(db):
+    host = await make_host(db)
+    group_session = await make_group_session(db, host, group_names=["A", "B"], max_size=4)
+    group_ids = await _group_ids(db, group_session.id)
+
+    async with db() as session:
+        await group_session_service.join_group(group_session.code_id, "a@example.com", {}, session)
+    cached = group_occupancy._occupancy_cache[group_session.id]
+    async with db() as session:
+        await group_session_service.join_group(group_session.code_id, "b@example.com", {}, session)
+    async with db() as session:
+        current = await group_occupancy.get_occupancy(group_session.id, group_ids, session)
+
+    assert current is cached
+    assert current.total == 2
+    assert current.version == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.services import group_reveal
+
+pytestmark = pytest.mark.anyio
+
+
+class _FailingSubscription:
+    """Subscription whose subscribe fails once released, after other waiters have joined"""
+
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+        self.closed = False
+
+    async def subscribe(self, channel: str) -> None:
+        await self.release.wait()
+        raise ConnectionError("broadcast down")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def failing_broadcast(monkeypatch):
+    release = asyncio.Event()
+    subscriptions = []
+
+    def subscription():
+        subscriptions.append(_FailingSubscription(release))
+        return subscriptions[-1]
+
+    monkeypatch.setattr(group_reveal.broadcast, "subscription", subscription)
+    monkeypatch.setattr(group_reveal, "_rooms", {})
+    return release, subscriptions
+
+
+async def test_waiters_joining_during_a_failed_subscribe_get_the_error(failing_broadcast):
+    release, subscriptions = failing_broadcast
+    first = asyncio.create_task(group_reveal._join_room(1, "a@example.com"))
+    await asyncio.sleep(0)
+    others = [asyncio.create_task(group_reveal._join_room(1, f"m{index}@example.com")) for index in range(3)]
+    await asyncio.sleep(0)
+    assert group_reveal.reveal_waiter_count(1) == 4
+
+    release.set()
+    results = await asyncio.wait_for(asyncio.gather(first, *others, return_exceptions=True), timeout=1)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert group_reveal.reveal_waiter_count() == 0
+    assert len(subscriptions) == 1 and subscriptions[0].closed
+
+
+async def test_open_reveal_stream_raises_before_anything_is_sent(failing_broadcast):
+    release, _ = failing_broadcast
+    release.set()
+    with pytest.raises(ConnectionError):
+        await group_reveal.open_reveal_stream(1, "Workshop", "a@example.com")
+    assert group_reveal.reveal_waiter_count() == 0
+
+
+async def test_waiters_share_one_subscription_and_receive_the_reveal(monkeypatch):
+    monkeypatch.setattr(group_reveal, "_rooms", {})
+    (room, first), (same_room, second) = await asyncio.gather(
+        group_reveal._join_room(2, "a@example.com"),
+        group_reveal._join_room(2, "b@example.com"),
+    )
+    assert room is same_room
+
+    await group_reveal.publish_reveal(2, {"a@example.com": "Red", "b@example.com": "Blue"})
+    assert await asyncio.wait_for(first, timeout=1) == ("reveal-2", "Red")
+    assert await asyncio.wait_for(second, timeout=1) == ("reveal-2", "Blue")
+
+    await group_reveal._leave_room(room, "a@example.com", first)
+    await group_reveal._leave_room(room, "b@example.com", second)
+    assert group_reveal.reveal_waiter_count() == 0
+
+
+async def test_disconnect_after_the_first_chunk_releases_the_room(monkeypatch):
+    monkeypatch.setattr(group_reveal, "_rooms", {})
+    stream = await group_reveal.open_reveal_stream(1, "Workshop", "a@example.com")
+    assert group_reveal.reveal_waiter_count() == 1
+
+    assert (await stream.__anext__()).startswith("retry:")
+    await stream.aclose()
+
+    assert group_reveal.reveal_waiter_count() == 0
+    assert group_reveal._rooms == {}
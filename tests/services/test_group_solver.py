@@ -0,0 +1,90 @@
+from collections import Counter
+
+from app.models.preferential_grouping_rule import PreferentialGroupingRule
+from app.services.group_solver import solve_group_assignment
+
+
+def _rule(field_key: str, limit: int) -> PreferentialGroupingRule:
+    return PreferentialGroupingRule(group_session_id=1, field_key=field_key, max_per_group=limit)
+
+
+def _check(result, members, group_ids, max_group_size, limit_field=None, limit=None):
+    assert result["feasible"]
+    assert sorted(result["assignment"]) == sorted(member_id for member_id, _ in members)
+    sizes = Counter(result["assignment"].values())
+    assert set(sizes) <= set(group_ids)
+    assert max(sizes.values()) <= max_group_size
+    # Balanced: sizes within one of each other
+    assert max(sizes.values()) - min(sizes.get(gid, 0) for gid in group_ids) <= 1
+    if limit_field:
+        data = dict(members)
+        per_value = Counter((gid, data[member_id][limit_field]) for member_id, gid in result["assignment"].items())
+        assert max(per_value.values()) <= limit
+
+
+def test_places_everyone_a_greedy_join_order_can_strand():
+    # Two groups of 2, at most one "female" per group: random joins can put both men
+    # in one group first and leave no place for the second woman
+    members = [(1, {"gender": "male"}), (2, {"gender": "male"}), (3, {"gender": "female"}), (4, {"gender": "female"})]
+    result = solve_group_assignment(members, [10, 20], 2, [_rule("female", 1)], ["gender"])
+    _check(result, members, [10, 20], 2)
+    women = [result["assignment"][3], result["assignment"][4]]
+    assert sorted(women) == [10, 20]
+
+
+def test_field_rule_caps_each_value():
+    members = [(i, {"dept": ["a", "b", "c"][i % 3]}) for i in range(30)]
+    result = solve_group_assignment(members, [1, 2, 3], 10, [_rule("dept", 4)], ["dept"])
+    _check(result, members, [1, 2, 3], 10, "dept", 4)
+
+
+def test_capacity_certificate():
+    members = [(i, {}) for i in range(7)]
+    result = solve_group_assignment(members, [1, 2], 3, [], [])
+    assert not result["feasible"]
+    assert result["assignment"] == {}
+    assert result["unassigned"] == list(range(7))
+    assert result["certificate"] == ["7 members exceed total capacity of 2 groups x 3"]
+
+
+def test_rule_certificate_names_the_value():
+    members = [(i, {"gender": "female"}) for i in range(5)]
+    result = solve_group_assignment(members, [1, 2], 5, [_rule("gender", 2)], ["gender"])
+    assert not result["feasible"]
+    assert result["certificate"] == ["5 members with gender=female but at most 2 per group across 2 groups (4 places)"]
+
+
+def test_no_groups():
+    result = solve_group_assignment([(1, {})], [], 5, [], [])
+    assert not result["feasible"]
+    assert "The session has no groups" in result["certificate"]
+
+
+def test_overlapping_rules_fall_back_to_an_exact_search():
+    # Greedy places the two gender keys first and strands 3 and 4; {1, 2} / {3, 4} works
+    members = [
+        (1, {"gender": "M", "dept": "X"}),
+        (2, {"gender": "F", "dept": "Y"}),
+        (3, {"gender": "M", "dept": "Y"}),
+        (4, {"gender": "F", "dept": "X"}),
+    ]
+    result = solve_group_assignment(members, [1, 2], 2, [_rule("gender", 1), _rule("dept", 1)], ["gender", "dept"])
+    _check(result, members, [1, 2], 2)
+    data = dict(members)
+    for field_key in ("gender", "dept"):
+        per_value = Counter((gid, data[member_id][field_key]) for member_id, gid in result["assignment"].items())
+        assert max(per_value.values()) == 1
+
+
+def test_exact_search_proves_overlapping_rules_infeasible():
+    # 1-2 share a gender, 2-3 a dept and 1-3 are both leads: one group of 2 gets a clash
+    members = [
+        (1, {"gender": "M", "dept": "X", "role": "lead"}),
+        (2, {"gender": "M", "dept": "Y"}),
+        (3, {"gender": "F", "dept": "Y", "role": "lead"}),
+        (4, {"gender": "N", "dept": "Z"}),
+    ]
+    rules = [_rule("gender", 1), _rule("dept", 1), _rule("lead", 1)]
+    result = solve_group_assignment(members, [1, 2], 2, rules, ["gender", "dept", "role"])
+    assert not result["feasible"]
+    assert result["certificate"] == ["An exhaustive search over the overlapping rules found no assignment"]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.broadcast import MemoryBroadcast, session_channel
+from app.services import live_events
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def feed(monkeypatch):
+    """Subscription to group session 1's channel on a private hub, with short timings"""
+    hub = MemoryBroadcast()
+    monkeypatch.setattr(live_events, "broadcast", hub)
+    monkeypatch.setattr(live_events, "_batches", {})
+    monkeypatch.setattr(live_events, "LIVE_EVENT_DEBOUNCE_MS", 100)
+    monkeypatch.setattr(live_events, "LIVE_EVENT_MAX_DELAY_MS", 200)
+    monkeypatch.setattr(live_events, "LIVE_EVENT_MAX_EVENTS", 3)
+    async with hub.subscription() as subscription:
+        await subscription.subscribe(session_channel("group", 1))
+        yield subscription
+
+
+async def _message(subscription):
+    _, message = await asyncio.wait_for(subscription.get(), timeout=2)
+    return json.loads(message)
+
+
+async def test_burst_is_sent_once_after_the_quiet_period_with_summed_counts(feed):
+    joined = {"participants": 1, "groups": {"Red": 1}}
+    live_events.publish_session_event("group", 1, live_events.PARTICIPANT_JOINED, {"member": "a"}, joined)
+    await asyncio.sleep(0.05)
+    live_events.publish_session_event("group", 1, live_events.PARTICIPANT_JOINED, {"member": "b"}, joined)
+    live_events.publish_session_event("group", 1, live_events.MEMBERS_REGROUPED, None, {"groups": {"Red": -1, "Blue": 1}})
+
+    await asyncio.sleep(0.07)
+    # The second event pushed the send back; 120ms after the first nothing has gone out
+    assert feed.queue.empty()
+
+    message = await _message(feed)
+    assert message["type"] == "session_events"
+    assert message["data"] == {
+        "session_type": "group",
+        "session_id": 1,
+        "events": [
+            {"type": "participant_joined", "data": {"member": "a"}},
+            {"type": "participant_joined", "data": {"member": "b"}},
+            {"type": "members_regrouped", "data": {}},
+        ],
+        "dropped": 0,
+        "counts_delta": {"participants": 2, "groups": {"Red": 1, "Blue": 1}},
+    }
+    await asyncio.sleep(0.15)
+    assert feed.queue.empty()
+
+
+async def test_steady_stream_is_sent_at_least_every_max_delay(feed, monkeypatch):
+    monkeypatch.setattr(live_events, "LIVE_EVENT_MAX_EVENTS", 50)
+    for _ in range(15):
+        live_events.publish_session_event("group", 1, live_events.PARTICIPANT_JOINED, counts={"participants": 1})
+        await asyncio.sleep(0.02)
+
+    # 300ms of events 20ms apart never leave a 100ms gap; the 200ms cap sent one batch anyway
+    assert feed.queue.qsize() == 1
+    batches = [await _message(feed), await _message(feed)]
+    assert sum(len(batch["data"]["events"]) for batch in batches) == 15
+    assert sum(batch["data"]["counts_delta"]["participants"] for batch in batches) == 15
+
+
+async def test_events_beyond_the_limit_are_counted_as_dropped(feed):
+    for index in range(5):
+        live_events.publish_session_event("group", 1, live_events.PARTICIPANT_JOINED, {"member": index}, {"participants": 1})
+
+    message = await _message(feed)
+
+    assert [event["data"]["member"] for event in message["data"]["events"]] == [0, 1, 2]
+    assert message["data"]["dropped"] == 2
+    assert message["data"]["counts_delta"] == {"participants": 5}
@@ -0,0 +1,105 @@
+import pytest
+from sqlmodel import select
+
+from app.models.selection_log import SelectionLog
+from app.schemas.selection import SelectMembersRequest, SelectionQuota
+from app.services import group_session_service
+from app.services.selection_service import (
+    PREFERENTIAL_DRAW_VERSION,
+    QUOTA_DRAW_VERSION,
+    clear_selections,
+    join_group,
+    replay_selection_draw,
+    select_members,
+)
+from tests.factories import make_host, make_selection_session, seed_selection_members
+
+pytestmark = pytest.mark.anyio
+
+
+def _attributes(index: int) -> dict:
+    return {"gender": "female" if index % 3 == 0 else "male", "site": ["north", "south"][index % 2]}
+
+
+async def _session_with_members(db, email: str = "host@example.com", members: int = 60):
+    host = await make_host(db, email)
+    selection_session = await make_selection_session(db, host, fields=["gender", "site"], rules={"female": 4})
+    await seed_selection_members(db, selection_session.id, members, _attributes)
+    return host, selection_session
+
+
+async def test_draw_replays_after_later_joins_and_draws(db):
+    host, selection_session = await _session_with_members(db)
+    code = selection_session.code_id
+    async with db() as session:
+        first = await select_members(
+            SelectMembersRequest(code=code, count=6, preferential_selection={"gender": "female"}, seed=42), host.id, session
+        )
+
+    # Neither a member joining afterwards nor a second draw changes what the first one replays to
+    async with db() as session:
+        await join_group(code, "late@example.com", {"gender": "female", "site": "north"}, session)
+    async with db() as session:
+        await select_members(SelectMembersRequest(code=code, count=10, seed=7), host.id, session)
+    async with db() as session:
+        replay = await replay_selection_draw(code, first.draw_id, host.id, session)
+
+    assert first.seed == 42
+    assert replay.matches
+    assert replay.algorithm_version == PREFERENTIAL_DRAW_VERSION
+    assert replay.recorded == replay.recomputed == first.member_identifiers
+
+    async with db() as session:
+        logs = (await session.exec(select(SelectionLog).where(SelectionLog.draw_id == first.draw_id))).all()
+    assert len(logs) == 6
+    assert {(log.seed, log.algorithm_version) for log in logs} == {(42, PREFERENTIAL_DRAW_VERSION)}
+
+
+async def test_same_seed_draws_the_same_members(db):
+    host, selection_session = await _session_with_members(db)
+    code = selection_session.code_id
+    request = SelectMembersRequest(
+        code=code, count=8, quotas=[SelectionQuota(field_key="site", value="north", min=5)], seed=2026
+    )
+
+    async with db() as session:
+        first = await select_members(request, host.id, session)
+    async with db() as session:
+        await clear_selections(code, host.id, session)
+    async with db() as session:
+        second = await select_members(request, host.id, session)
+    async with db() as session:
+        replay = await replay_selection_draw(code, first.draw_id, host.id, session)
+
+    assert second.member_identifiers == first.member_identifiers
+    assert replay.matches
+    assert replay.algorithm_version == QUOTA_DRAW_VERSION
+    north = next(fill for fill in first.quota_fill if fill.field_key == "site" and fill.value == "north")
+    assert north.selected >= 5 and north.met
+
+
+async def test_replay_is_limited_to_the_hosts_session(db):
+    host, selection_session = await _session_with_members(db, members=10)
+    other_host, other_session = await _session_with_members(db, "other@example.com", members=10)
+    async with db() as session:
+        result = await select_members(SelectMembersRequest(code=selection_session.code_id, count=3, seed=1), host.id, session)
+
+    async with db() as session:
+        with pytest.raises(ValueError, match="not authorized"):
+            await replay_selection_draw(selection_session.code_id, result.draw_id, other_host.id, session)
+    async with db() as session:
+        with pytest.raises(ValueError, match="draw not found"):
+            await replay_selection_draw(other_session.code_id, result.draw_id, other_host.id, session)
+
+
+def test_group_assignment_seed_repeats_placement(monkeypatch):
+    monkeypatch.setattr(group_session_service, "GROUP_ASSIGNMENT_SEED", "workshop")
+    draws = [
+        [group_session_service._assignment_rng(12, f"m{index}").random() for index in range(20)]
+        for _ in range(2)
+    ]
+    assert draws[0] == draws[1]
+    assert group_session_service._assignment_rng(13, "m0").random() != draws[0][0]
+
+    monkeypatch.setattr(group_session_service, "GROUP_ASSIGNMENT_SEED", None)
+    assert group_session_service._assignment_rng(12, "m0") is group_session_service._assignment_random
@@ -0,0 +1,141 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from app.schemas.selection import SelectionQuota
+from app.services.selection_quota import build_quotas, quota_fields, sample_with_quotas
+
+
+def _candidates(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        (member_id, {"gender": rng.choice(["male", "female"]), "site": rng.choice(["north", "south", "east"])})
+        for member_id in range(1, n + 1)
+    ]
+
+
+def test_same_seed_same_draw_and_other_seeds_differ():
+    candidates = _candidates(500)
+    quotas = build_quotas([SelectionQuota(field_key="gender", value="female", share=0.5)], None, [], ["gender", "site"], 40)
+
+    first = sample_with_quotas(candidates, [], 40, quotas, seed=11)
+    again = sample_with_quotas(list(candidates), [], 40, quotas, seed=11)
+    other = sample_with_quotas(candidates, [], 40, quotas, seed=12)
+
+    assert first == again
+    assert first["selected"] != other["selected"]
+
+
+def test_min_and_max_hold_with_earlier_selections():
+    candidates = _candidates(300, seed=1)
+    data = dict(candidates)
+    quotas = build_quotas(
+        [
+            SelectionQuota(field_key="gender", value="female", min=12),
+            SelectionQuota(field_key="site", max=8),
+        ],
+        None, [], ["gender", "site"], 24,
+    )
+    already = [{"gender": "female", "site": "north"}] * 2
+
+    result = sample_with_quotas(candidates, already, 22, quotas, seed=3)
+
+    picked = [data[member_id] for member_id, _ in result["selected"]]
+    assert len(picked) == 22
+    assert sum(values["gender"] == "female" for values in picked) + 2 >= 12
+    per_site = Counter(values["site"] for values in picked + already)
+    assert max(per_site.values()) <= 8
+    assert all(entry["met"] for entry in result["fill"])
+
+
+def test_unreachable_minimum_is_reported_not_raised():
+    candidates = [(1, {"gender": "female"}), (2, {"gender": "male"}), (3, {"gender": "male"}), (4, {"gender": "male"})]
+    quotas = build_quotas([SelectionQuota(field_key="gender", value="female", min=3)], None, [], ["gender"], 3)
+
+    result = sample_with_quotas(candidates, [], 3, quotas, seed=0)
+
+    assert len(result["selected"]) == 3
+    assert result["fill"] == [{"field_key": "gender", "value": "female", "min": 3, "max": None, "selected": 1, "met": False}]
+
+
+def test_preferential_selection_goes_first_and_value_rules_cap_it():
+    class Rule:
+        field_key, preference_max_selection = "female", 2
+
+    candidates = _candidates(100, seed=2)
+    data = dict(candidates)
+    quotas = build_quotas([], {"gender": "female"}, [Rule()], ["gender", "site"], 5)
+    assert quota_fields(quotas, ["gender", "site"]) == ["gender", "site"]
+
+    result = sample_with_quotas(candidates, [], 5, quotas, seed=4)
+
+    types = [selection_type for _, selection_type in result["selected"]]
+    assert types == ["preferential", "preferential", "random", "random", "random"]
+    assert sum(data[member_id]["gender"] == "female" for member_id, _ in result["selected"]) == 2
+
+
+def test_bad_quotas_are_rejected():
+    with pytest.raises(ValueError, match="needs a value"):
+        build_quotas([SelectionQuota(field_key="site", min=2)], None, [], ["site"], 10)
+    with pytest.raises(ValueError, match="above max"):
+        build_quotas([SelectionQuota(field_key="site", value="north", min=5, max=2)], None, [], ["site"], 10)
+
+
+def test_helping_candidate_that_strands_another_minimum_is_held_back():
+    candidates = [(1, {"gender": "female", "department": "b"}), (2, {"gender": "female", "department": "a"})]
+    quotas = build_quotas(
+        [
+            SelectionQuota(field_key="gender", value="female", min=1),
+            SelectionQuota(field_key="department", value="a", min=1),
+        ],
+        None, [], ["gender", "department"], 1,
+    )
+
+    for seed in range(10):
+        result = sample_with_quotas(candidates, [], 1, quotas, seed=seed)
+        assert result["selected"] == [(2, "preferential")]
+        assert all(entry["met"] for entry in result["fill"])
+
+
+def test_every_quota_set_that_can_be_met_is_met():
+    rng = random.Random(5)
+    fields = {"gender": ["female", "male"], "department": ["a", "b", "c"]}
+    checked = 0
+    for seed in range(1500):
+        def draw_member():
+            return {key: rng.choice(values) for key, values in fields.items()}
+
+        candidates = [(member_id, draw_member()) for member_id in range(rng.randint(1, 7))]
+        already = [draw_member() for _ in range(rng.randint(0, 2))]
+        count = rng.randint(1, 4)
+        requested = []
+        for _ in range(rng.randint(1, 3)):
+            field_key = rng.choice(list(fields))
+            minimum, maximum = rng.choice([None, 1, 2]), rng.choice([None, 1, 2, 3])
+            if minimum is not None and maximum is not None and minimum > maximum:
+                continue
+            value = rng.choice(fields[field_key]) if minimum or rng.random() < 0.7 else None
+            requested.append(SelectionQuota(field_key=field_key, value=value, min=minimum, max=maximum))
+        quotas = build_quotas(requested, None, [], list(fields), count)
+        size = min(count, len(candidates))
+
+        def meets(picked):
+            for quota in requested:
+                values = [quota.value] if quota.value else fields[quota.field_key]
+                for value in values:
+                    filled = sum(member[quota.field_key] == value for member in already + picked)
+                    if quota.min is not None and filled < quota.min or quota.max is not None and filled > quota.max:
+                        return False
+            return True
+
+        if not any(meets([values for _, values in draw]) for draw in combinations(candidates, size)):
+            continue
+        checked += 1
+        data = dict(candidates)
+        result = sample_with_quotas(candidates, already, count, quotas, seed=seed)
+        picked = [data[member_id] for member_id, _ in result["selected"]]
+        assert len(picked) == size and meets(picked), (candidates, already, count, requested)
+        assert all(entry["met"] for entry in result["fill"])
+    assert checked > 500
@@ -0,0 +1,57 @@
+import pytest
+from sqlmodel import select
+
+from app.models.selection_member import SelectionMember
+from app.schemas.selection import SelectMembersRequest
+from app.services.selection_service import select_members
+from tests.factories import make_host, make_selection_session, seed_selection_members
+
+pytestmark = pytest.mark.anyio
+
+
+async def _selected_genders(db, session_id: int) -> list:
+    async with db() as session:
+        return list((await session.exec(
+            select(SelectionMember.attributes["gender"].astext)
+            .where(SelectionMember.selection_session_id == session_id, SelectionMember.selected == True)
+        )).all())
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4, 5])
+async def test_rule_max_holds_across_draws(db, seed):
+    host = await make_host(db)
+    selection_session = await make_selection_session(db, host, fields=["gender"], rules={"female": 3})
+    await seed_selection_members(db, selection_session.id, 40, lambda i: {"gender": "female" if i % 2 else "male"})
+
+    async with db() as session:
+        first = await select_members(
+            SelectMembersRequest(code=selection_session.code_id, count=5, preferential_selection={"gender": "female"}, seed=seed),
+            host.id, session,
+        )
+    assert (first.preferential_count, first.random_count) == (3, 2)
+    assert sorted(await _selected_genders(db, selection_session.id)) == ["female"] * 3 + ["male"] * 2
+
+    # The limit is already reached, so the next draw takes no more preferred members at random
+    async with db() as session:
+        second = await select_members(
+            SelectMembersRequest(code=selection_session.code_id, count=15, preferential_selection={"gender": "female"}, seed=seed),
+            host.id, session,
+        )
+    assert second.selected_count == 15
+    genders = await _selected_genders(db, selection_session.id)
+    assert genders.count("female") == 3
+    assert len(genders) == 15
+
+
+async def test_small_preferred_pool_is_taken_whole_then_filled_at_random(db):
+    host = await make_host(db)
+    selection_session = await make_selection_session(db, host, fields=["gender"], rules={"female": 10})
+    await seed_selection_members(db, selection_session.id, 20, lambda i: {"gender": "female" if i < 2 else "male"})
+
+    async with db() as session:
+        result = await select_members(
+            SelectMembersRequest(code=selection_session.code_id, count=6, preferential_selection={"gender": "female"}, seed=9),
+            host.id, session,
+        )
+    assert (result.preferential_count, result.random_count) == (2, 4)
+    assert sorted(await _selected_genders(db, selection_session.id)) == ["female"] * 2 + ["male"] * 4
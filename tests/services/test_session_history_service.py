@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.session_history_service import escape_like, get_session_history
+from tests.factories import make_group_session, make_host, make_selection_session
+
+
+def test_escape_like():
+    assert escape_like("100%_a\\b") == "100\\%\\_a\\\\b"
+
+
+async def _history(db, host_id, **kwargs):
+    params = dict(
+        host_id=host_id, include_group=True, include_selection=True, session_status=None,
+        q=None, limit=20, offset=0, cursor=None,
+    )
+    params.update(kwargs)
+    async with db() as session:
+        return await get_session_history(db=session, **params)
+
+
+@pytest.mark.anyio
+async def test_history_pages_by_cursor_and_counts_once(db):
+    host = await make_host(db)
+    other = await make_host(db, "other@example.com")
+    for index in range(3):
+        await make_group_session(db, host, name=f"group {index}")
+        await make_selection_session(db, host, name=f"selection {index}")
+    await make_group_session(db, other, name="not mine")
+
+    first = await _history(db, host.id, limit=4)
+    assert first["total_count"] == 6
+    assert len(first["sessions"]) == 4
+    assert first["next_cursor"]
+
+    second = await _history(db, host.id, limit=4, cursor=first["next_cursor"])
+    assert second["total_count"] is None
+    assert second["next_cursor"] is None
+    names = [item["name"] for item in first["sessions"] + second["sessions"]]
+    assert sorted(names) == sorted([f"group {i}" for i in range(3)] + [f"selection {i}" for i in range(3)])
+
+
+@pytest.mark.anyio
+async def test_history_search_matches_wildcards_literally(db):
+    host = await make_host(db)
+    await make_group_session(db, host, name="100% attendance")
+    await make_group_session(db, host, name="1000 attendees")
+    await make_group_session(db, host, name="team_a")
+    await make_group_session(db, host, name="teamba")
+
+    percent = await _history(db, host.id, q="100%")
+    assert [item["name"] for item in percent["sessions"]] == ["100% attendance"]
+    underscore = await _history(db, host.id, q="m_a")
+    assert [item["name"] for item in underscore["sessions"]] == ["team_a"]
@@ -0,0 +1,21 @@
+import io
+import zipfile
+
+from app.utils.chunk_sink import ChunkSink
+
+
+def test_zip_written_through_the_sink_streams_and_reads_back():
+    sink = ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    chunks = []
+    for index in range(3):
+        archive.writestr(f"entry{index}.txt", f"payload {index}" * 100)
+        chunks.append(sink.drain())
+    archive.close()
+    chunks.append(sink.drain())
+
+    # Every entry was handed out before the archive was finished
+    assert all(chunks[:3])
+    assert sink.drain() == b""
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as readback:
+        assert readback.read("entry2.txt") == b"payload 2" * 100
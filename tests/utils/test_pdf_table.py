@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from fpdf import FPDF
+
+from app.services.export_service import render_group_pdf, render_selection_pdf
+from app.utils.pdf_table import PdfTable, TextMeasure, new_pdf, pdf_text
+
+
+def test_wrap_breaks_on_words_and_splits_overlong_words():
+    pdf, family = new_pdf()
+    pdf.set_font(family, "", 11)
+    measure = TextMeasure(pdf)
+    measure.select()
+
+    assert measure.wrap("short", 100) == ["short"]
+    lines = measure.wrap("alpha beta gamma delta", measure.width("gamma delta") + 0.1)
+    assert lines == ["alpha beta", "gamma delta"]
+    long_word = "x" * 200
+    pieces = measure.wrap(long_word, 30)
+    assert "".join(pieces) == long_word
+    assert all(measure.width(piece) <= 30 for piece in pieces)
+
+
+def test_rows_paginate_and_repeat_the_header(monkeypatch):
+    pdf, family = new_pdf()
+    table = PdfTable(pdf, family, [("Member ID", 50), ("Member Data", 140)])
+    headers = []
+    original = PdfTable.header
+    monkeypatch.setattr(PdfTable, "header", lambda self: (headers.append(self.pdf.page), original(self)))
+
+    table.header()
+    table.rows([(f"member{i}", "data " * (i % 30)) for i in range(200)])
+
+    assert pdf.page > 1
+    assert headers == list(range(1, pdf.page + 1))
+    assert pdf.get_y() <= pdf.h - pdf.b_margin
+
+
+def test_non_latin_text_without_a_unicode_font_is_replaced():
+    assert pdf_text("Arial", "Zoë 李雷") == "Zoë ??"
+    data = {
+        "session": {"name": "名簿", "description": "Ünïcode", "max_group_size": 5, "status": "active"},
+        "access_code": "ABC123",
+        "groups": [(1, "Группа")],
+        "members": [(1, "李雷", {"city": "東京"})],
+        "preferential_rules": [],
+        "field_definitions": [],
+    }
+    assert render_group_pdf(data).startswith(b"%PDF")
+
+
+def test_selection_summary_is_drawn_above_the_table(monkeypatch):
+    summary_y, table_tops = [], []
+    original_cell, original_header = FPDF.cell, PdfTable.header
+
+    def cell(self, *args, **kwargs):
+        text = kwargs.get("text", kwargs.get("txt", args[2] if len(args) > 2 else ""))
+        if str(text).startswith("Selection Summary"):
+            summary_y.append(self.get_y())
+        return original_cell(self, *args, **kwargs)
+
+    def header(self):
+        original_header(self)
+        table_tops.append(self._top)
+
+    monkeypatch.setattr(FPDF, "cell", cell)
+    monkeypatch.setattr(PdfTable, "header", header)
+    render_selection_pdf({
+        "session": {"name": "Draw", "description": None, "max_group_size": 10},
+        "access_code": "ABC123",
+        "members": [(f"member{i}", i % 3 == 0, datetime(2026, 1, 1), {"team": "t"}) for i in range(5)],
+        "preferential_rules": [],
+    })
+
+    # The column lines run from the table top down, so nothing may sit between the two
+    assert summary_y and table_tops
+    assert summary_y[0] + 10 <= table_tops[0]